@@ -1,14 +1,36 @@
-from enum import auto
+import argparse
 import tkinter as tk
-from tkinter import ttk, scrolledtext, messagebox, filedialog
-import docx
-import re
+from tkinter import ttk, messagebox, filedialog
 import random
+import time
+import queue
+from array import array
 from pathlib import Path
-import json
+
+import quiz_cache
+import quiz_exam
+import quiz_grading
+import quiz_loader
+import quiz_parser
+import quiz_progress
+import quiz_schedule
+import quiz_search
+import quiz_widgets
+
+# 加载队列轮询间隔（毫秒）及每次最多处理的批数
+LOAD_POLL_INTERVAL = 30
+LOAD_POLL_BATCHES = 5
+
+# 搜索索引构建完成的轮询间隔（毫秒）
+SEARCH_POLL_INTERVAL = 200
+
+# 模考倒计时的刷新间隔（毫秒）
+EXAM_TICK_INTERVAL = 1000
 
 class ModernQuizApp:
-    def __init__(self, root):
+    def __init__(self, root, cache=None, progress=None, db=None,
+                 exam_quotas=quiz_exam.DEFAULT_QUOTAS, exam_minutes=quiz_exam.DEFAULT_MINUTES, dedup=False,
+                 use_mmap=False):
         self.root = root
         self.root.title("人力资源服务刷题系统")
         self.root.geometry("1000x750")
@@ -25,8 +47,29 @@ class ModernQuizApp:
         self.is_answered = False
         self.correct_count = 0
         self.total_answered = 0
-        self.option_vars = []  # 存储选项变量
-        self.option_widgets = []  # 存储选项widget
+        self.option_pool = []  # 选项widget池（框架、标签），切换题目时原地复用
+        self.option_widgets = []  # 当前题目使用的选项widget（option_pool 的前若干项）
+        self.loading = None  # 正在进行的后台加载
+        self.cache = cache if cache is not None else quiz_cache.BankCache()  # 题库解析缓存
+        self.progress = progress if progress is not None else quiz_progress.ProgressStore()  # 答题记录
+        self.db = db  # SQLite 题库数据库（可选，quiz_db.QuestionDB）
+        self.db_bank = None  # 按页从数据库读取时，当前题库在数据库中的 id
+        self.use_mmap = use_mmap  # 文本题库用内存映射按需解析（quiz_mmap）
+        self.mapped = None  # 映射模式下当前的 quiz_mmap.MappedBank
+        self.reset_scanner = None  # 映射模式下重置答题记录时计算指纹的 quiz_mmap.FingerprintScanner
+        self.search_builder = None  # 正在后台构建的搜索索引
+        self.search_index = None  # 当前题库的搜索索引（下标为 self.questions 中的位置）
+        self.bank_count = 1  # 当前加载的题库文件数（多个时显示每题的来源）
+        self.dedup = dedup  # 加载多个题库时合并重复题目
+        self.review_mode = False  # 复习模式：下一题按间隔复习调度选择
+        self.scheduler = None  # 当前筛选结果的复习队列（按需构建）
+        self.scheduler_count = 0  # 构建复习队列时的题目数
+        self.sampler = None  # 当前筛选结果的薄弱题抽样权重（按需构建）
+        self.exam_quotas = exam_quotas  # 模考各题型题数
+        self.exam_minutes = exam_minutes  # 模考时长（分钟）
+        self.exam = None  # 进行中的模考试卷（quiz_exam.ExamPaper）
+        self.exam_deadline = 0.0  # 模考结束时间（time.monotonic）
+        self.exam_timer = None  # 倒计时的 after id
 
         # 清新的白色配色方案
         self.colors = {
@@ -59,8 +102,8 @@ class ModernQuizApp:
         # 创建界面
         self.setup_ui()
 
-        # 自动加载题库
-        self.auto_load_questions()
+        # 自动加载题库（窗口显示后再开始）
+        self.root.after(100, self.auto_load_questions)
 
         # 绑定窗口关闭事件
         self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
@@ -139,6 +182,24 @@ class ModernQuizApp:
                                    relief='flat')
         self.filter_btn.pack(side='left')
 
+        # 加载进度（仅在加载时显示）
+        self.loading_frame = tk.Frame(right_frame, bg=self.colors['card_bg'])
+        self.loading_progress = tk.DoubleVar(value=0)
+        ttk.Progressbar(self.loading_frame,
+                        variable=self.loading_progress,
+                        maximum=100,
+                        length=120,
+                        mode='determinate').pack(side='left', padx=(0, 5))
+        tk.Button(self.loading_frame,
+                  text="取消",
+                  command=self.cancel_loading,
+                  font=self.fonts['stats'],
+                  bg=self.colors['card_bg'],
+                  fg=self.colors['text_light'],
+                  borderwidth=0,
+                  cursor='hand2',
+                  relief='flat').pack(side='left')
+
     def create_sidebar(self, parent):
         """创建左侧题目列表"""
         sidebar = tk.Frame(parent, bg=self.colors['card_bg'], width=250, relief='raised', bd=1)
@@ -152,27 +213,45 @@ class ModernQuizApp:
                              bg=self.colors['card_bg'])
         list_title.pack(pady=10)
 
+        # 搜索框（题干、选项和解析，索引建好后可用）
+        search_frame = tk.Frame(sidebar, bg=self.colors['card_bg'])
+        search_frame.pack(fill='x', padx=10, pady=(0, 10))
+        tk.Label(search_frame,
+                 text="🔍",
+                 font=self.fonts['stats'],
+                 fg=self.colors['text_light'],
+                 bg=self.colors['card_bg']).pack(side='left', padx=(0, 5))
+        self.search_var = tk.StringVar()
+        self.search_entry = tk.Entry(search_frame,
+                                     textvariable=self.search_var,
+                                     font=self.fonts['stats'],
+                                     bg=self.colors['option_bg'],
+                                     fg=self.colors['text'],
+                                     relief='flat',
+                                     highlightthickness=1,
+                                     highlightbackground=self.colors['border'],
+                                     highlightcolor=self.colors['primary'],
+                                     state='disabled')
+        self.search_entry.pack(side='left', fill='x', expand=True)
+        self.search_var.trace_add('write', lambda *args: self.filter_questions())
+
         # 题目列表容器
         list_frame = tk.Frame(sidebar, bg=self.colors['card_bg'])
         list_frame.pack(fill='both', expand=True, padx=10, pady=(0, 10))
 
-        # 创建滚动条和列表框（隐藏滚动条）
-        scrollbar = tk.Scrollbar(list_frame, width=0)
-        scrollbar.pack(side='right', fill='y')
-
-        self.question_listbox = tk.Listbox(list_frame,
-                                          yscrollcommand=scrollbar.set,
-                                          font=self.fonts['option'],
-                                          bg=self.colors['option_bg'],
-                                          fg=self.colors['text'],
-                                          selectbackground=self.colors['option_selected'],
-                                          selectforeground=self.colors['text'],
-                                          borderwidth=0,
-                                          highlightthickness=0,
-                                          activestyle='none',
-                                          relief='flat')
+        # 虚拟化列表：只渲染可见行，行文本按需生成（隐藏滚动条）
+        self.question_listbox = quiz_widgets.VirtualListbox(list_frame,
+                                                           row_text=self.list_row_text,
+                                                           font=self.fonts['option'],
+                                                           bg=self.colors['option_bg'],
+                                                           fg=self.colors['text'],
+                                                           selectbackground=self.colors['option_selected'],
+                                                           selectforeground=self.colors['text'],
+                                                           borderwidth=0,
+                                                           highlightthickness=0,
+                                                           activestyle='none',
+                                                           relief='flat')
         self.question_listbox.pack(side='left', fill='both', expand=True)
-        scrollbar.config(command=self.question_listbox.yview)
 
         self.question_listbox.bind('<<ListboxSelect>>', self.on_question_select)
 
@@ -281,6 +360,21 @@ class ModernQuizApp:
                                                    self.random_question, 'normal')
         self.random_btn.pack(side='left', padx=5)
 
+        # 薄弱题按钮（按错题数和最近结果加权随机）
+        self.weak_btn = self.create_modern_button(button_container, "🎯 薄弱",
+                                                 self.weak_question, 'normal')
+        self.weak_btn.pack(side='left', padx=5)
+
+        # 模考按钮（模考进行中为交卷）
+        self.exam_btn = self.create_modern_button(button_container, "📝 模考",
+                                                 self.toggle_exam, 'normal')
+        self.exam_btn.pack(side='left', padx=5)
+
+        # 复习模式按钮
+        self.review_btn = self.create_modern_button(button_container, "🧠 复习",
+                                                   self.toggle_review, 'normal')
+        self.review_btn.pack(side='left', padx=5)
+
         # 重置按钮
         self.reset_btn = self.create_modern_button(button_container, "⟲ 重置",
                                                    self.reset_quiz, 'warning')
@@ -334,11 +428,18 @@ class ModernQuizApp:
 
     def set_filter(self, filter_type):
         """设置筛选类型"""
+        if filter_type != "全部" and self.mapped_unsupported("按题型筛选"):
+            return
         self.filter_var.set(filter_type)
         self.filter_questions()
 
     def auto_load_questions(self):
-        """自动加载题库文件"""
+        """自动加载题库文件：sets 目录下有多个题库时全部并行加载并合并"""
+        banks = quiz_loader.find_banks("sets") if Path("sets").is_dir() else []
+        if len(banks) > 1:
+            self.start_loading_many(banks)
+            return
+
         # 优先加载docx文件
         docx_path = Path("sets/人力资源服务赛项模块一题库.docx")
         if docx_path.exists():
@@ -355,257 +456,371 @@ class ModernQuizApp:
         messagebox.showinfo("提示", "未找到题库文件，请点击'加载文件'按钮手动加载")
 
     def load_file(self):
-        """手动加载文件"""
-        file_path = filedialog.askopenfilename(
+        """手动加载文件（选择多个文件时并行加载并合并）"""
+        file_paths = filedialog.askopenfilenames(
             title="选择题库文件",
             filetypes=[("Word文档", "*.docx"), ("文本文件", "*.txt"), ("所有文件", "*.*")]
         )
-        if file_path:
-            if file_path.endswith('.docx'):
-                self.load_docx_file(Path(file_path))
-            elif file_path.endswith('.txt'):
-                self.load_txt_file(Path(file_path))
+        paths = [Path(file_path) for file_path in file_paths]
+        if any(path.suffix.lower() not in quiz_loader.BANK_SUFFIXES for path in paths):
+            messagebox.showerror("错误", "不支持的文件格式")
+        elif len(paths) > 1:
+            self.start_loading_many(paths)
+        elif paths:
+            if paths[0].suffix.lower() == '.docx':
+                self.load_docx_file(paths[0])
             else:
-                messagebox.showerror("错误", "不支持的文件格式")
+                self.load_txt_file(paths[0])
 
     def load_docx_file(self, docx_path):
         """加载Word文档"""
-        try:
-            if not docx_path.exists():
-                messagebox.showerror("错误", "文件不存在！")
-                return
-
-            # 读取Word文档
-            doc = docx.Document(docx_path)
+        if not docx_path.exists():
+            messagebox.showerror("错误", "文件不存在！")
+            return
+        self.start_loading(docx_path)
 
-            # 提取所有文本并合并
-            text_lines = []
-            for para in doc.paragraphs:
-                text = para.text.strip()
-                if text:
-                    text_lines.append(text)
+    def load_txt_file(self, txt_path):
+        """加载文本文件"""
+        if not txt_path.exists():
+            messagebox.showerror("错误", "文件不存在！")
+            return
+        self.start_loading(txt_path)
+
+    def start_loading(self, path):
+        """在后台线程中读取并解析题库，界面线程定时取回解析结果"""
+        self.stop_loading()
+        self.stop_search_index()
+        self.stop_exam()
+        self.db_bank = None
+        self.close_mapped()
+        self.bank_count = 1
+        if self.use_mmap and path.suffix.lower() == '.txt':
+            # 可选模式的模块只在启用时导入，不计入启动耗时
+            import quiz_mmap
+            self.begin_loading(quiz_mmap.IndexLoader(path, progress=self.progress))
+            return
+        if self.db is not None:
+            # 数据库中已有最新的导入结果时，直接按页读取，不再解析
+            bank = self.db.bank_id(path)
+            if bank is not None:
+                self.filtered_questions = []
+                self.show_db_bank(bank)
+                messagebox.showinfo("成功", f"题库加载成功！\n共 {len(self.questions)} 道题目")
+                return
+        self.begin_loading(quiz_loader.BankLoader(path, cache=self.cache,
+                                                  db_path=self.db.path if self.db is not None else None))
+
+    def start_loading_many(self, paths):
+        """用进程池并行解析多个题库并合并（不导入数据库）"""
+        self.stop_loading()
+        self.stop_search_index()
+        self.stop_exam()
+        self.db_bank = None
+        self.close_mapped()
+        self.bank_count = len(paths)
+        self.begin_loading(quiz_loader.MultiBankLoader(paths, cache=self.cache, dedup=self.dedup))
+
+    def begin_loading(self, loader):
+        """启动后台加载并开始轮询队列"""
+        self.questions = []
+        self.filtered_questions = []
+        self.correct_count = 0
+        self.total_answered = 0
+        self.question_listbox.set_count(0)
+        self.watch_loader(loader)
+
+    def watch_loader(self, loader, shown=False):
+        """启动后台线程，显示进度条和取消按钮并开始轮询队列"""
+        self.loading = {
+            'loader': loader,
+            'shown': shown,  # 是否已显示第一题
+            'after_id': None,
+        }
 
-            # 解析题目
-            self.questions = self.parse_questions(text_lines)
-            self.filtered_questions = self.questions.copy()
+        # 显示进度条和取消按钮
+        self.loading_progress.set(0)
+        self.loading_frame.pack(side='right', padx=20)
+
+        loader.start()
+        self.loading['after_id'] = self.root.after(LOAD_POLL_INTERVAL, self.poll_loading)
+
+    def stop_loading(self):
+        """停止正在进行的加载并丢弃尚未取回的结果"""
+        if self.loading is not None:
+            self.loading['loader'].cancel()
+            self.end_loading()
+
+    def cancel_loading(self):
+        """取消加载（已载入的题目保留）"""
+        if self.loading is not None:
+            self.loading['loader'].cancel()
+
+    def end_loading(self):
+        """结束加载状态，隐藏进度条"""
+        loading, self.loading = self.loading, None
+        if loading['after_id']:
+            self.root.after_cancel(loading['after_id'])
+        self.loading_frame.pack_forget()
+
+    def poll_loading(self):
+        """从加载队列取回解析结果，每次最多处理 LOAD_POLL_BATCHES 批"""
+        loading = self.loading
+        if loading is None:
+            return
+        loading['after_id'] = None
 
-            # 填充题目列表
-            self.populate_question_list()
+        for _ in range(LOAD_POLL_BATCHES):
+            try:
+                kind, payload, progress = loading['loader'].queue.get_nowait()
+            except queue.Empty:
+                break
+
+            self.loading_progress.set(progress * 100)
+            if kind == 'batch':
+                self.add_loaded_questions(payload)
+            elif kind in ('file', 'progress'):
+                # 多题库加载时一个文件完成（耗时在加载结束后统一报告）或映射模式的扫描进度
+                pass
+            elif kind == 'reset':
+                # 编码重试，清空已载入的题目
+                self.questions = []
+                self.filtered_questions = []
+                self.correct_count = 0
+                self.total_answered = 0
+                self.question_listbox.set_count(0)
+                loading['shown'] = False
+            else:
+                self.end_loading()
+                if kind == 'error':
+                    messagebox.showerror("错误", payload)
+                    return
+                loader = loading['loader']
+                if self.use_mmap:
+                    import quiz_mmap  # 已在 start_loading 中导入
+                    if isinstance(loader, quiz_mmap.FingerprintScanner):
+                        if kind == 'done':
+                            self.finish_mapped_reset(payload)
+                        else:
+                            messagebox.showinfo("提示", "已取消重置答题记录")
+                        return
+                    if isinstance(loader, quiz_mmap.IndexLoader):
+                        if kind == 'done':
+                            self.show_mapped_bank(loader.bank)
+                            messagebox.showinfo("成功", f"题库映射完成！\n共 {len(self.questions)} 道题目"
+                                                       f"（按原文顺序，显示时解析），"
+                                                       f"建立索引 {loader.bank.scan_seconds:.1f} 秒")
+                        return
+                bank = None
+                if kind == 'done' and self.db is not None and isinstance(loader, quiz_loader.BankLoader):
+                    bank = self.db.bank_id(loader.path)
+                if bank is not None:
+                    # 已导入数据库：改为按页读取，释放内存中的题目
+                    self.show_db_bank(bank)
+                else:
+                    self.finish_loading()
+                if kind == 'cancelled':
+                    messagebox.showinfo("提示", f"已取消加载，已载入 {len(self.questions)} 道题目")
+                elif isinstance(loader, quiz_loader.MultiBankLoader):
+                    messagebox.showinfo("成功", f"题库加载完成！\n\n{loader.report()}")
+                else:
+                    messagebox.showinfo("成功", f"题库加载成功！\n共 {len(self.questions)} 道题目")
+                return
 
-            # 显示第一题
-            if self.questions:
-                self.display_question(0)
+        loading['after_id'] = self.root.after(LOAD_POLL_INTERVAL, self.poll_loading)
 
-            messagebox.showinfo("成功", f"题库加载成功！\n共 {len(self.questions)} 道题目")
+    def add_loaded_questions(self, batch):
+        """追加一批解析出的题目并填充列表，首批到达即显示第一题"""
+        filter_type = self.filter_var.get()
+        added = 0
+        for q in batch:
+            self.restore_progress(q)
+            # 暂按读取顺序编号，全部解析完后再按题型重新编号
+            q.number = len(self.questions) + 1
+            self.questions.append(q)
+            if filter_type == "全部" or q.type == filter_type:
+                self.filtered_questions.append(q)
+                added += 1
+        if added:
+            self.question_listbox.append(added)
+
+        if self.filtered_questions and not self.loading['shown']:
+            self.loading['shown'] = True
+            self.display_question(0)
 
-        except Exception as e:
-            messagebox.showerror("错误", f"加载Word文件失败：{str(e)}")
+    def finish_loading(self):
+        """全部解析完成：按题型重新编号，仅在顺序或编号变化时重建列表"""
+        shown = [(q, q.number) for q in self.filtered_questions]
+        current = None
+        if self.current_question_index < len(self.filtered_questions):
+            current = self.filtered_questions[self.current_question_index]
 
-    def load_txt_file(self, txt_path):
-        """加载文本文件"""
-        try:
-            if not txt_path.exists():
-                messagebox.showerror("错误", "文件不存在！")
-                return
+        self.questions = self.reorder_questions_by_type(self.questions)
+        filter_type = self.filter_var.get()
+        if filter_type == "全部":
+            self.filtered_questions = self.questions.copy()
+        else:
+            self.filtered_questions = [q for q in self.questions if q.type == filter_type]
 
-            # 读取文本文件
-            with open(txt_path, 'r', encoding='utf-8') as f:
-                content = f.read()
+        changed = len(shown) != len(self.filtered_questions) or any(
+            q is not old or q.number != number
+            for q, (old, number) in zip(self.filtered_questions, shown))
+        if changed and current is not None:
+            self.populate_question_list()
+            # 用户尚未离开第一题时显示新的第一题，否则保持当前题目
+            if self.current_question_index == 0 and not self.is_answered:
+                self.display_question(0)
+            else:
+                self.display_question(next(i for i, q in enumerate(self.filtered_questions) if q is current))
+
+        self.build_search_index()
+
+    def restore_progress(self, question):
+        """从答题记录恢复题目的答题状态，并计入统计"""
+        stats = self.progress.get(quiz_progress.fingerprint(question))
+        if stats is not None:
+            question.answered = True
+            question.answered_correct = stats.correct > 0
+            self.total_answered += stats.attempts
+            self.correct_count += stats.correct
+
+    def show_db_bank(self, bank):
+        """改为从数据库按页读取题库，保持当前题目"""
+        current = None
+        if self.filtered_questions and (self.current_question_index or self.is_answered):
+            current = quiz_progress.fingerprint(self.filtered_questions[self.current_question_index])
+
+        self.db_bank = bank
+        self.total_answered, self.correct_count = self.db.apply_progress(bank, self.progress)
+        self.questions = self.db.select(bank)
+        index = -1
+        if current is not None:
+            self.select_filtered()
+            index = self.filtered_questions.find(current)
+        if index < 0:
+            self.filter_questions()
+        else:
+            self.populate_question_list()
+            self.display_question(index)
 
-            # 分割成行
-            text_lines = [line.strip() for line in content.split('\n') if line.strip()]
+        self.build_search_index()
 
-            # 解析题目
-            self.questions = self.parse_questions(text_lines)
-            self.filtered_questions = self.questions.copy()
+    def show_mapped_bank(self, bank):
+        """映射模式：按原文顺序显示全部题目，题目在显示时解析（不支持题型筛选和搜索）"""
+        self.mapped = bank
+        self.questions = bank
+        if self.review_mode:
+            self.toggle_review()
+        self.filter_var.set("全部")
+        self.filter_questions()
 
-            # 填充题目列表
-            self.populate_question_list()
+    def close_mapped(self):
+        """关闭映射模式的题库（同时清空引用它的题目列表）"""
+        if self.mapped is not None:
+            if self.reset_scanner is not None:
+                # 计算指纹的线程可能仍在读取映射，等它结束后再关闭
+                self.reset_scanner.cancel()
+                self.reset_scanner.join()
+                self.reset_scanner = None
+            self.mapped.close()
+            self.mapped = None
+            self.questions = []
+            self.filtered_questions = []
+            self.question_listbox.set_count(0)
+
+    def mapped_unsupported(self, feature):
+        """映射模式下不支持需要整个题库的功能，返回 True 表示已提示"""
+        if self.mapped is None:
+            return False
+        messagebox.showinfo("提示", f"映射模式下题目在显示时才解析，不支持{feature}")
+        return True
+
+    def build_search_index(self):
+        """在后台线程中为当前题库构建搜索索引"""
+        self.stop_search_index()
+        if self.db_bank is not None:
+            import quiz_db
+            db_path, bank = self.db.path, self.db_bank
+
+            def rows():
+                # 在构建线程中使用独立的数据库连接
+                db = quiz_db.QuestionDB(db_path)
+                try:
+                    for q in db.iter_questions(bank):
+                        yield quiz_search.search_text(q), q.type_order
+                finally:
+                    db.close()
+        else:
+            questions = self.questions
 
-            # 显示第一题
-            if self.questions:
-                self.display_question(0)
+            def rows():
+                return ((quiz_search.search_text(q), q.type_order) for q in questions)
 
-            messagebox.showinfo("成功", f"题库加载成功！\n共 {len(self.questions)} 道题目")
+        self.search_builder = quiz_search.IndexBuilder(rows)
+        self.search_builder.start()
+        self.root.after(SEARCH_POLL_INTERVAL, self.poll_search_index, self.search_builder)
 
-        except UnicodeDecodeError:
-            # 尝试其他编码
-            try:
-                with open(txt_path, 'r', encoding='gbk') as f:
-                    content = f.read()
-                text_lines = [line.strip() for line in content.split('\n') if line.strip()]
-                self.questions = self.parse_questions(text_lines)
-                self.filtered_questions = self.questions.copy()
-                self.populate_question_list()
-                if self.questions:
-                    self.display_question(0)
-                messagebox.showinfo("成功", f"题库加载成功！\n共 {len(self.questions)} 道题目")
-            except Exception as e:
-                messagebox.showerror("错误", f"文件编码错误：{str(e)}")
-        except Exception as e:
-            messagebox.showerror("错误", f"加载文本文件失败：{str(e)}")
+    def poll_search_index(self, builder):
+        """索引构建完成后启用搜索框，已输入的查询立即生效"""
+        if builder is not self.search_builder:
+            return
+        if not builder.done:
+            self.root.after(SEARCH_POLL_INTERVAL, self.poll_search_index, builder)
+            return
+        self.search_builder = None
+        self.search_index = builder.index
+        self.search_entry.config(state='normal')
+        if self.search_var.get().strip():
+            self.filter_questions()
+
+    def stop_search_index(self):
+        """停止构建并丢弃当前的搜索索引"""
+        if self.search_builder is not None:
+            self.search_builder.cancel()
+            self.search_builder = None
+        self.search_index = None
+        self.search_entry.config(state='disabled')
 
     def parse_questions(self, lines):
         """解析题目文本"""
-        questions = []
-        current_question = {}
-
-        i = 0
-        while i < len(lines):
-            line = lines[i]
-
-            # 检测题目开始
-            question_match = re.match(r'^(\d+)\.\s*(.*)', line)
-            if question_match:
-                # 保存上一题
-                if current_question:
-                    questions.append(current_question)
-
-                # 开始新题
-                current_question = {
-                    'original_number': int(question_match.group(1)),  # 保留原始编号
-                    'question': question_match.group(2),
-                    'options': [],
-                    'answer': '',
-                    'analysis': '',
-                    'type': '未知'
-                }
-
-            # 检测选项
-            elif re.match(r'^[A-D]\.\s*', line):
-                if current_question:
-                    # 分离选项字母和内容
-                    parts = line.split('.', 1)
-                    if len(parts) == 2:
-                        option = {
-                            'letter': parts[0],
-                            'text': parts[1].strip()
-                        }
-                        current_question['options'].append(option)
-
-            # 检测答案和解析
-            elif line.startswith('答案：'):
-                if current_question:
-                    # 合并答案和解析
-                    answer_text = line.replace('答案：', '').strip()
-
-                    # 查看下一行是否有解析
-                    if i + 1 < len(lines) and lines[i + 1].startswith('解析：'):
-                        i += 1
-                        analysis_text = lines[i].replace('解析：', '').strip()
-                        # 合并答案和解析
-                        current_question['answer_analysis'] = f"{answer_text}\n\n解析：{analysis_text}"
-                    else:
-                        current_question['answer_analysis'] = answer_text
-
-                    # 单独保存答案
-                    current_question['answer'] = answer_text
-
-            # 检测单独的解析（用于其他格式）
-            elif line.startswith('解析：'):
-                if current_question:
-                    analysis_text = line.replace('解析：', '').strip()
-                    i += 1
-                    while i < len(lines) and not lines[i].startswith(('答案：', '解析：', str(len(questions) + 1) + '.')):
-                        if lines[i].strip() and not re.match(r'^\d+\.\s*', lines[i]):
-                            analysis_text += '\n' + lines[i].strip()
-                        i += 1
-                    i -= 1
-                    if 'answer_analysis' in current_question:
-                        current_question['answer_analysis'] += '\n\n' + analysis_text
-                    else:
-                        current_question['answer_analysis'] = analysis_text
-
-            i += 1
-
-        # 保存最后一题
-        if current_question:
-            questions.append(current_question)
-
-        # 根据选项和答案判断题型
-        for q in questions:
-            q['type'] = self.determine_question_type(q)
-
-        # 按题型分类并重新编号
-        questions = self.reorder_questions_by_type(questions)
-
-        return questions
+        return quiz_parser.parse_questions(lines)
 
     def reorder_questions_by_type(self, questions):
         """按题型分类并重新编号"""
-        # 分离不同题型
-        single_choice = []
-        multiple_choice = []
-        judge_questions = []
-
-        for q in questions:
-            if q['type'] == '单选题':
-                single_choice.append(q)
-            elif q['type'] == '多选题':
-                multiple_choice.append(q)
-            elif q['type'] == '判断题':
-                judge_questions.append(q)
-
-        # 重新编号
-        all_questions = []
-        question_number = 1
-
-        # 单选题
-        for q in single_choice:
-            q['number'] = question_number
-            q['type_order'] = 1  # 题型顺序
-            all_questions.append(q)
-            question_number += 1
-
-        # 多选题
-        for q in multiple_choice:
-            q['number'] = question_number
-            q['type_order'] = 2  # 题型顺序
-            all_questions.append(q)
-            question_number += 1
-
-        # 判断题
-        for q in judge_questions:
-            q['number'] = question_number
-            q['type_order'] = 3  # 题型顺序
-            all_questions.append(q)
-            question_number += 1
-
-        return all_questions
+        return quiz_parser.reorder_questions_by_type(questions)
 
     def determine_question_type(self, question):
         """根据选项和答案判断题型"""
-        # 检查是否是判断题
-        # 1. 如果选项只有2个且是"对"/"错"或"正确"/"错误"
-        # 2. 如果答案是"正确"/"错误"但没有选项
-        has_judge_options = False
-        if len(question['options']) == 2:
-            opt_texts = [opt['text'].strip() for opt in question['options']]
-            if ('对' in opt_texts and '错' in opt_texts) or ('正确' in opt_texts and '错误' in opt_texts):
-                has_judge_options = True
-
-        answer = question.get('answer', '').strip()
-        if has_judge_options or answer in ['正确', '错误', 'A', 'B']:
-            return '判断题'
-
-        # 根据答案格式判断其他题型
-        if '、' in answer:
-            # 答案包含顿号，是多选题
-            return '多选题'
-        elif answer in ['A', 'B', 'C', 'D'] or len(answer) == 1:
-            # 单个字母，单选题
-            return '单选题'
-        else:
-            # 默认为单选题
-            return '单选题'
+        return quiz_parser.determine_question_type(question)
+
+    def question_row_text(self, q):
+        """题目列表中一行的文本：答题状态、编号（按题型排序后的编号）和题型"""
+        status = "✓" if q.answered_correct else "✗" if q.answered else "○"
+        return f"{status} 第{q.number}题 {q.type}"
+
+    def list_row_text(self, index):
+        """虚拟列表的行文本回调（模考中只显示是否已作答，不显示对错）"""
+        question = self.filtered_questions[index]
+        if self.exam is not None:
+            return f"{'●' if index in self.exam.results else '○'} 第{index + 1}题 {question.type}"
+        return self.question_row_text(question)
+
+    def progress_text(self):
+        """顶部进度文本：当前题号，模考中附剩余时间"""
+        text = f"题目: {self.current_question_index + 1}/{len(self.filtered_questions)}"
+        if self.exam is not None:
+            remaining = max(0, int(self.exam_deadline - time.monotonic()))
+            text += f"  剩余 {remaining // 60:02d}:{remaining % 60:02d}"
+        elif self.review_mode:
+            text += "  (复习)"
+        return text
 
     def populate_question_list(self):
-        """填充题目列表"""
-        self.question_listbox.delete(0, tk.END)
-        for q in self.filtered_questions:
-            status = "✓" if q.get('answered_correct', False) else "✗" if q.get('answered', False) else "○"
-            # 显示新编号（按题型排序后的编号）和原始编号
-            self.question_listbox.insert(tk.END, f"{status} 第{q['number']}题 {q['type']}")
+        """填充题目列表（只渲染可见行）"""
+        self.question_listbox.set_count(len(self.filtered_questions))
+
+    def update_question_row(self, index):
+        """只更新题目列表中的一行（不在可见窗口内时无需处理），保持其选中状态"""
+        self.question_listbox.refresh_row(index)
 
     def display_question(self, index):
         """显示题目"""
@@ -615,170 +830,142 @@ class ModernQuizApp:
         self.current_question_index = index
         self.is_answered = False
         self.selected_options = set()
-        self.option_vars = []  # 重置选项变量
-        self.option_widgets = []  # 重置选项widget
 
         question = self.filtered_questions[index]
 
         # 更新进度
-        self.progress_var.set(f"题目: {index + 1}/{len(self.filtered_questions)}")
+        self.progress_var.set(self.progress_text())
 
         # 更新题目类型（显示新编号和原始编号）
-        if question.get('original_number'):
-            self.type_label.config(text=f"{question['type']} - 第{question['number']}题 (原{question['original_number']})")
-        else:
-            self.type_label.config(text=f"{question['type']} - 第{question['number']}题")
+        label = f"{question.type} - 第{question.number}题"
+        if question.original_number:
+            label += f" (原{question.original_number})"
+        if self.bank_count > 1 and question.source:
+            label += f" · {question.source}"
+        self.type_label.config(text=label)
 
         # 显示题目内容
         self.question_text.delete('1.0', 'end')
-        self.question_text.insert('1.0', question['question'])
+        self.question_text.insert('1.0', question.question)
         # 保持可滚动状态
         # self.question_text.config(state='disabled')
 
-        # 清除旧的结果显示
-        for widget in self.result_frame.winfo_children():
-            widget.destroy()
+        # 隐藏旧的结果显示
         self.result_frame.pack_forget()
 
-        # 清除旧的选项
-        for widget in self.options_container.winfo_children():
-            widget.destroy()
-
-        # 创建选项
-        if question['type'] == '判断题':
-            # 判断题
-            if len(question['options']) == 2:
-                # 有选项的判断题（A.对 B.错）
-                for i, option in enumerate(question['options']):
-                    self.create_option_frame(option['text'], i, option['letter'])
-            else:
-                # 没有选项的判断题，创建默认选项
-                self.create_option_frame('正确', 0, 'A')
-                self.create_option_frame('错误', 1, 'B')
-        else:
-            # 有选项的选择题
-            for i, option in enumerate(question['options']):
-                self.create_option_frame(option['text'], i, option['letter'])
+        # 显示选项（复用widget池；没有选项的判断题使用默认选项）
+        self.show_options(quiz_grading.display_options(question))
 
         # 更新列表选中状态
-        self.question_listbox.selection_clear(0, tk.END)
         self.question_listbox.selection_set(index)
         self.question_listbox.see(index)
 
         # 更新按钮状态
         self.prev_btn.config(state='normal' if index > 0 else 'disabled')
-        self.next_btn.config(state='normal' if index < len(self.filtered_questions) - 1 else 'disabled')
-        self.submit_btn.config(state='normal')
-
-    def create_option_frame(self, text, index, letter=None):
-        """创建可点击的选项框架（无装饰）"""
-        # 创建选项变量
-        if self.filtered_questions[self.current_question_index]['type'] == '多选题':
-            var = tk.BooleanVar()
-        else:
-            var = tk.IntVar()
-
-        self.option_vars.append(var)
-
-        # 创建选项框架（整个可点击）
+        has_next = self.review_mode or index < len(self.filtered_questions) - 1
+        self.next_btn.config(state='normal' if has_next else 'disabled')
+        answered = self.exam is not None and index in self.exam.results
+        self.submit_btn.config(state='disabled' if answered else 'normal')
+
+    def show_options(self, options):
+        """按 (字母, 文本) 序列显示选项：复用池中的widget，多余的隐藏"""
+        count = len(options)
+        while len(self.option_pool) < count:
+            self.option_pool.append(self.create_option_frame(len(self.option_pool)))
+
+        for i, (letter, text) in enumerate(options):
+            frame, label = self.option_pool[i]
+            frame.config(bg=self.colors['option_bg'], cursor='hand2')
+            label.config(text=f"{letter}. {text}" if letter else text,
+                         bg=self.colors['option_bg'], fg=self.colors['text'], cursor='hand2')
+            if i >= len(self.option_widgets):
+                frame.pack(fill='x', pady=5)
+
+        # 池中多余的widget总是位于末尾，隐藏后再显示时打包顺序不变
+        for frame, label in self.option_widgets[count:]:
+            frame.pack_forget()
+        self.option_widgets = self.option_pool[:count]
+
+    def create_option_frame(self, index):
+        """创建第 index 个可点击的选项框架（无装饰），事件只在创建时绑定一次"""
         option_frame = tk.Frame(self.options_container,
                                bg=self.colors['option_bg'],
                                cursor='hand2',
                                relief='solid',
                                bd=1)
-        option_frame.pack(fill='x', pady=5)
-
-        # 保存原始背景色
-        option_frame.original_bg = self.colors['option_bg']
-        option_frame.index = index
-        option_frame.var = var
 
         # 创建选项标签（无圆点方块）
         option_label = tk.Label(option_frame,
-                               text=f"{letter}. {text}" if letter else text,
                                font=self.fonts['option'],
                                bg=self.colors['option_bg'],
                                fg=self.colors['text'],
                                cursor='hand2')
         option_label.pack(side='left', padx=15, pady=12)
 
-        # 保存引用
-        self.option_widgets.append((option_frame, option_label))
-
-        # 绑定点击事件（框架和标签都要绑定）
-        click_command = lambda e=None, i=index: self.click_option(i)
-        option_frame.bind('<Button-1>', click_command)
-        option_label.bind('<Button-1>', click_command)
-
-        # 绑定鼠标悬停事件（仅在未选中且未答题时生效）
-        def on_enter(e):
-            if not self.is_answered and not self.is_option_selected(index):
-                option_frame.config(bg=self.colors['hover'])
-                option_label.config(bg=self.colors['hover'])
-
-        def on_leave(e):
-            if not self.is_answered:
-                # 根据选中状态决定背景色
-                if self.is_option_selected(index):
-                    # 选中时使用更深的蓝色
-                    option_frame.config(bg='#2b579a')
-                    option_label.config(bg='#2b579a')
-                else:
-                    option_frame.config(bg=self.colors['option_bg'])
-                    option_label.config(bg=self.colors['option_bg'])
-
-        option_frame.bind('<Enter>', on_enter)
-        option_frame.bind('<Leave>', on_leave)
-        option_label.bind('<Enter>', on_enter)
-        option_label.bind('<Leave>', on_leave)
+        # 绑定点击和鼠标悬停事件（框架和标签都要绑定），按下标查找当前状态
+        click_command = lambda e, i=index: self.click_option(i)
+        enter_command = lambda e, i=index: self.on_option_enter(i)
+        leave_command = lambda e, i=index: self.on_option_leave(i)
+        for widget in (option_frame, option_label):
+            widget.bind('<Button-1>', click_command)
+            widget.bind('<Enter>', enter_command)
+            widget.bind('<Leave>', leave_command)
+
+        return option_frame, option_label
+
+    def set_option_colors(self, index, bg, fg=None):
+        """设置选项框架和标签的颜色"""
+        frame, label = self.option_widgets[index]
+        frame.config(bg=bg)
+        if fg is None:
+            label.config(bg=bg)
+        else:
+            label.config(bg=bg, fg=fg)
+
+    def on_option_enter(self, index):
+        """鼠标悬停（仅在未选中且未答题时生效）"""
+        if not self.is_answered and not self.is_option_selected(index):
+            self.set_option_colors(index, self.colors['hover'])
+
+    def on_option_leave(self, index):
+        """鼠标离开：根据选中状态恢复背景色"""
+        if not self.is_answered:
+            if self.is_option_selected(index):
+                # 选中时使用更深的蓝色
+                self.set_option_colors(index, '#2b579a')
+            else:
+                self.set_option_colors(index, self.colors['option_bg'])
 
     def is_option_selected(self, index):
         """检查选项是否被选中"""
-        if self.filtered_questions[self.current_question_index]['type'] == '多选题':
-            return self.option_vars[index].get()
-        else:
-            return self.option_vars[index].get() == index
+        return index in self.selected_options
 
     def click_option(self, index):
         """点击选项"""
         if self.is_answered:
             return
 
-        question_type = self.filtered_questions[self.current_question_index]['type']
+        question_type = self.filtered_questions[self.current_question_index].type
 
         if question_type == '多选题':
             # 多选题切换选中状态
-            var = self.option_vars[index]
-            var.set(not var.get())
-            if var.get():
-                self.selected_options.add(index)
-                # 更新为选中颜色（深蓝色）
-                frame, label = self.option_widgets[index]
-                frame.config(bg='#2b579a')
-                label.config(bg='#2b579a', fg='white')
-            else:
+            if index in self.selected_options:
                 self.selected_options.discard(index)
                 # 恢复默认颜色
-                frame, label = self.option_widgets[index]
-                frame.config(bg=self.colors['option_bg'])
-                label.config(bg=self.colors['option_bg'], fg=self.colors['text'])
+                self.set_option_colors(index, self.colors['option_bg'], self.colors['text'])
+            else:
+                self.selected_options.add(index)
+                # 更新为选中颜色（深蓝色）
+                self.set_option_colors(index, '#2b579a', 'white')
         else:
-            # 单选题和判断题
+            # 单选题和判断题：只需恢复之前选中的选项
+            for i in self.selected_options:
+                if i != index:
+                    self.set_option_colors(i, self.colors['option_bg'], self.colors['text'])
             self.selected_options.clear()
             self.selected_options.add(index)
-
-            # 更新所有选项的状态
-            for i, (frame, label) in enumerate(self.option_widgets):
-                if i == index:
-                    self.option_vars[i].set(index)
-                    # 选中时使用深蓝色背景和白色文字
-                    frame.config(bg='#2b579a')
-                    label.config(bg='#2b579a', fg='white')
-                else:
-                    self.option_vars[i].set(-1)
-                    # 未选中时使用默认颜色
-                    frame.config(bg=self.colors['option_bg'])
-                    label.config(bg=self.colors['option_bg'], fg=self.colors['text'])
+            # 选中时使用深蓝色背景和白色文字
+            self.set_option_colors(index, '#2b579a', 'white')
 
     def toggle_option(self, index, var):
         """切换选项（已弃用）"""
@@ -802,6 +989,8 @@ class ModernQuizApp:
         """提交答案"""
         if self.is_answered:
             return
+        if self.exam is not None and self.current_question_index in self.exam.results:
+            return
 
         if not self.selected_options:
             messagebox.showwarning("提示", "请选择答案后再提交")
@@ -815,15 +1004,34 @@ class ModernQuizApp:
 
         if is_correct:
             self.correct_count += 1
-            question['answered_correct'] = True
-        question['answered'] = True
+            question.answered_correct = True
+        question.answered = True
+        fp = quiz_progress.fingerprint(question)
+        self.progress.record(fp, is_correct)
+        if self.db_bank is not None:
+            self.db.record_attempt(fp, is_correct)
+        if self.exam is not None:
+            # 模考中不显示对错，交卷后统一出成绩
+            self.exam.record(self.current_question_index, is_correct)
+            self.update_question_row(self.current_question_index)
+            self.disable_all_options()
+            self.submit_btn.config(state='disabled')
+            if len(self.exam.results) == len(self.exam):
+                self.finish_exam()
+            return
+
+        if self.scheduler is not None or self.sampler is not None:
+            stats = self.progress.get(fp)
+            if self.scheduler is not None:
+                self.scheduler.update(self.current_question_index, stats)
+            if self.sampler is not None:
+                self.sampler.update(self.current_question_index, quiz_schedule.weakness(stats))
 
         # 显示结果
         self.show_result(question, is_correct)
 
-        # 更新题目列表
-        self.populate_question_list()
-        self.question_listbox.selection_set(self.current_question_index)
+        # 只更新当前题目所在的一行
+        self.update_question_row(self.current_question_index)
 
         # 禁用提交按钮
         self.submit_btn.config(state='disabled')
@@ -836,97 +1044,60 @@ class ModernQuizApp:
 
     def check_answer(self, question):
         """检查答案是否正确"""
-        if question['type'] == '判断题':
-            if len(self.selected_options) == 1:
-                selected_index = list(self.selected_options)[0]
-
-                # 获取答案
-                answer = question.get('answer', '').strip()
-
-                # 根据选项判断选择的答案
-                if len(question['options']) == 2:
-                    # 有选项的判断题（A.对/正确 B.错/错误）
-                    selected_letter = chr(65 + selected_index)  # A或B
-
-                    # 先获取选项的文本内容来判断
-                    if selected_index < len(question['options']):
-                        option_text = question['options'][selected_index]['text'].strip()
-                        if '对' in option_text or '正确' in option_text:
-                            # 选择了"正确"
-                            return answer in ['A', '正确', '对', 'True']
-                        elif '错' in option_text or '错误' in option_text:
-                            # 选择了"错误"
-                            return answer in ['B', '错误', '错', 'False']
-                else:
-                    # 没有选项的判断题，自动创建的是"正确"/"错误"
-                    selected_answer = '正确' if selected_index == 0 else '错误'
-
-                    # 比较答案
-                    if answer in ['正确', '对', 'A', 'True']:
-                        return selected_answer == '正确'
-                    elif answer in ['错误', '错', 'B', 'False']:
-                        return selected_answer == '错误'
-                    else:
-                        # 直接比较
-                        return selected_answer == answer
-
-        elif question['type'] == '多选题':
-            selected_letters = sorted([chr(65 + i) for i in self.selected_options])
-            correct_letters = sorted([c.strip() for c in question.get('answer', '').split('、')])
-            return selected_letters == correct_letters
-
-        elif question['type'] == '单选题':
-            if len(self.selected_options) == 1:
-                selected_index = list(self.selected_options)[0]
-                selected_letter = chr(65 + selected_index)
-                return selected_letter == question.get('answer', '')
-
-        return False
-
-    def show_result(self, question, is_correct):
-        """显示答题结果"""
-        # 清除之前的结果
-        for widget in self.result_frame.winfo_children():
-            widget.destroy()
+        return quiz_grading.check_answer(question, self.selected_options)
 
-        # 创建分隔线
+    def create_result_widgets(self):
+        """创建答题结果区域的widget（只创建一次，每次答题时原地更新）"""
+        # 分隔线
         separator = tk.Frame(self.result_frame, height=1, bg=self.colors['border'])
         separator.pack(fill='x', pady=20)
 
-        # 创建结果标题
+        # 结果标题
+        self.result_label = tk.Label(self.result_frame,
+                                     font=('Microsoft YaHei UI', 16, 'bold'),
+                                     bg=self.colors['card_bg'])
+        self.result_label.pack(pady=(0, 10))
+
+        # 答案解析文本框（有合并的答案解析时显示）
+        self.answer_text = tk.Text(self.result_frame,
+                                   wrap='word',
+                                   font=self.fonts['option'],
+                                   bg=self.colors['option_bg'],
+                                   fg=self.colors['text'],
+                                   borderwidth=1,
+                                   relief='solid',
+                                   padx=15,
+                                   pady=10)
+
+        # 只显示答案的标签（没有合并的答案解析时显示）
+        self.answer_label = tk.Label(self.result_frame,
+                                     font=self.fonts['option'],
+                                     fg=self.colors['text'],
+                                     bg=self.colors['card_bg'])
+
+    def show_result(self, question, is_correct):
+        """显示答题结果"""
+        if not self.result_frame.winfo_children():
+            self.create_result_widgets()
+
+        # 更新结果标题
         result_text = "✓ 回答正确！" if is_correct else "✗ 回答错误"
         result_color = self.colors['success'] if is_correct else self.colors['error']
-
-        result_label = tk.Label(self.result_frame,
-                               text=result_text,
-                               font=('Microsoft YaHei UI', 16, 'bold'),
-                               fg=result_color,
-                               bg=self.colors['card_bg'])
-        result_label.pack(pady=(0, 10))
+        self.result_label.config(text=result_text, fg=result_color)
 
         # 显示答案和解析（合并显示）
-        if 'answer_analysis' in question:
-            # 创建答案解析文本框
-            answer_text = tk.Text(self.result_frame,
-                                 wrap='word',
-                                 font=self.fonts['option'],
-                                 bg=self.colors['option_bg'],
-                                 fg=self.colors['text'],
-                                 borderwidth=1,
-                                 relief='solid',
-                                 padx=15,
-                                 pady=10)
-            answer_text.pack(fill='x', pady=(0, 10))
-            answer_text.insert('1.0', question['answer_analysis'])
-            answer_text.config(state='disabled')
+        if question.answer_analysis is not None:
+            self.answer_label.pack_forget()
+            self.answer_text.config(state='normal')
+            self.answer_text.delete('1.0', 'end')
+            self.answer_text.insert('1.0', question.answer_analysis)
+            self.answer_text.config(state='disabled')
+            self.answer_text.pack(fill='x', pady=(0, 10))
         else:
             # 如果没有合并的答案解析，只显示答案
-            answer_label = tk.Label(self.result_frame,
-                                   text=f"正确答案：{question.get('answer', '')}",
-                                   font=self.fonts['option'],
-                                   fg=self.colors['text'],
-                                   bg=self.colors['card_bg'])
-            answer_label.pack()
+            self.answer_text.pack_forget()
+            self.answer_label.config(text=f"正确答案：{question.answer}")
+            self.answer_label.pack()
 
         self.result_frame.pack(fill='x', pady=(20, 0))
 
@@ -939,24 +1110,156 @@ class ModernQuizApp:
             self.display_question(self.current_question_index - 1)
 
     def next_question(self):
-        """下一题"""
-        if self.current_question_index < len(self.filtered_questions) - 1:
+        """下一题（复习模式下为最该复习的题目）"""
+        if self.review_mode:
+            index = self.review_scheduler().next(exclude=self.current_question_index)
+            if index is not None:
+                self.display_question(index)
+        elif self.current_question_index < len(self.filtered_questions) - 1:
             self.display_question(self.current_question_index + 1)
 
+    def weak_question(self):
+        """薄弱题：按错题数和最近答题结果加权随机抽题"""
+        if not self.filtered_questions or self.mapped_unsupported("薄弱题抽题"):
+            return
+        sampler = self.weak_sampler()
+        index = sampler.sample()
+        if index == self.current_question_index and len(sampler) > 1:
+            # 尽量不重复当前题目
+            index = sampler.sample()
+        self.display_question(index)
+
+    def weak_sampler(self):
+        """当前筛选结果的薄弱题抽样器；筛选或加载使题目变化后重新构建"""
+        if self.sampler is None or len(self.sampler) != len(self.filtered_questions):
+            get = self.progress.get
+            now = time.time()
+            self.sampler = quiz_schedule.WeightedSampler(
+                quiz_schedule.weakness(get(quiz_progress.fingerprint(q)), now) for q in self.filtered_questions)
+        return self.sampler
+
+    def toggle_exam(self):
+        """开始模考，模考进行中则交卷"""
+        if self.exam is not None:
+            if messagebox.askyesno("交卷", f"还有 {len(self.exam) - len(self.exam.results)} 道题未作答，确定交卷吗？"
+                                   if len(self.exam.results) < len(self.exam) else "确定交卷吗？"):
+                self.finish_exam()
+            return
+        if self.loading is not None:
+            messagebox.showwarning("提示", "题库加载完成后才能开始模考")
+            return
+        if self.mapped_unsupported("模考"):
+            return
+        # 多个题库时按来源分层抽题
+        banks = {}
+        for q in self.questions:
+            banks.setdefault(q.source, []).append(q)
+        generator = quiz_exam.ExamGenerator(list(banks.values()), self.exam_quotas,
+                                            stratify=len(banks) > 1, clamp=True)
+        paper = generator.generate()
+        if not len(paper):
+            messagebox.showwarning("提示", "题库中没有可用于模考的题目")
+            return
+        self.exam = paper
+        self.scheduler = self.sampler = None
+        self.exam_deadline = time.monotonic() + self.exam_minutes * 60
+        self.exam_btn.config(text="📝 交卷", bg=self.colors['primary'], fg='white', activeforeground='white')
+        self.filtered_questions = paper.questions
+        self.populate_question_list()
+        self.display_question(0)
+        self.exam_tick()
+
+    def exam_tick(self):
+        """刷新倒计时，时间到自动交卷"""
+        self.exam_timer = None
+        if self.exam is None:
+            return
+        if time.monotonic() >= self.exam_deadline:
+            self.finish_exam()
+            return
+        self.progress_var.set(self.progress_text())
+        self.exam_timer = self.root.after(EXAM_TICK_INTERVAL, self.exam_tick)
+
+    def finish_exam(self):
+        """交卷：显示按题型汇总的成绩，回到普通刷题"""
+        exam = self.exam
+        timed_out = time.monotonic() >= self.exam_deadline
+        self.stop_exam()
+        lines = [f"{name}：答对 {correct}/{total}（已答 {answered}）"
+                 for name, correct, answered, total in exam.summary()]
+        lines.append(f"\n总分：{exam.score():.1f}")
+        messagebox.showinfo("模考成绩", ("考试时间到，已自动交卷\n\n" if timed_out else "") + "\n".join(lines))
+        self.filter_questions()
+
+    def stop_exam(self):
+        """结束模考（不出成绩）"""
+        if self.exam_timer is not None:
+            self.root.after_cancel(self.exam_timer)
+            self.exam_timer = None
+        if self.exam is not None:
+            self.exam = None
+            self.exam_btn.config(text="📝 模考", bg='#ffffff', fg=self.colors['text'],
+                                 activeforeground=self.colors['text'])
+
+    def toggle_review(self):
+        """切换复习模式"""
+        if not self.review_mode and self.mapped_unsupported("复习模式"):
+            return
+        self.review_mode = not self.review_mode
+        if self.review_mode:
+            self.review_btn.config(bg=self.colors['primary'], fg='white', activeforeground='white')
+            self.next_question()
+        else:
+            self.review_btn.config(bg='#ffffff', fg=self.colors['text'], activeforeground=self.colors['text'])
+            if self.filtered_questions:
+                self.display_question(self.current_question_index)
+
+    def review_scheduler(self):
+        """当前筛选结果的复习队列；筛选或加载使题目变化后重新构建"""
+        if self.scheduler is None or self.scheduler_count != len(self.filtered_questions):
+            get = self.progress.get
+            self.scheduler = quiz_schedule.ReviewScheduler(
+                [get(quiz_progress.fingerprint(q)) for q in self.filtered_questions])
+            self.scheduler_count = len(self.filtered_questions)
+        return self.scheduler
+
     def random_question(self):
         """随机题目"""
         if self.filtered_questions:
             index = random.randint(0, len(self.filtered_questions) - 1)
             self.display_question(index)
 
-    def filter_questions(self, event=None):
-        """筛选题目"""
+    def select_filtered(self):
+        """按当前题型和搜索词筛选题目（数据库模式下为索引查询）"""
         filter_type = self.filter_var.get()
-
-        if filter_type == "全部":
+        query = self.search_var.get().strip()
+        self.scheduler = self.sampler = None
+
+        if self.mapped is not None:
+            self.filtered_questions = self.mapped
+        elif query and self.search_index is not None:
+            # 搜索结果为 self.questions 中的位置，已按题型筛选
+            positions = self.search_index.search(query, type=None if filter_type == "全部" else filter_type)
+            if self.db_bank is not None:
+                import quiz_db
+                ids = self.questions.ids
+                self.filtered_questions = quiz_db.QueryResult(self.db, array('q', (ids[i] for i in positions)))
+            else:
+                self.filtered_questions = [self.questions[i] for i in positions]
+        elif self.db_bank is not None:
+            self.filtered_questions = self.db.select(self.db_bank,
+                                                     type=None if filter_type == "全部" else filter_type)
+        elif filter_type == "全部":
             self.filtered_questions = self.questions.copy()
         else:
-            self.filtered_questions = [q for q in self.questions if q['type'] == filter_type]
+            self.filtered_questions = [q for q in self.questions if q.type == filter_type]
+
+    def filter_questions(self, event=None):
+        """筛选题目"""
+        if self.exam is not None:
+            # 模考中题目固定为试卷
+            return
+        self.select_filtered()
 
         # 重新填充列表
         self.populate_question_list()
@@ -972,33 +1275,96 @@ class ModernQuizApp:
 
     def reset_quiz(self):
         """重置答题进度"""
+        if self.exam is not None:
+            messagebox.showwarning("提示", "模考中不能重置答题记录，请先交卷")
+            return
+        if self.mapped is not None and self.loading is not None:
+            messagebox.showwarning("提示", "正在重置答题记录，请稍候")
+            return
         if messagebox.askyesno("确认", "确定要重置所有答题记录吗？"):
             # 清除所有答题状态
-            for q in self.questions:
-                q['answered'] = False
-                q['answered_correct'] = False
-
-            # 重置统计
-            self.correct_count = 0
-            self.total_answered = 0
+            if self.db_bank is not None:
+                import quiz_db
+                self.progress.reset(self.db.fingerprints(self.db_bank))
+                self.db.reset(self.db_bank)
+                # 丢弃按页缓存的题目（筛选结果只有数据库查询结果需要处理）
+                for result in (self.questions, self.filtered_questions):
+                    if isinstance(result, quiz_db.QueryResult):
+                        result.invalidate()
+            elif self.mapped is not None:
+                # 逐题计算指纹要解析整个文件，在后台线程中进行，完成后由 finish_mapped_reset 清除
+                self.start_mapped_reset()
+                return
+            else:
+                for q in self.questions:
+                    q.answered = False
+                    q.answered_correct = False
+                self.progress.reset(quiz_progress.fingerprint(q) for q in self.questions)
+            self.refresh_after_reset()
+
+    def start_mapped_reset(self):
+        """映射模式：在后台线程中逐题计算指纹，只找出有答题记录的题目"""
+        import quiz_mmap
+        self.reset_scanner = quiz_mmap.FingerprintScanner(self.mapped, self.progress.recorded())
+        self.watch_loader(self.reset_scanner, shown=True)
+
+    def finish_mapped_reset(self, fps):
+        """映射模式：清除找到的答题记录，再丢弃已缓存的题目"""
+        self.progress.reset(fps)
+        self.mapped.invalidate()
+        self.refresh_after_reset()
+
+    def refresh_after_reset(self):
+        """答题记录重置后清空统计，重新显示当前题目和列表"""
+        self.scheduler = self.sampler = None
+
+        # 重置统计
+        self.correct_count = 0
+        self.total_answered = 0
 
-            # 重新显示当前题目
-            if self.filtered_questions:
-                self.display_question(self.current_question_index)
+        # 重新显示当前题目
+        if self.filtered_questions:
+            self.display_question(self.current_question_index)
 
-            # 更新列表
-            self.populate_question_list()
-            self.question_listbox.selection_set(self.current_question_index)
+        # 更新列表（只重新渲染可见行）
+        self.populate_question_list()
+        self.question_listbox.selection_set(self.current_question_index)
+        self.question_listbox.see(self.current_question_index)
 
     def on_closing(self):
         """窗口关闭事件"""
         if messagebox.askokcancel("退出", "确定要退出刷题系统吗？"):
+            self.stop_loading()
+            self.close_mapped()
+            self.progress.close()
+            if self.db is not None:
+                self.db.close()
             self.root.destroy()
 
 
 def main():
+    parser = argparse.ArgumentParser(description="人力资源服务刷题系统")
+    parser.add_argument('--no-cache', action='store_true', help="不读取也不写入题库缓存")
+    parser.add_argument('--rebuild-cache', action='store_true', help="忽略已有缓存，重新解析并写入缓存")
+    parser.add_argument('--no-progress', action='store_true', help="不读取也不保存答题记录")
+    parser.add_argument('--db', metavar='PATH', help="使用 SQLite 题库数据库（导入后按页读取题目）")
+    parser.add_argument('--exam-quota', type=quiz_exam.parse_quotas, default=quiz_exam.DEFAULT_QUOTAS,
+                        help="模考各题型题数，如 60/20/20（题库不足时取全部）")
+    parser.add_argument('--exam-minutes', type=int, default=quiz_exam.DEFAULT_MINUTES, help="模考时长（分钟）")
+    parser.add_argument('--dedup', action='store_true', help="加载多个题库时合并重复和近似重复的题目")
+    parser.add_argument('--mmap', action='store_true',
+                        help="超大文本题库：内存映射并只建立题目位置索引，显示时才解析（按原文顺序，不支持筛选和搜索）")
+    args = parser.parse_args()
+
+    cache = quiz_cache.BankCache(enabled=not args.no_cache, rebuild=args.rebuild_cache)
+    progress = quiz_progress.ProgressStore(enabled=not args.no_progress)
+    db = None
+    if args.db:
+        import quiz_db
+        db = quiz_db.QuestionDB(args.db)
+
     root = tk.Tk()
-    app = ModernQuizApp(root)
+    app = ModernQuizApp(root, cache, progress, db, args.exam_quota, args.exam_minutes, args.dedup, args.mmap)
     root.mainloop()
 
 
@@ -0,0 +1,165 @@
+"""题库解析结果缓存模块
+
+把解析出的题目按批序列化到缓存目录，下次启动时若源文件未变化则直接
+读取缓存，跳过 python-docx 和文本解析。
+
+缓存文件由若干个连续的 pickle 组成：第一个是元数据（缓存格式版本、
+解析器版本、源文件路径、大小、修改时间和内容哈希），其后每个 pickle
+是一批按原文顺序排列的题目，与 BankLoader 放入队列的批次一致。
+
+有效性校验：格式版本与解析器版本一致、文件大小一致，且修改时间一致
+（快速路径）或内容哈希一致（例如文件被复制、touch 过）。
+"""
+import hashlib
+import os
+import pickle
+import time
+from pathlib import Path
+
+from quiz_parser import PARSER_VERSION
+
+# 缓存文件格式版本，格式变化时递增
+CACHE_FORMAT = 1
+
+CACHE_SUFFIX = '.cache'
+
+# 临时文件超过该时间（秒）未修改才视为残留：正在写入的临时文件（可能属于
+# 其他进程）持续更新修改时间，中途失败的由 CacheWriter.discard 自行删除
+STALE_TMP_AGE = 3600
+
+DEFAULT_CACHE_DIR = Path(__file__).resolve().parent / '.cache'
+
+
+def file_hash(path):
+    """计算文件内容哈希"""
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class BankCache:
+    """题库缓存目录
+
+    enabled=False 时既不读也不写缓存；rebuild=True 时忽略已有缓存并重新写入。
+    """
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR, enabled=True, rebuild=False):
+        self.directory = Path(directory)
+        self.enabled = enabled
+        self.rebuild = rebuild
+
+    def entry_path(self, source):
+        """源文件对应的缓存文件路径"""
+        key = hashlib.blake2b(str(Path(source).resolve()).encode('utf-8'), digest_size=8).hexdigest()
+        return self.directory / f"{Path(source).stem}.{key}{CACHE_SUFFIX}"
+
+    def load(self, source):
+        """读取有效缓存，返回逐批产出题目的迭代器；无有效缓存时返回 None"""
+        if not self.enabled or self.rebuild:
+            return None
+        try:
+            f = open(self.entry_path(source), 'rb')
+        except OSError:
+            return None
+        try:
+            meta = pickle.load(f)
+            fresh = self.is_fresh(meta, source)
+        except Exception:
+            fresh = False
+        if not fresh:
+            f.close()
+            return None
+        return self._iter_batches(f)
+
+    @staticmethod
+    def _iter_batches(f):
+        with f:
+            while True:
+                try:
+                    yield pickle.load(f)
+                except EOFError:
+                    return
+
+    def writer(self, source):
+        """创建缓存写入器；禁用缓存或无法写入时返回 None"""
+        if not self.enabled:
+            return None
+        try:
+            stat = os.stat(source)
+            meta = {
+                'format': CACHE_FORMAT,
+                'parser': PARSER_VERSION,
+                'source': str(Path(source).resolve()),
+                'size': stat.st_size,
+                'mtime_ns': stat.st_mtime_ns,
+                'hash': file_hash(source),
+            }
+            self.directory.mkdir(parents=True, exist_ok=True)
+            return CacheWriter(self.entry_path(source), meta)
+        except OSError:
+            return None
+
+    @staticmethod
+    def is_fresh(meta, source):
+        """检查缓存元数据是否与源文件和当前解析器一致"""
+        if meta.get('format') != CACHE_FORMAT or meta.get('parser') != PARSER_VERSION:
+            return False
+        try:
+            stat = os.stat(source)
+        except OSError:
+            return False
+        if stat.st_size != meta['size']:
+            return False
+        return stat.st_mtime_ns == meta['mtime_ns'] or file_hash(source) == meta['hash']
+
+    def prune(self):
+        """清除过期缓存：源文件已删除或已变化、版本不符，以及长时间未修改的残留临时文件"""
+        if not self.directory.is_dir():
+            return
+        now = time.time()
+        for path in self.directory.iterdir():
+            if path.suffix == '.tmp':
+                try:
+                    stale = now - path.stat().st_mtime > STALE_TMP_AGE
+                except OSError:
+                    continue
+            elif path.suffix == CACHE_SUFFIX:
+                try:
+                    with open(path, 'rb') as f:
+                        meta = pickle.load(f)
+                    stale = not self.is_fresh(meta, meta['source'])
+                except Exception:
+                    stale = True
+            else:
+                continue
+            if stale:
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+
+
+class CacheWriter:
+    """按批写入缓存，commit 时原子替换为正式缓存文件"""
+
+    def __init__(self, path, meta):
+        self.path = path
+        self.tmp_path = path.with_name(path.name + '.tmp')
+        self.f = open(self.tmp_path, 'wb')
+        pickle.dump(meta, self.f, pickle.HIGHEST_PROTOCOL)
+
+    def add(self, batch):
+        pickle.dump(batch, self.f, pickle.HIGHEST_PROTOCOL)
+
+    def commit(self):
+        self.f.close()
+        os.replace(self.tmp_path, self.path)
+
+    def discard(self):
+        self.f.close()
+        try:
+            self.tmp_path.unlink()
+        except OSError:
+            pass
@@ -0,0 +1,257 @@
+"""命令行刷题与批量判卷
+
+不依赖 tkinter，可在没有图形界面的服务器上运行：
+- drill：在终端中逐题作答，答题记录与图形界面共用（见 quiz_progress）
+- grade：批量判卷，读取 CSV 或 JSON Lines 格式的答题卡，输出每份答题卡
+  的答对数、作答数和得分
+
+判卷时有 numpy 则按批向量化计算（见 quiz_grading.BulkScorer），否则逐题判卷。
+答题卡中的题号为按题型重新编号后的题号（与界面列表一致），作答文本
+如 "A"、"A、C"、"AC"、"正确"。CSV 第一行为表头，第一列为答题卡编号，
+其余列名为题号；JSON Lines 每行形如
+    {"sheet": "张三", "answers": {"1": "A", "2": "A、C"}}
+answers 也可以是按题号顺序排列的列表。
+
+用法：
+    python quiz_cli.py drill [--bank 题库.txt] [--type 单选题] [--order random]
+    python quiz_cli.py grade 答题卡.csv [--bank 题库.txt] [--out 成绩.csv]
+"""
+import argparse
+import csv
+import json
+import random
+import sys
+import time
+from itertools import islice
+from pathlib import Path
+
+import quiz_cache
+import quiz_grading
+import quiz_loader
+import quiz_progress
+import quiz_schedule
+from quiz_parser import TYPE_ORDER
+
+DEFAULT_DOCX = Path("sets/人力资源服务赛项模块一题库.docx")
+
+ORDERS = ('sequential', 'random', 'review', 'weak')
+
+# 批量判卷时每批的答题卡数
+GRADE_CHUNK = 4096
+
+
+def default_bank():
+    """与界面相同的默认题库：优先 docx，其次 sets 目录下的第一个 txt"""
+    if DEFAULT_DOCX.exists():
+        return DEFAULT_DOCX
+    txt_files = sorted(Path("sets").glob("*.txt"))
+    return txt_files[0] if txt_files else None
+
+
+def load_questions(args):
+    bank = Path(args.bank) if args.bank else default_bank()
+    if bank is None or not bank.exists():
+        sys.exit("未找到题库文件，请用 --bank 指定")
+    cache = quiz_cache.BankCache(enabled=not args.no_cache)
+    if bank.is_dir():
+        # 目录：并行加载其中的全部题库并合并
+        paths = quiz_loader.find_banks(bank)
+        if not paths:
+            sys.exit(f"{bank} 中没有题库文件")
+        try:
+            questions, loader = quiz_loader.load_banks(paths, cache, dedup=args.dedup)
+        except ValueError as e:
+            sys.exit(str(e))
+        print(loader.report(), file=sys.stderr)
+        return questions
+    try:
+        return quiz_loader.load_bank(bank, cache)
+    except ValueError as e:
+        sys.exit(str(e))
+
+
+# ---- 刷题 ----
+
+def print_question(position, count, question):
+    print(f"\n[{position + 1}/{count}] {question.type} - 第{question.number}题")
+    print(question.question)
+    for option in quiz_grading.display_options(question):
+        print(f"  {option.letter}. {option.text}")
+
+
+def drill(args):
+    questions = load_questions(args)
+    if args.type:
+        questions = [q for q in questions if q.type == args.type]
+    if not questions:
+        sys.exit("没有符合条件的题目")
+
+    progress = quiz_progress.ProgressStore(enabled=not args.no_progress)
+    fingerprints = [quiz_progress.fingerprint(q) for q in questions]
+    stats = [progress.get(fp) for fp in fingerprints]
+    if args.order == 'review':
+        scheduler = quiz_schedule.ReviewScheduler(stats)
+    elif args.order == 'weak':
+        sampler = quiz_schedule.WeightedSampler(quiz_schedule.weakness(s) for s in stats)
+
+    answered = correct = 0
+    position = -1
+    try:
+        while args.count is None or answered < args.count:
+            if args.order == 'sequential':
+                position += 1
+                if position >= len(questions):
+                    break
+            elif args.order == 'random':
+                position = random.randrange(len(questions))
+            elif args.order == 'review':
+                position = scheduler.next(exclude=position)
+            else:
+                position = sampler.sample()
+
+            question = questions[position]
+            key = quiz_grading.AnswerKey(question)
+            print_question(position, len(questions), question)
+            while True:
+                text = input("答案（q 退出）：").strip()
+                if text.lower() == 'q':
+                    raise EOFError
+                selected = key.parse_response(text)
+                if selected:
+                    break
+                print("无法识别的答案，请输入选项字母，如 A 或 A、C")
+
+            is_correct = key.check(selected)
+            answered += 1
+            correct += is_correct
+            progress.record(fingerprints[position], is_correct)
+            if args.order == 'review':
+                scheduler.update(position, progress.get(fingerprints[position]))
+            elif args.order == 'weak':
+                sampler.update(position, quiz_schedule.weakness(progress.get(fingerprints[position])))
+
+            print("✓ 回答正确！" if is_correct else "✗ 回答错误")
+            if question.answer_analysis is not None:
+                print(question.answer_analysis)
+            else:
+                print(f"正确答案：{question.answer}")
+    except (EOFError, KeyboardInterrupt):
+        print()
+    finally:
+        progress.close()
+
+    if answered:
+        print(f"共答 {answered} 题，答对 {correct} 题，正确率 {100 * correct / answered:.1f}%")
+
+
+# ---- 批量判卷 ----
+
+def read_csv_sheets(f):
+    """CSV 答题卡：按批产出 (编号列表, 作答文本行, 题号列表, 各答题卡的题数)"""
+    reader = csv.reader(f)
+    header = next(reader, None)
+    if header is None:
+        return
+    numbers = [int(name) for name in header[1:]]
+    width = len(numbers)
+    while True:
+        chunk = [row for row in islice(reader, GRADE_CHUNK) if row]
+        if not chunk:
+            return
+        # 列数不足的行补空作答
+        rows = [row[1:] if len(row) > width else row[1:] + [''] * (width + 1 - len(row)) for row in chunk]
+        yield [row[0] for row in chunk], rows, numbers, [width] * len(chunk)
+
+
+def read_jsonl_sheets(f):
+    """JSON Lines 答题卡：按批产出 (编号列表, 作答文本行, 题号列表, 各答题卡的题数)
+
+    每份答题卡的题数为其 answers 中列出的题数（含空作答）。
+    """
+    lines = enumerate(f, 1)
+    while True:
+        names = []
+        sheets = []
+        for line_number, line in islice(lines, GRADE_CHUNK):
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            answers = record['answers']
+            if isinstance(answers, list):
+                answers = dict(enumerate(answers, 1))
+            else:
+                answers = {int(number): text for number, text in answers.items()}
+            names.append(record.get('sheet', line_number))
+            sheets.append(answers)
+        if not names:
+            return
+        numbers = sorted(set().union(*sheets))
+        yield (names, [[answers.get(number, '') for number in numbers] for answers in sheets], numbers,
+               [len(answers) for answers in sheets])
+
+
+def grade(args):
+    questions = load_questions(args)
+    columns = {q.number: column for column, q in enumerate(questions)}
+    scorer = quiz_grading.sheet_scorer([quiz_grading.AnswerKey(q) for q in questions], args.partial)
+    fmt = args.format or ('csv' if args.sheets.lower().endswith('.csv') else 'jsonl')
+    reader = read_csv_sheets if fmt == 'csv' else read_jsonl_sheets
+
+    out = open(args.out, 'w', encoding='utf-8', newline='') if args.out else sys.stdout
+    writer = csv.writer(out)
+    writer.writerow(['sheet', 'correct', 'answered', 'total', 'score'])
+    count = 0
+    start = time.perf_counter()
+    try:
+        with open(args.sheets, 'r', encoding='utf-8-sig', newline='') as f:
+            # 按批判卷（有 numpy 时每批一次向量化计算）
+            for names, rows, numbers, totals in reader(f):
+                unknown = [number for number in numbers if number not in columns]
+                if unknown:
+                    sys.exit(f"题库中没有第 {unknown[0]} 题")
+                correct, answered, credit = scorer.grade(rows, [columns[number] for number in numbers])
+                # 百分制成绩按答题卡上的题数换算，而不是整个题库的题数
+                scores = quiz_grading.percentages(credit, totals)
+                for sheet, sheet_correct, sheet_answered, total, score in zip(names, correct, answered,
+                                                                              totals, scores):
+                    writer.writerow([sheet, int(sheet_correct), int(sheet_answered), total, f"{score:.1f}"])
+                count += len(names)
+    except (ValueError, KeyError, TypeError) as e:
+        sys.exit(f"答题卡格式错误：{e}")
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    elapsed = time.perf_counter() - start
+    rate = f"，{count / elapsed:,.0f} 份/秒" if elapsed > 0 else ""
+    print(f"判卷 {count} 份，用时 {elapsed:.2f} 秒{rate}", file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="命令行刷题与批量判卷")
+    parser.add_argument('--bank', help="题库文件（.txt 或 .docx）或目录（加载其中全部题库），默认与界面相同")
+    parser.add_argument('--no-cache', action='store_true', help="不读取也不写入题库缓存")
+    parser.add_argument('--dedup', action='store_true', help="--bank 为目录时合并重复和近似重复的题目")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    drill_parser = subparsers.add_parser('drill', help="在终端中刷题")
+    drill_parser.add_argument('--type', choices=sorted(TYPE_ORDER, key=TYPE_ORDER.get), help="只做该题型")
+    drill_parser.add_argument('--order', choices=ORDERS, default='sequential',
+                              help="出题顺序：顺序、随机、间隔复习或薄弱题")
+    drill_parser.add_argument('--count', type=int, help="答满该题数后结束")
+    drill_parser.add_argument('--no-progress', action='store_true', help="不读取也不保存答题记录")
+    drill_parser.set_defaults(handler=drill)
+
+    grade_parser = subparsers.add_parser('grade', help="批量判卷")
+    grade_parser.add_argument('sheets', help="答题卡文件（.csv 或 .jsonl）")
+    grade_parser.add_argument('--format', choices=('csv', 'jsonl'), help="答题卡格式，默认按扩展名判断")
+    grade_parser.add_argument('--out', help="成绩输出文件（CSV），默认输出到标准输出")
+    grade_parser.add_argument('--partial', choices=quiz_grading.PARTIAL_RULES, default='none',
+                              help="多选题少选的部分得分：不给分、得一半分或按选对比例得分")
+    grade_parser.set_defaults(handler=grade)
+
+    args = parser.parse_args()
+    args.handler(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,339 @@
+"""SQLite 题库数据库模块（可选）
+
+把题目、选项和答题记录保存在一个 SQLite 文件中，用索引代替对 Python
+列表的线性扫描：按题库、题型、答题状态筛选（例如“题库 X 中未答的多选题”）
+都是索引查询。界面通过 QueryResult 按页读取题目，不必把整个题库留在内存中。
+
+表结构：
+- banks：题库文件（路径、大小、修改时间、解析器版本、是否导入完成）
+- questions：题目，type_rank 为题目在同题型中的原文顺序，number 为按题型
+  排序后的编号；state 为答题状态（0 未答、1 答过但未答对、2 答对过）
+- options：选项
+- attempts：答题记录，按题目指纹保存（指纹见 quiz_progress.fingerprint）
+
+导入由 BankImporter 在加载线程中完成：每批题目一次 executemany，整个
+题库一个事务，导入完成时提交。每个线程使用自己的 QuestionDB 连接。
+"""
+import os
+import sqlite3
+import time
+from array import array
+from collections import OrderedDict
+from pathlib import Path
+
+import quiz_progress
+from quiz_parser import PARSER_VERSION, TYPE_ORDER, Option, Question
+
+# 数据库结构版本，结构变化时递增
+SCHEMA_VERSION = 1
+
+# 答题状态
+STATE_UNANSWERED = 0
+STATE_WRONG = 1
+STATE_CORRECT = 2
+
+# 每页读取的题目数及缓存的页数
+PAGE_SIZE = 200
+CACHED_PAGES = 8
+
+# 构造题目时读取的列（见 _question）
+QUESTION_COLUMNS = 'id, original_number, number, question, answer, answer_analysis, type, state'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS banks (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    parser INTEGER NOT NULL,
+    complete INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS questions (
+    id INTEGER PRIMARY KEY,
+    bank_id INTEGER NOT NULL REFERENCES banks(id) ON DELETE CASCADE,
+    type_order INTEGER NOT NULL,
+    type_rank INTEGER NOT NULL,
+    number INTEGER NOT NULL DEFAULT 0,
+    original_number INTEGER,
+    question TEXT NOT NULL,
+    answer TEXT NOT NULL,
+    answer_analysis TEXT,
+    type TEXT NOT NULL,
+    fingerprint INTEGER NOT NULL,
+    state INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS options (
+    question_id INTEGER NOT NULL REFERENCES questions(id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    letter TEXT NOT NULL,
+    text TEXT NOT NULL,
+    PRIMARY KEY (question_id, position)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS attempts (
+    id INTEGER PRIMARY KEY,
+    fingerprint INTEGER NOT NULL,
+    correct INTEGER NOT NULL,
+    time REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS questions_bank_type ON questions (bank_id, type_order, type_rank);
+CREATE INDEX IF NOT EXISTS questions_bank_state ON questions (bank_id, state, type_order, type_rank);
+CREATE INDEX IF NOT EXISTS questions_type_state ON questions (type_order, state);
+CREATE INDEX IF NOT EXISTS questions_fingerprint ON questions (fingerprint);
+CREATE INDEX IF NOT EXISTS attempts_fingerprint ON attempts (fingerprint);
+"""
+
+
+def signed(fp):
+    """把 64 位无符号指纹转换为 SQLite 可保存的有符号整数"""
+    return fp - (1 << 64) if fp >= 1 << 63 else fp
+
+
+def unsigned(value):
+    return value + (1 << 64) if value < 0 else value
+
+
+class QuestionDB:
+    """题库数据库连接（不可跨线程使用）"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.conn = sqlite3.connect(str(self.path))
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.execute('PRAGMA foreign_keys=ON')
+        version = self.conn.execute('PRAGMA user_version').fetchone()[0]
+        if version != SCHEMA_VERSION:
+            with self.conn:
+                for table in ('options', 'questions', 'banks'):
+                    self.conn.execute(f'DROP TABLE IF EXISTS {table}')
+                self.conn.executescript(SCHEMA)
+                self.conn.execute(f'PRAGMA user_version={SCHEMA_VERSION}')
+
+    def close(self):
+        self.conn.close()
+
+    # ---- 题库 ----
+
+    def bank_id(self, source):
+        """已完整导入且与源文件一致的题库 id，否则返回 None"""
+        try:
+            stat = os.stat(source)
+        except OSError:
+            return None
+        row = self.conn.execute(
+            'SELECT id FROM banks WHERE path = ? AND size = ? AND mtime_ns = ? AND parser = ? AND complete',
+            (str(Path(source).resolve()), stat.st_size, stat.st_mtime_ns, PARSER_VERSION)).fetchone()
+        return row[0] if row else None
+
+    def importer(self, source):
+        """开始导入题库（替换同一路径的旧数据），返回 BankImporter"""
+        return BankImporter(self, source)
+
+    # ---- 查询 ----
+
+    def select(self, bank_id=None, type=None, state=None):
+        """按题库、题型、答题状态筛选题目，按题型和原文顺序排列"""
+        where, params = [], []
+        if bank_id is not None:
+            where.append('bank_id = ?')
+            params.append(bank_id)
+        if state is not None:
+            where.append('state = ?')
+            params.append(state)
+        if type is not None:
+            where.append('type_order = ?')
+            params.append(TYPE_ORDER[type])
+        sql = 'SELECT id FROM questions'
+        if where:
+            sql += ' WHERE ' + ' AND '.join(where)
+        sql += ' ORDER BY type_order, type_rank' if bank_id is not None else ' ORDER BY bank_id, type_order, type_rank'
+        ids = array('q', (row[0] for row in self.conn.execute(sql, params)))
+        return QueryResult(self, ids)
+
+    def fetch(self, ids):
+        """按 id 读取题目（含选项），返回与 ids 顺序一致的 Question 列表"""
+        marks = ','.join('?' * len(ids))
+        questions = {row[0]: _question(row) for row in self.conn.execute(
+            f'SELECT {QUESTION_COLUMNS} FROM questions WHERE id IN ({marks})', ids)}
+        options = {}
+        for qid, letter, text in self.conn.execute(
+                f'SELECT question_id, letter, text FROM options WHERE question_id IN ({marks}) '
+                'ORDER BY question_id, position', ids):
+            options.setdefault(qid, []).append(Option(letter, text))
+        for qid, q in questions.items():
+            q.options = tuple(options.get(qid, ()))
+        return [questions[qid] for qid in ids]
+
+    def iter_questions(self, bank_id):
+        """按 select(bank_id) 的顺序逐题产出题库中的题目（含选项）"""
+        options = self.conn.execute(
+            'SELECT o.question_id, o.letter, o.text FROM questions q JOIN options o ON o.question_id = q.id '
+            'WHERE q.bank_id = ? ORDER BY q.type_order, q.type_rank, o.position', (bank_id,))
+        pending = next(options, None)
+        for row in self.conn.execute(
+                f'SELECT {QUESTION_COLUMNS} FROM questions WHERE bank_id = ? ORDER BY type_order, type_rank',
+                (bank_id,)):
+            q = _question(row)
+            question_options = []
+            while pending is not None and pending[0] == row[0]:
+                question_options.append(Option(pending[1], pending[2]))
+                pending = next(options, None)
+            q.options = tuple(question_options)
+            yield q
+
+    def fingerprints(self, bank_id):
+        """题库中所有题目的指纹"""
+        return [unsigned(row[0]) for row in self.conn.execute(
+            'SELECT fingerprint FROM questions WHERE bank_id = ?', (bank_id,))]
+
+    # ---- 答题记录 ----
+
+    def apply_progress(self, bank_id, progress):
+        """按答题记录（quiz_progress.ProgressStore）更新题库中各题的答题状态，
+        返回该题库的 (答题次数, 答对次数)"""
+        updates = []
+        attempts = correct = 0
+        for qid, fp, state in self.conn.execute(
+                'SELECT id, fingerprint, state FROM questions WHERE bank_id = ?', (bank_id,)).fetchall():
+            stats = progress.get(unsigned(fp))
+            if stats is None:
+                new_state = STATE_UNANSWERED
+            else:
+                new_state = STATE_CORRECT if stats.correct else STATE_WRONG
+                attempts += stats.attempts
+                correct += stats.correct
+            if new_state != state:
+                updates.append((new_state, qid))
+        if updates:
+            with self.conn:
+                self.conn.executemany('UPDATE questions SET state = ? WHERE id = ?', updates)
+        return attempts, correct
+
+    def record_attempt(self, fp, correct):
+        """记录一次答题，并更新所有同指纹题目的答题状态"""
+        fp = signed(fp)
+        with self.conn:
+            self.conn.execute('INSERT INTO attempts (fingerprint, correct, time) VALUES (?, ?, ?)',
+                              (fp, int(correct), time.time()))
+            self.conn.execute('UPDATE questions SET state = MAX(state, ?) WHERE fingerprint = ?',
+                              (STATE_CORRECT if correct else STATE_WRONG, fp))
+
+    def reset(self, bank_id):
+        """清除题库中所有题目的答题记录和答题状态"""
+        with self.conn:
+            self.conn.execute('DELETE FROM attempts WHERE fingerprint IN '
+                              '(SELECT fingerprint FROM questions WHERE bank_id = ?)', (bank_id,))
+            self.conn.execute('UPDATE questions SET state = ? WHERE bank_id = ? AND state != ?',
+                              (STATE_UNANSWERED, bank_id, STATE_UNANSWERED))
+
+
+def _question(row):
+    """由 QUESTION_COLUMNS 对应的一行构造题目（不含选项）"""
+    qid, original_number, number, text, answer, answer_analysis, qtype, state = row
+    q = Question(original_number, text)
+    q.number = number
+    q.answer = answer
+    q.answer_analysis = answer_analysis
+    q.type = qtype
+    q.answered = state != STATE_UNANSWERED
+    q.answered_correct = state == STATE_CORRECT
+    return q
+
+
+class BankImporter:
+    """在一个事务中按批导入题库，commit 时提交，discard 时回滚"""
+
+    def __init__(self, db, source):
+        self.db = db
+        self.source = source
+        self.conn = db.conn
+        self.ranks = dict.fromkeys(TYPE_ORDER.values(), 0)  # 各题型已导入的题目数
+        stat = os.stat(source)
+        path = str(Path(source).resolve())
+        self.conn.execute('BEGIN')
+        self.conn.execute('DELETE FROM banks WHERE path = ?', (path,))
+        self.bank_id = self.conn.execute(
+            'INSERT INTO banks (path, size, mtime_ns, parser) VALUES (?, ?, ?, ?)',
+            (path, stat.st_size, stat.st_mtime_ns, PARSER_VERSION)).lastrowid
+        self.next_id = self.conn.execute('SELECT COALESCE(MAX(id), 0) + 1 FROM questions').fetchone()[0]
+
+    def add(self, batch):
+        """导入一批按原文顺序排列的题目"""
+        rows, option_rows = [], []
+        for q in batch:
+            order = TYPE_ORDER[q.type]
+            self.ranks[order] += 1
+            qid = self.next_id
+            self.next_id += 1
+            rows.append((qid, self.bank_id, order, self.ranks[order], q.original_number, q.question,
+                         q.answer, q.answer_analysis, q.type, signed(quiz_progress.fingerprint(q))))
+            option_rows.extend((qid, position, o.letter, o.text) for position, o in enumerate(q.options))
+        self.conn.executemany(
+            'INSERT INTO questions (id, bank_id, type_order, type_rank, original_number, question, '
+            'answer, answer_analysis, type, fingerprint) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)', rows)
+        self.conn.executemany('INSERT INTO options VALUES (?, ?, ?, ?)', option_rows)
+
+    def commit(self):
+        """按题型连续编号（单选、多选、判断），标记导入完成并提交"""
+        offsets, total = {}, 0
+        for order in sorted(self.ranks):
+            offsets[order] = total
+            total += self.ranks[order]
+        self.conn.execute(
+            'UPDATE questions SET number = type_rank + CASE type_order '
+            + ' '.join(f'WHEN {order} THEN {offset}' for order, offset in offsets.items())
+            + ' END WHERE bank_id = ?', (self.bank_id,))
+        self.conn.execute('UPDATE banks SET complete = 1 WHERE id = ?', (self.bank_id,))
+        self.conn.commit()
+
+    def discard(self):
+        self.conn.rollback()
+
+    def restart(self):
+        """回滚后重新开始导入同一题库"""
+        return BankImporter(self.db, self.source)
+
+
+class QueryResult:
+    """查询结果：只保存题目 id，题目按页读取并缓存最近使用的若干页
+
+    支持 len() 和下标访问，可直接作为界面的 filtered_questions 使用。
+    """
+
+    def __init__(self, db, ids):
+        self.db = db
+        self.ids = ids
+        self.pages = OrderedDict()  # 页号 -> Question 列表
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self.ids)
+        if not 0 <= index < len(self.ids):
+            raise IndexError(index)
+        page_number, offset = divmod(index, PAGE_SIZE)
+        page = self.pages.get(page_number)
+        if page is None:
+            start = page_number * PAGE_SIZE
+            page = self.pages[page_number] = self.db.fetch(self.ids[start:start + PAGE_SIZE].tolist())
+            if len(self.pages) > CACHED_PAGES:
+                self.pages.popitem(last=False)
+        else:
+            self.pages.move_to_end(page_number)
+        return page[offset]
+
+    def __iter__(self):
+        for index in range(len(self.ids)):
+            yield self[index]
+
+    def find(self, fp):
+        """指纹为 fp 的第一道题在结果中的下标，不存在时返回 -1"""
+        ids = {row[0] for row in self.db.conn.execute(
+            'SELECT id FROM questions WHERE fingerprint = ?', (signed(fp),))}
+        return next((index for index, qid in enumerate(self.ids) if qid in ids), -1)
+
+    def invalidate(self):
+        """清空页缓存（答题状态在数据库中批量变化后调用）"""
+        self.pages.clear()
@@ -0,0 +1,298 @@
+"""题目去重模块
+
+合并多个题库后，同一道题常以略有不同的措辞或选项顺序重复出现。本模块
+在解析之后查找重复题目：
+- 完全重复：题干、选项（排序后）和正确答案（以正确选项的文字表示，
+  不受选项顺序影响）规范化后相同，按哈希分组，O(n)
+- 近似重复：对题干和选项的字符 3-gram（shingle）计算 MinHash 签名，
+  用 LSH 分段分桶只比较同桶的题目，再用真实的 Jaccard 相似度核对，
+  整体接近 O(n)，10 万道题无需两两比较
+
+签名采用单次排列 MinHash（one permutation hashing）：每个 shingle 只
+计算一次 CRC32，按低位分到 SIGNATURE_BINS 个桶中各取最小值，空桶从
+右侧最近的非空桶借值（densification）。签名分为 BANDS 段、每段
+SIGNATURE_BINS / BANDS 个值，任一段相同即成为候选。
+
+近似重复但正确答案不同的题目（如"属于"与"不属于"）不合并，在报告中
+列为答案冲突。collapse 把每组重复题合并为一道（保留最先出现的一道，
+来源合并）。
+
+命令行：python quiz_dedup.py sets/ [--threshold 0.8] [--collapse 输出.jsonl]
+"""
+import argparse
+import hashlib
+import json
+import re
+import sys
+import time
+import unicodedata
+import zlib
+from collections import defaultdict, namedtuple
+from pathlib import Path
+
+from quiz_grading import JUDGE_FALSE, JUDGE_TRUE, AnswerKey, display_options
+
+# shingle 长度（字符）
+SHINGLE_SIZE = 3
+
+# 签名长度与 LSH 段数：每段 4 个值，Jaccard 约 0.6 时成为候选的概率为一半
+SIGNATURE_BINS = 32
+BANDS = 8
+ROWS = SIGNATURE_BINS // BANDS
+
+# 判定为近似重复的 Jaccard 相似度下限
+DEFAULT_THRESHOLD = 0.8
+
+# 合并来源时的分隔符
+SOURCE_SEPARATOR = '、'
+
+# 报告中每类最多列出的组数
+REPORT_LIMIT = 20
+
+# 规范化时去掉的字符：空白、标点和符号（汉字、字母和数字保留）
+NOISE_RE = re.compile(r'[\W_]+')
+
+# 一组重复题目：kind 为 'exact' 或 'near'，members 为题目下标（升序）
+DuplicateGroup = namedtuple('DuplicateGroup', ['kind', 'members'])
+
+
+def normalize(text):
+    """全角转半角、转小写，去掉空白和标点"""
+    return NOISE_RE.sub('', unicodedata.normalize('NFKC', text).lower())
+
+
+def canonical_answer(question):
+    """与选项顺序无关的正确答案：判断题为 T/F，其余为正确选项的文字"""
+    if question.type == '判断题':
+        answer = question.answer.strip()
+        return 'T' if answer in JUDGE_TRUE else 'F' if answer in JUDGE_FALSE else normalize(answer)
+    accepted = AnswerKey(question).accepted
+    if not accepted:
+        return normalize(question.answer)
+    options = display_options(question)
+    return '\x1e'.join(sorted(normalize(options[i].text) for i in accepted))
+
+
+def content_text(question):
+    """参与相似度比较的文本：题干和排序后的选项（判断题只比较题干）"""
+    stem = normalize(question.question)
+    if question.type == '判断题':
+        return stem
+    return stem + '\x1f' + '\x1e'.join(sorted(normalize(option.text) for option in question.options))
+
+
+def exact_key(question, content, answer):
+    return hashlib.blake2b('\x1d'.join((question.type, content, answer)).encode('utf-8'), digest_size=16).digest()
+
+
+def shingles(text):
+    """字符 shingle 集合（文本短于 SHINGLE_SIZE 时为整个文本）"""
+    if len(text) <= SHINGLE_SIZE:
+        return {text}
+    return {text[i:i + SHINGLE_SIZE] for i in range(len(text) - SHINGLE_SIZE + 1)}
+
+
+def jaccard(a, b):
+    return len(a & b) / len(a | b) if a or b else 1.0
+
+
+def signature(shingle_set):
+    """单次排列 MinHash 签名（长度 SIGNATURE_BINS）"""
+    empty = 1 << 32
+    mins = [empty] * SIGNATURE_BINS
+    for h in map(zlib.crc32, map(str.encode, shingle_set)):
+        b = h % SIGNATURE_BINS
+        if h < mins[b]:
+            mins[b] = h
+    # 空桶向右（循环）借最近的非空桶的值，并加上距离以区分
+    if empty in mins:
+        for i in range(SIGNATURE_BINS):
+            if mins[i] == empty:
+                for distance in range(1, SIGNATURE_BINS):
+                    value = mins[(i + distance) % SIGNATURE_BINS]
+                    if value < empty:
+                        mins[i] = value + (distance << 32)
+                        break
+    return mins
+
+
+class UnionFind:
+    def __init__(self, n):
+        self.parent = list(range(n))
+
+    def find(self, x):
+        parent = self.parent
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    def union(self, a, b):
+        """合并两个集合，代表元取较小的下标"""
+        a, b = self.find(a), self.find(b)
+        if a != b:
+            if b < a:
+                a, b = b, a
+            self.parent[b] = a
+
+
+class DedupResult:
+    """去重结果：重复组、答案冲突的近似重复对和耗时"""
+
+    def __init__(self, count, groups, conflicts, seconds):
+        self.count = count
+        self.groups = groups
+        self.conflicts = conflicts      # [(下标, 下标, 相似度)]
+        self.seconds = seconds
+
+    @property
+    def removed(self):
+        """合并后去掉的题目数"""
+        return sum(len(group.members) - 1 for group in self.groups)
+
+
+def find_duplicates(questions, threshold=DEFAULT_THRESHOLD):
+    """查找完全重复和近似重复的题目"""
+    start = time.perf_counter()
+    n = len(questions)
+    contents = [content_text(q) for q in questions]
+    answers = [canonical_answer(q) for q in questions]
+    union = UnionFind(n)
+
+    # 完全重复：按规范化内容和答案的哈希分组
+    keys = [exact_key(*item) for item in zip(questions, contents, answers)]
+    first = {}
+    for i, key in enumerate(keys):
+        j = first.setdefault(key, i)
+        if j != i:
+            union.union(j, i)
+    representatives = [i for i in range(n) if union.find(i) == i]
+
+    # 近似重复：每组完全重复只取代表，按 LSH 分段分桶
+    shingle_cache = {}
+
+    def shingle_set(i):
+        if i not in shingle_cache:
+            shingle_cache[i] = shingles(contents[i])
+        return shingle_cache[i]
+
+    buckets = {}
+    conflicts = {}
+    for i in representatives:
+        sig = signature(shingles(contents[i]))
+        for band in range(BANDS):
+            j = buckets.setdefault((band, *sig[band * ROWS:(band + 1) * ROWS]), i)
+            if j == i or questions[i].type != questions[j].type or union.find(j) == union.find(i):
+                continue
+            # 同桶只与桶中第一道题核对，每道题每段最多比较一次
+            similarity = jaccard(shingle_set(i), shingle_set(j))
+            if similarity < threshold:
+                continue
+            if answers[i] != answers[j]:
+                conflicts[j, i] = similarity
+                continue
+            union.union(j, i)
+        shingle_cache.pop(i, None)
+
+    members = defaultdict(list)
+    for i in range(n):
+        members[union.find(i)].append(i)
+    # 组内哈希都相同的为完全重复，含近似重复的为 near（members 按下标升序）
+    groups = [DuplicateGroup('exact' if len({keys[i] for i in group}) == 1 else 'near', group)
+              for group in members.values() if len(group) > 1]
+    groups.sort(key=lambda group: group.members[0])
+    conflicts = [(i, j, similarity) for (i, j), similarity in conflicts.items()]
+    return DedupResult(n, groups, conflicts, time.perf_counter() - start)
+
+
+def merge_sources(questions):
+    """合并一组题目的来源（去重，保持顺序）"""
+    sources = []
+    for q in questions:
+        for source in (q.source or '').split(SOURCE_SEPARATOR):
+            if source and source not in sources:
+                sources.append(source)
+    return SOURCE_SEPARATOR.join(sources) or None
+
+
+def collapse(questions, result):
+    """每组重复题只保留最先出现的一道（来源合并），返回新的题目列表"""
+    dropped = set()
+    for group in result.groups:
+        keep = questions[group.members[0]]
+        keep.source = merge_sources(questions[i] for i in group.members)
+        dropped.update(group.members[1:])
+    return [q for i, q in enumerate(questions) if i not in dropped]
+
+
+def describe(question):
+    source = f"［{question.source}］" if question.source else ""
+    stem = question.question if len(question.question) <= 40 else question.question[:40] + "…"
+    return f"{source}{question.type} 第{question.number}题：{stem}"
+
+
+def report(questions, result, limit=REPORT_LIMIT):
+    """文本报告"""
+    exact = [group for group in result.groups if group.kind == 'exact']
+    near = [group for group in result.groups if group.kind == 'near']
+    lines = [f"共 {result.count} 道题：完全重复 {len(exact)} 组，近似重复 {len(near)} 组，"
+             f"合并后减少 {result.removed} 道；答案冲突 {len(result.conflicts)} 对；"
+             f"耗时 {result.seconds * 1000:.0f} ms"]
+    for title, groups in (("完全重复", exact), ("近似重复", near)):
+        if groups and limit:
+            lines.append(f"\n{title}（前 {min(limit, len(groups))} 组）：")
+            for number, group in enumerate(groups[:limit], 1):
+                lines.append(f"{number}. {len(group.members)} 道")
+                lines.extend(f"   {describe(questions[i])}" for i in group.members)
+    if result.conflicts and limit:
+        lines.append(f"\n答案冲突（相似但正确答案不同，未合并；前 {min(limit, len(result.conflicts))} 对）：")
+        for i, j, similarity in result.conflicts[:limit]:
+            lines.append(f"   相似度 {similarity:.2f}")
+            lines.append(f"   {describe(questions[i])}（答案 {questions[i].answer}）")
+            lines.append(f"   {describe(questions[j])}（答案 {questions[j].answer}）")
+    return "\n".join(lines)
+
+
+def main():
+    # 命令行加载题库需要 quiz_loader，放在函数内导入以免被加载器反向依赖
+    import quiz_cache
+    import quiz_loader
+
+    parser = argparse.ArgumentParser(description="查找题库中的重复和近似重复题目")
+    parser.add_argument('paths', nargs='*', default=['sets'], help="题库文件或目录（默认 sets）")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help="近似重复的 Jaccard 相似度下限（0~1）")
+    parser.add_argument('--limit', type=int, default=REPORT_LIMIT, help="报告中每类最多列出的组数")
+    parser.add_argument('--collapse', metavar='PATH', help="把合并重复后的题目写入 JSON Lines 文件")
+    parser.add_argument('--no-cache', action='store_true', help="不读取也不写入题库缓存")
+    args = parser.parse_args()
+
+    paths = []
+    for name in args.paths:
+        path = Path(name)
+        paths.extend(quiz_loader.find_banks(path) if path.is_dir() else [path])
+    if not paths:
+        sys.exit("没有找到题库文件")
+    try:
+        questions, _ = quiz_loader.load_banks(paths, quiz_cache.BankCache(enabled=not args.no_cache))
+    except ValueError as e:
+        sys.exit(str(e))
+
+    result = find_duplicates(questions, args.threshold)
+    print(report(questions, result, args.limit))
+    if args.collapse:
+        with open(args.collapse, 'w', encoding='utf-8') as f:
+            for q in collapse(questions, result):
+                f.write(json.dumps({
+                    'source': q.source,
+                    'type': q.type,
+                    'question': q.question,
+                    'options': [[option.letter, option.text] for option in q.options],
+                    'answer': q.answer,
+                    'analysis': q.answer_analysis,
+                }, ensure_ascii=False))
+                f.write('\n')
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""文本题库编码识别模块
+
+只读一次文件：以 PROBE_SIZE 大小的缓冲区打开文件，先 peek 出开头的
+字节（不移动读取位置）判断编码，再在同一个缓冲文件流上按该编码解码，
+识别和正文读取共用这次读入的数据。判断规则（手机网页版的 detectEncoding
+与此相同）：
+- 有 BOM 时按 BOM：UTF-8、UTF-16 LE/BE
+- 否则用 UTF-8 增量解码器试解开头的字节（末尾被截断的多字节字符不算
+  错误），能解码则为 UTF-8
+- 否则为 GB18030（GBK 的超集，合作方提供的 GBK 题库按此解码）
+
+开头是纯 ASCII、GBK 汉字出现在 PROBE_SIZE 之后的文件会被判为 UTF-8，
+读到汉字时解码失败，由调用方改用 FALLBACK_ENCODING 重新读取（见
+quiz_loader.BankLoader.load_txt）。
+
+可运行 `python quiz_encoding.py 题库.txt ...` 查看识别结果。
+"""
+import codecs
+import io
+import sys
+
+# 判断编码时试解的字节数（同时是文件缓冲区大小）
+PROBE_SIZE = 64 * 1024
+
+# 无 BOM 且不是 UTF-8 时使用的编码
+FALLBACK_ENCODING = 'gb18030'
+
+# BOM 及对应的编码（Python 的这些编码会去掉 BOM）
+BOMS = (
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+)
+
+
+def detect_encoding(prefix, complete=False):
+    """根据文件开头的字节判断编码；complete 表示 prefix 已是整个文件"""
+    for bom, encoding in BOMS:
+        if prefix.startswith(bom):
+            return encoding
+    try:
+        codecs.getincrementaldecoder('utf-8')().decode(prefix, final=complete)
+    except UnicodeDecodeError:
+        return FALLBACK_ENCODING
+    return 'utf-8'
+
+
+def open_text(path):
+    """以识别出的编码打开文本文件，返回文本流（encoding 属性为所用编码）"""
+    f = open(path, 'rb', buffering=PROBE_SIZE)
+    try:
+        prefix = f.peek(PROBE_SIZE)[:PROBE_SIZE]
+        encoding = detect_encoding(prefix, complete=len(prefix) < PROBE_SIZE)
+        return io.TextIOWrapper(f, encoding=encoding)
+    except BaseException:
+        f.close()
+        raise
+
+
+if __name__ == "__main__":
+    for name in sys.argv[1:]:
+        with open_text(name) as stream:
+            print(f"{name}: {stream.encoding}")
@@ -0,0 +1,231 @@
+"""模拟考试组卷模块
+
+按题型配额（默认单选 60、多选 20、判断 20）从一个或多个题库中不放回地
+抽题组卷。ExamGenerator 构建时把题目按题型（分层时再按来源题库）分组
+并分配配额，之后每生成一份试卷只做稀疏 Fisher–Yates 抽样，耗时与试卷
+题数 k 成正比（O(k)），与题库大小无关，可一次预生成上千份试卷。
+
+分层（stratify）时，每个题型的配额按各题库中该题型的题目数比例分配
+（最大余数法），保证每份试卷中各题库的题目比例稳定。
+
+命令行批量组卷，每份试卷一行 JSON：
+    python quiz_exam.py 题库1.txt [题库2.docx ...] --papers 1000 --quota 60/20/20 --out papers.jsonl
+"""
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+import quiz_cache
+import quiz_loader
+from quiz_parser import TYPE_ORDER
+
+DEFAULT_QUOTAS = {'单选题': 60, '多选题': 20, '判断题': 20}
+
+# 默认考试时长（分钟）
+DEFAULT_MINUTES = 90
+
+# 批量组卷时遇到重复试卷的最多重试次数
+MAX_RETRIES = 100
+
+
+def parse_quotas(text):
+    """解析配额："60/20/20"（按单选、多选、判断的顺序）或 "单选题=60,多选题=20" """
+    text = text.strip()
+    if '=' in text:
+        quotas = {}
+        for item in text.replace('，', ',').split(','):
+            name, _, count = item.partition('=')
+            name = name.strip()
+            if name not in TYPE_ORDER:
+                raise ValueError(f"未知题型：{name}")
+            quotas[name] = int(count)
+    else:
+        counts = [int(count) for count in text.split('/')]
+        if len(counts) > len(TYPE_ORDER):
+            raise ValueError(f"配额最多 {len(TYPE_ORDER)} 项：{text}")
+        quotas = dict(zip(sorted(TYPE_ORDER, key=TYPE_ORDER.get), counts))
+    if any(count < 0 for count in quotas.values()):
+        raise ValueError(f"配额不能为负数：{text}")
+    return quotas
+
+
+def sample_indices(n, k, rng):
+    """从 range(n) 中不放回地随机取 k 个下标：稀疏 Fisher–Yates，O(k)"""
+    swapped = {}
+    result = []
+    for i in range(k):
+        j = rng.randrange(i, n)
+        result.append(swapped.get(j, j))
+        swapped[j] = swapped.get(i, i)
+    return result
+
+
+def allocate(quota, sizes):
+    """按 sizes 的比例把 quota 分配到各组（最大余数法）"""
+    total = sum(sizes)
+    if not total:
+        return [0] * len(sizes)
+    shares = [quota * size / total for size in sizes]
+    counts = [int(share) for share in shares]
+    by_remainder = sorted(range(len(sizes)), key=lambda i: shares[i] - counts[i], reverse=True)
+    for i in by_remainder[:quota - sum(counts)]:
+        counts[i] += 1
+    return counts
+
+
+class ExamPaper:
+    """一份试卷及其作答结果
+
+    questions 按题型排列，banks 为各题的来源题库序号，results 为
+    题目位置 -> 是否答对。
+    """
+
+    def __init__(self, questions, banks):
+        self.questions = questions
+        self.banks = banks
+        self.results = {}
+
+    def __len__(self):
+        return len(self.questions)
+
+    def record(self, index, correct):
+        """记录一道题的作答（重复作答以第一次为准）"""
+        self.results.setdefault(index, correct)
+
+    def summary(self):
+        """按题型汇总：返回 [(题型, 答对数, 已答数, 题数)]，题型按单选、多选、判断排序"""
+        totals = {}
+        for index, question in enumerate(self.questions):
+            row = totals.setdefault(question.type, [0, 0, 0])
+            row[2] += 1
+            if index in self.results:
+                row[1] += 1
+                row[0] += self.results[index]
+        return [(name, *totals[name]) for name in sorted(totals, key=lambda name: TYPE_ORDER.get(name, 0))]
+
+    def score(self):
+        """百分制得分（每题分值相同，未答视为答错）"""
+        if not self.questions:
+            return 0.0
+        return 100 * sum(self.results.values()) / len(self.questions)
+
+
+class ExamGenerator:
+    """按题型配额组卷
+
+    banks 为各来源题库的题目序列。配额超过题库中该题型的题目数时抛出
+    ValueError；clamp=True 时改为取该题型的全部题目。
+    """
+
+    def __init__(self, banks, quotas=DEFAULT_QUOTAS, stratify=False, clamp=False, rng=None):
+        self.rng = rng if rng is not None else random.Random()
+        # 每组：(题目列表, 各题的来源题库序号, 每份试卷抽取的题数)
+        self.groups = []
+        for name in sorted(quotas, key=lambda name: TYPE_ORDER.get(name, 0)):
+            quota = quotas[name]
+            buckets = [[q for q in bank if q.type == name] for bank in banks]
+            available = sum(map(len, buckets))
+            if quota > available:
+                if not clamp:
+                    raise ValueError(f"{name}只有 {available} 道，不足配额 {quota}")
+                quota = available
+            if stratify:
+                counts = allocate(quota, [len(bucket) for bucket in buckets])
+                self.groups.extend((bucket, [bank] * len(bucket), count)
+                                   for bank, (bucket, count) in enumerate(zip(buckets, counts)) if count)
+            elif quota:
+                merged = [q for bucket in buckets for q in bucket]
+                origins = [bank for bank, bucket in enumerate(buckets) for _ in bucket]
+                self.groups.append((merged, origins, quota))
+
+    @property
+    def size(self):
+        """每份试卷的题数"""
+        return sum(count for _, _, count in self.groups)
+
+    def generate(self):
+        """生成一份试卷：O(k)"""
+        rng = self.rng
+        questions = []
+        banks = []
+        for bucket, origins, count in self.groups:
+            for i in sample_indices(len(bucket), count, rng):
+                questions.append(bucket[i])
+                banks.append(origins[i])
+        return ExamPaper(questions, banks)
+
+    def generate_many(self, count):
+        """生成 count 份互不相同的试卷（题目集合不同）"""
+        seen = set()
+        papers = []
+        for _ in range(count):
+            for _ in range(MAX_RETRIES):
+                paper = self.generate()
+                key = frozenset(map(id, paper.questions))
+                if key not in seen:
+                    break
+            else:
+                raise ValueError(f"题库太小，只能组出 {len(papers)} 份不同的试卷")
+            seen.add(key)
+            papers.append(paper)
+        return papers
+
+
+def paper_record(number, paper, bank_names):
+    """试卷的 JSON 记录"""
+    return {
+        'paper': number,
+        'questions': [{
+            'bank': bank_names[bank],
+            'type': q.type,
+            'number': q.number,
+            'question': q.question,
+            'options': [[option.letter, option.text] for option in q.options],
+            'answer': q.answer,
+        } for q, bank in zip(paper.questions, paper.banks)],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="按题型配额批量生成模拟试卷")
+    parser.add_argument('banks', nargs='+', type=Path, help="题库文件（txt 或 docx）")
+    parser.add_argument('--papers', type=int, default=1, help="试卷份数")
+    parser.add_argument('--quota', type=parse_quotas, default=DEFAULT_QUOTAS,
+                        help="题型配额，如 60/20/20 或 单选题=60,多选题=20,判断题=20")
+    parser.add_argument('--stratify', action='store_true', help="各题型按来源题库的题目比例分层抽题")
+    parser.add_argument('--seed', type=int, help="随机种子（相同种子生成相同的试卷）")
+    parser.add_argument('--out', help="输出文件（JSON Lines），默认输出到标准输出")
+    parser.add_argument('--no-cache', action='store_true', help="不读取也不写入题库缓存")
+    args = parser.parse_args()
+
+    # 与刷题程序相同的加载方式（缓存、各种编码的 txt 和 docx），各题库分别加载以便分层抽题
+    cache = quiz_cache.BankCache(enabled=not args.no_cache)
+    try:
+        banks = [quiz_loader.load_bank(path, cache) for path in args.banks]
+    except ValueError as e:
+        sys.exit(str(e))
+    try:
+        generator = ExamGenerator(banks, args.quota, stratify=args.stratify, rng=random.Random(args.seed))
+        start = time.perf_counter()
+        papers = generator.generate_many(args.papers)
+        elapsed = time.perf_counter() - start
+    except ValueError as e:
+        sys.exit(str(e))
+
+    bank_names = [path.name for path in args.banks]
+    out = open(args.out, 'w', encoding='utf-8') if args.out else sys.stdout
+    try:
+        for number, paper in enumerate(papers, 1):
+            out.write(json.dumps(paper_record(number, paper, bank_names), ensure_ascii=False))
+            out.write('\n')
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    print(f"{len(papers)} 份试卷，每份 {generator.size} 题，组卷 {elapsed * 1000:.1f} ms", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,277 @@
+"""判题模块
+
+根据题目和所选选项（界面上显示的选项下标）判断对错，不依赖 tkinter，
+界面、命令行和批量判卷共用同一套规则：
+- 单选题：只选一项，且该项字母与答案相同
+- 多选题：所选字母集合与答案（以顿号分隔）完全相同
+- 判断题：只选一项；有两个选项时按选项文字（对/正确、错/错误）与答案
+  比较，没有选项时显示默认的"正确""错误"两项
+
+AnswerKey 把一道题的判题规则预先整理为可接受的选择，批量判卷时每个
+作答只需一次集合比较；作答文本（如 "A"、"A、C"、"AC"、"正确"）由
+parse_response 转为选项下标。
+
+多选题可按 PARTIAL_RULES 给部分分：只选了正确选项中的一部分（没有
+错选）时得 PARTIAL_CREDIT 分（half）或按选对的比例得分（proportional）。
+
+BulkScorer 把答案和作答编码为位掩码（A=1、B=2、C=4、D=8），用 NumPy
+一次向量化计算整个"答题卡×题目"矩阵的得分。numpy 为可选依赖，只在
+创建 BulkScorer 时导入；没有 numpy 时 sheet_scorer 返回逐题调用
+AnswerKey.credit 的 SheetGrader，结果相同。百分制成绩由 percentages
+按每份答题卡上的题数（而不是整个题库的题数）换算。
+"""
+from quiz_parser import Option
+
+# 表示"正确""错误"的答案
+JUDGE_TRUE = frozenset(['A', '正确', '对', 'True'])
+JUDGE_FALSE = frozenset(['B', '错误', '错', 'False'])
+
+# 没有两个选项的判断题显示的默认选项
+DEFAULT_JUDGE_OPTIONS = (Option('A', '正确'), Option('B', '错误'))
+
+# 作答文本中表示"正确""错误"的写法（字母按选项处理）
+RESPONSE_TRUE = frozenset(['正确', '对', 'true', 't', '√', '✓', 'yes', 'y'])
+RESPONSE_FALSE = frozenset(['错误', '错', 'false', 'f', '×', '✗', 'no', 'n'])
+
+# 作答文本中字母之间的分隔符
+RESPONSE_SEPARATORS = str.maketrans('', '', '、，,;；/ \t')
+
+# 多选题部分得分规则：不给分、少选得 PARTIAL_CREDIT 分、按选对的比例得分
+PARTIAL_RULES = ('none', 'half', 'proportional')
+PARTIAL_CREDIT = 0.5
+
+
+def display_options(question):
+    """界面上显示的选项：没有两个选项的判断题使用默认选项"""
+    if question.type == '判断题' and len(question.options) != 2:
+        return DEFAULT_JUDGE_OPTIONS
+    return question.options
+
+
+def judge_value(text):
+    """判断题选项文字表示的真假：True、False，无法识别时为 None"""
+    text = text.strip()
+    if '对' in text or '正确' in text:
+        return True
+    if '错' in text or '错误' in text:
+        return False
+    return None
+
+
+class AnswerKey:
+    """一道题的判题规则
+
+    multiple 为 True 时所选下标集合必须等于 accepted；否则必须只选一项，
+    且该项在 accepted 中。
+    """
+    __slots__ = ('multiple', 'accepted', 'mask', 'option_count', 'true_index', 'false_index')
+
+    def __init__(self, question):
+        options = display_options(question)
+        self.option_count = len(options)
+        self.multiple = question.type == '多选题'
+        self.true_index = self.false_index = None
+        if question.type == '判断题':
+            answer = question.answer.strip()
+            if len(question.options) == 2:
+                values = [judge_value(option.text) for option in options]
+                accepted = [i for i, value in enumerate(values)
+                            if (value is True and answer in JUDGE_TRUE)
+                            or (value is False and answer in JUDGE_FALSE)]
+                self.true_index = values.index(True) if True in values else None
+                self.false_index = values.index(False) if False in values else None
+            else:
+                # 默认选项：第一项为"正确"，其余为"错误"
+                accepted = [0] if answer in JUDGE_TRUE else \
+                    range(1, len(options)) if answer in JUDGE_FALSE else []
+                self.true_index, self.false_index = 0, 1
+        elif self.multiple:
+            letters = [c.strip() for c in question.answer.split('、')]
+            indices = {ord(c) - 65 for c in letters if len(c) == 1}
+            valid = len(indices) == len(letters) and all(0 <= i < len(options) for i in indices)
+            accepted = indices if valid else None
+        else:
+            accepted = [i for i in range(len(options)) if chr(65 + i) == question.answer]
+        self.accepted = frozenset(accepted) if accepted is not None else None
+        # 可接受选项的位掩码：多选题为唯一正确的组合，其余为可选的任一项
+        self.mask = selection_mask(self.accepted or ())
+
+    def check(self, selected):
+        """selected 为所选选项下标的集合"""
+        if self.multiple:
+            return self.accepted is not None and frozenset(selected) == self.accepted
+        if len(selected) != 1:
+            return False
+        index, = selected
+        return index in self.accepted
+
+    def credit(self, selected, partial='none'):
+        """得分（0~1）：答对为 1，多选题少选按 partial 规则给部分分"""
+        if self.check(selected):
+            return 1.0
+        if (partial == 'none' or not self.multiple or not selected
+                or self.accepted is None or not self.accepted.issuperset(selected)):
+            return 0.0
+        if partial == 'half':
+            return PARTIAL_CREDIT
+        return len(selected) / len(self.accepted)
+
+    def parse_response(self, text):
+        """把作答文本转为选项下标集合；无法识别的字母忽略"""
+        text = text.strip()
+        lowered = text.lower()
+        if lowered in RESPONSE_TRUE and self.true_index is not None:
+            return {self.true_index}
+        if lowered in RESPONSE_FALSE and self.false_index is not None:
+            return {self.false_index}
+        selected = set()
+        for c in text.upper().translate(RESPONSE_SEPARATORS):
+            index = ord(c) - 65
+            if 0 <= index < self.option_count:
+                selected.add(index)
+        return selected
+
+
+def check_answer(question, selected):
+    """判断所选选项（显示选项的下标集合）是否正确"""
+    return AnswerKey(question).check(selected)
+
+
+def percentages(credit, totals):
+    """各答题卡的百分制成绩：得分除以该答题卡上的题数（没有题目时为 0）"""
+    return [100 * float(c) / t if t else 0.0 for c, t in zip(credit, totals)]
+
+
+def sheet_scorer(keys, partial='none'):
+    """批量判卷器：有 numpy 时为 BulkScorer，否则为 SheetGrader"""
+    try:
+        return BulkScorer(keys, partial)
+    except ImportError:
+        return SheetGrader(keys, partial)
+
+
+class SheetGrader:
+    """逐题判卷（不需要 numpy）；同一题的相同作答文本只判一次
+
+    keys 为各题的 AnswerKey，列号即其下标。
+    """
+
+    def __init__(self, keys, partial='none'):
+        self.keys = keys
+        self.partial = partial
+        self.results = [{} for _ in keys]    # 各题：作答文本 -> (是否作答, 是否答对, 得分)
+
+    def result(self, column, text):
+        key = self.keys[column]
+        selected = key.parse_response(text) if text else ()
+        result = self.results[column][text] = (bool(selected), key.check(selected),
+                                                key.credit(selected, self.partial))
+        return result
+
+    def grade(self, rows, columns):
+        """rows 为各答题卡按 columns（列号）排列的作答文本，返回 (答对数, 作答数, 得分) 三个列表"""
+        tables = [self.results[column] for column in columns]
+        correct, answered, credit = [], [], []
+        for row in rows:
+            sheet_correct = sheet_answered = 0
+            sheet_credit = 0.0
+            for column, table, text in zip(columns, tables, row):
+                result = table.get(text)
+                if result is None:
+                    result = self.result(column, text)
+                sheet_answered += result[0]
+                sheet_correct += result[1]
+                sheet_credit += result[2]
+            correct.append(sheet_correct)
+            answered.append(sheet_answered)
+            credit.append(sheet_credit)
+        return correct, answered, credit
+
+
+class MaskTable(dict):
+    """一道题的作答文本 -> 位掩码，未见过的文本在查找时解析"""
+    __slots__ = ('key',)
+
+    def __init__(self, key):
+        super().__init__()
+        self.key = key
+
+    def __missing__(self, text):
+        mask = self[text] = selection_mask(self.key.parse_response(text)) if text else 0
+        return mask
+
+
+def selection_mask(selected):
+    """选项下标集合的位掩码（A=1、B=2、C=4、D=8……）"""
+    mask = 0
+    for index in selected:
+        mask |= 1 << index
+    return mask
+
+
+class BulkScorer:
+    """向量化批量判卷（需要 numpy）
+
+    keys 为各题的 AnswerKey（矩阵的列顺序）。encode 把作答文本编码为
+    位掩码矩阵（同一题相同的作答文本只解析一次），score 一次计算所有
+    答题卡的答对数、作答数和得分。
+    """
+
+    def __init__(self, keys, partial='none'):
+        import numpy as np
+
+        self.np = np
+        self.keys = keys
+        self.partial = partial
+        bits = max((key.option_count for key in keys), default=0)
+        self.dtype = np.uint8 if bits <= 8 else np.uint16 if bits <= 16 else np.uint32
+        self.key_masks = np.array([key.mask for key in keys], dtype=self.dtype)
+        self.multiple = np.array([key.multiple for key in keys], dtype=bool)
+        self.key_bits = self.popcount(self.key_masks)
+        self.masks = [MaskTable(key) for key in keys]
+
+    def popcount(self, values):
+        """逐元素统计置位数"""
+        np = self.np
+        counts = np.zeros(values.shape, dtype=np.uint8)
+        values = values.copy()
+        while values.any():
+            counts += (values & 1).astype(np.uint8)
+            values >>= 1
+        return counts
+
+    def encode(self, rows, columns):
+        """rows 为各答题卡按 columns（列号）排列的作答文本，返回答题卡×题目的位掩码矩阵"""
+        np = self.np
+        count = len(rows)
+        responses = np.zeros((count, len(self.keys)), dtype=self.dtype)
+        # 按列转置后整列查表（查表循环在 C 中进行），相同文本只解析一次
+        for column, texts in zip(columns, zip(*rows)):
+            responses[:, column] = np.fromiter(map(self.masks[column].__getitem__, texts),
+                                               dtype=self.dtype, count=count)
+        return responses
+
+    def score(self, responses):
+        """返回每份答题卡的 (答对数, 作答数, 得分) 三个数组，得分为各题得分之和"""
+        np = self.np
+        keys = self.key_masks
+        answered = responses != 0
+        # 单选、判断：只选一项，且在可接受的选项中
+        single = answered & ((responses & (responses - 1)) == 0) & ((responses & keys) != 0)
+        # 多选：与正确组合完全相同
+        exact = answered & (responses == keys)
+        correct = np.where(self.multiple, exact, single)
+        credit = correct.astype(np.float64)
+        if self.partial != 'none':
+            # 少选：没有错选且未选全
+            partial = answered & self.multiple & ~correct & ((responses & ~keys) == 0) & (keys != 0)
+            if self.partial == 'half':
+                credit += partial * PARTIAL_CREDIT
+            else:
+                fraction = self.popcount(responses) / np.maximum(self.key_bits, 1)
+                credit += np.where(partial, fraction, 0.0)
+        return correct.sum(axis=1), answered.sum(axis=1), credit.sum(axis=1)
+
+    def grade(self, rows, columns):
+        """返回每份答题卡的 (答对数, 作答数, 得分) 三个数组"""
+        return self.score(self.encode(rows, columns))
@@ -0,0 +1,415 @@
+"""题库后台加载模块
+
+BankLoader 在后台线程中读取并解析题库文件，按批把题目放入线程安全的
+队列，由界面线程通过 root.after 定时取出，保证 Tk 主循环不被阻塞。
+解析结果会写入题库缓存，源文件未变化时直接从缓存读取；指定数据库时
+同时在加载线程中把题目导入 SQLite 题库数据库（见 quiz_db）。
+命令行等无界面场景可用 load_bank 在当前线程中同步加载。
+
+MultiBankLoader 用进程池（ProcessPoolExecutor）并行解析多个题库文件
+（docx 的 XML 解析和文本解析都是 CPU 密集型，线程受 GIL 限制），按文件
+顺序合并结果；每道题的 source 记录来源文件名，并统计每个文件的耗时。
+合并时可选去重（quiz_dedup），每组重复题只保留一道。
+可运行 `python quiz_loader.py sets/` 查看各文件的解析耗时。
+本模块不依赖 tkinter。
+"""
+import argparse
+import os
+import queue
+import sys
+import threading
+import time
+import zipfile
+import xml.etree.ElementTree as ET
+from collections import namedtuple
+from itertools import islice
+from pathlib import Path
+
+import quiz_dedup
+import quiz_docx
+import quiz_encoding
+import quiz_parser
+from quiz_cache import BankCache
+
+# 每批解析的题目数
+BATCH_SIZE = 200
+
+# 可加载的题库文件扩展名
+BANK_SUFFIXES = ('.docx', '.txt')
+
+# 并行加载时检查取消请求的间隔（秒）
+CANCEL_POLL_INTERVAL = 0.1
+
+# 一个文件的加载结果：题目数、解析耗时（秒，在工作进程中测得）、是否来自缓存、错误信息
+FileResult = namedtuple('FileResult', ['path', 'count', 'seconds', 'cached', 'error'])
+
+
+class LoadCancelled(Exception):
+    """加载已被取消"""
+
+
+class BankLoader(threading.Thread):
+    """后台加载题库文件
+
+    队列消息为 (kind, payload, progress) 三元组，progress 为 0~1 的进度：
+    - ('reset', None, p)：换编码或换 docx 读取方式重试，之前收到的题目作废
+    - ('batch', questions, p)：一批按原文顺序解析出的题目（尚未编号）
+    - ('done', None, 1.0)：加载完成
+    - ('cancelled', None, p)：已取消
+    - ('error', message, p)：加载失败，message 为提示文本
+    """
+
+    def __init__(self, path, batch_size=BATCH_SIZE, cache=None, db_path=None, prune_cache=True):
+        super().__init__(daemon=True)
+        self.path = path
+        self.prune_cache = prune_cache  # 写入缓存后清理过期缓存（并行加载时由主进程统一清理）
+        self.from_cache = False
+        self.batch_size = batch_size
+        self.cache = cache if cache is not None else BankCache(enabled=False)
+        self.cache_writer = None
+        self.db_path = db_path      # 题库数据库路径，None 表示不导入
+        self.db_importer = None
+        self.queue = queue.Queue()
+        self.progress = 0.0
+        self._cancel_event = threading.Event()
+
+    def cancel(self):
+        """请求取消加载（在下一批边界生效）"""
+        self._cancel_event.set()
+
+    @property
+    def cancelled(self):
+        return self._cancel_event.is_set()
+
+    def run(self):
+        db = None
+        if self.db_path:
+            import quiz_db
+            db = quiz_db.QuestionDB(self.db_path)
+        try:
+            if db:
+                self.db_importer = db.importer(self.path)
+            self.from_cache = self.load_cached()
+            if not self.from_cache:
+                self.cache_writer = self.cache.writer(self.path)
+                if self.path.suffix.lower() == '.docx':
+                    self.load_docx()
+                else:
+                    self.load_txt()
+                if self.cache_writer:
+                    self.cache_writer.commit()
+                    if self.prune_cache:
+                        self.cache.prune()
+            if self.db_importer:
+                self.db_importer.commit()
+        except LoadCancelled:
+            self.discard_cache()
+            self.queue.put(('cancelled', None, self.progress))
+        except Exception as e:
+            self.discard_cache()
+            kind = "Word" if self.path.suffix.lower() == '.docx' else "文本"
+            self.queue.put(('error', f"加载{kind}文件失败：{str(e)}", self.progress))
+        else:
+            self.queue.put(('done', None, 1.0))
+        finally:
+            if db:
+                db.close()
+
+    def load_cached(self):
+        """从缓存读取题目，无有效缓存时返回 False"""
+        batches = self.cache.load(self.path)
+        if batches is None:
+            return False
+        for batch in batches:
+            self.check_cancelled()
+            if self.db_importer:
+                self.db_importer.add(batch)
+            self.queue.put(('batch', batch, self.progress))
+        return True
+
+    def discard_cache(self):
+        """丢弃已写入的缓存和尚未提交的数据库导入"""
+        if self.cache_writer:
+            self.cache_writer.discard()
+            self.cache_writer = None
+        if self.db_importer:
+            self.db_importer.discard()
+            self.db_importer = None
+
+    def restart(self):
+        """换一种方式重新读取：作废已发出的题目、已写入的缓存和数据库导入"""
+        db_importer = self.db_importer
+        self.discard_cache()
+        self.cache_writer = self.cache.writer(self.path)
+        if db_importer:
+            self.db_importer = db_importer.restart()
+        self.queue.put(('reset', None, 0.0))
+
+    def load_txt(self):
+        """以缓冲文件流逐行读取文本文件，编码由 quiz_encoding 根据文件开头识别
+
+        只读一次、解析一次；仅当开头是纯 ASCII 而后文不是 UTF-8 时，才改用
+        GB18030 重新读取。
+        """
+        size = os.path.getsize(self.path) or 1
+        with quiz_encoding.open_text(self.path) as f:
+            try:
+                self.put_batches(quiz_parser.iter_lines(f), lambda: f.buffer.tell() / size)
+                return
+            except UnicodeDecodeError as e:
+                if f.encoding != 'utf-8':
+                    raise ValueError(f"文件编码错误：{str(e)}")
+        self.restart()
+        with open(self.path, 'r', encoding=quiz_encoding.FALLBACK_ENCODING) as f:
+            try:
+                self.put_batches(quiz_parser.iter_lines(f), lambda: f.buffer.tell() / size)
+            except UnicodeDecodeError as e:
+                raise ValueError(f"文件编码错误：{str(e)}")
+
+    def load_docx(self):
+        """读取Word文档：直接流式解析 document.xml，失败时改用 python-docx"""
+        try:
+            with zipfile.ZipFile(self.path) as zf:
+                info = zf.getinfo(quiz_docx.DOCUMENT_XML)
+                size = info.file_size or 1
+                with zf.open(info) as stream:
+                    lines = quiz_parser.iter_lines(quiz_docx.iter_paragraph_texts(stream))
+                    self.put_batches(lines, lambda: stream.tell() / size)
+                    return
+        except (KeyError, zipfile.BadZipFile, ET.ParseError):
+            pass
+        self.restart()
+        self.load_docx_fallback()
+
+    def load_docx_fallback(self):
+        """用 python-docx 读取Word文档，逐段提取非空文本"""
+        # python-docx（及其依赖的 lxml）导入较慢，仅在后备路径中按需导入
+        import docx
+
+        doc = docx.Document(self.path)
+        self.check_cancelled()
+
+        paragraphs = doc.paragraphs
+        total = len(paragraphs) or 1
+        position = 0
+
+        def texts():
+            nonlocal position
+            for position, para in enumerate(paragraphs, 1):
+                yield para.text
+
+        self.put_batches(quiz_parser.iter_lines(texts()), lambda: position / total)
+
+    def put_batches(self, lines, progress):
+        """解析文本行，每解析出 batch_size 道题放入队列一次"""
+        questions = quiz_parser.iter_questions(lines)
+        while True:
+            self.check_cancelled()
+            batch = list(islice(questions, self.batch_size))
+            self.progress = progress()
+            if batch:
+                for q in batch:
+                    q.source = self.path.name
+                # 先写缓存再放入队列，放入队列后题目归界面线程所有
+                if self.cache_writer:
+                    self.cache_writer.add(batch)
+                if self.db_importer:
+                    self.db_importer.add(batch)
+                self.queue.put(('batch', batch, self.progress))
+            if len(batch) < self.batch_size:
+                return
+
+    def check_cancelled(self):
+        if self.cancelled:
+            raise LoadCancelled()
+
+
+
+def find_banks(directory):
+    """目录下的全部题库文件（按文件名排序，跳过 Word 的临时文件）"""
+    return sorted(path for path in Path(directory).iterdir()
+                  if path.suffix.lower() in BANK_SUFFIXES and not path.name.startswith('~$'))
+
+
+def load_bank(path, cache=None, prune_cache=True):
+    """在当前线程中加载题库，返回按题型编号后的题目列表；失败时抛出 ValueError"""
+    return _load_bank(BankLoader(path, cache=cache, prune_cache=prune_cache))
+
+
+def _load_bank(loader):
+    loader.run()
+    questions = []
+    while True:
+        kind, payload, _ = loader.queue.get_nowait()
+        if kind == 'reset':
+            questions = []
+        elif kind == 'batch':
+            questions.extend(payload)
+        elif kind == 'error':
+            raise ValueError(payload)
+        else:
+            return quiz_parser.reorder_questions_by_type(questions)
+
+
+def parse_bank_file(path, cache):
+    """在工作进程中加载一个题库文件，返回 (题目列表, 是否来自缓存, 耗时)"""
+    start = time.perf_counter()
+    loader = BankLoader(path, cache=cache, prune_cache=False)
+    questions = _load_bank(loader)
+    return questions, loader.from_cache, time.perf_counter() - start
+
+
+class MultiBankLoader(threading.Thread):
+    """用进程池并行加载多个题库文件
+
+    队列消息与 BankLoader 相同（不会发出 'reset'），另外每个文件加载完成
+    时发出 ('file', FileResult, p)。题目按文件顺序、文件内按题型顺序放入
+    队列；某个文件加载失败时跳过该文件（记录在 results 中），其余照常加载；
+    进程池或去重等整体出错时发出 ('error', 错误信息, p)。
+
+    dedup=True 时等全部文件加载完成后查找重复题目（见 quiz_dedup），每组
+    只保留一道（来源合并）再放入队列，查找结果保存在 dedup_result 中。
+    """
+
+    def __init__(self, paths, batch_size=BATCH_SIZE, cache=None, workers=None, dedup=False):
+        super().__init__(daemon=True)
+        self.paths = list(paths)
+        self.batch_size = batch_size
+        self.cache = cache if cache is not None else BankCache(enabled=False)
+        self.workers = workers or min(len(self.paths), os.cpu_count() or 1) or 1
+        self.dedup = dedup
+        self.results = []           # 各文件的 FileResult（按文件顺序）
+        self.dedup_result = None    # 去重结果（quiz_dedup.DedupResult）
+        self.elapsed = 0.0          # 总耗时（秒）
+        self.queue = queue.Queue()
+        self.progress = 0.0
+        self._cancel_event = threading.Event()
+
+    def cancel(self):
+        """请求取消加载：尚未开始的文件不再解析"""
+        self._cancel_event.set()
+
+    @property
+    def cancelled(self):
+        return self._cancel_event.is_set()
+
+    def run(self):
+        # 进程池（及其依赖的 multiprocessing）导入较慢，只在并行加载时导入
+        from concurrent.futures import ProcessPoolExecutor
+
+        start = time.perf_counter()
+        executor = None
+        pending = []                # 去重时暂存全部题目
+        try:
+            executor = ProcessPoolExecutor(max_workers=self.workers)
+            futures = [executor.submit(parse_bank_file, path, self.cache) for path in self.paths]
+            for done, (path, future) in enumerate(zip(self.paths, futures), 1):
+                result = self.wait(future)
+                if result is None:
+                    self.elapsed = time.perf_counter() - start
+                    self.queue.put(('cancelled', None, self.progress))
+                    return
+                questions, cached, seconds, error = result
+                self.progress = done / len(self.paths)
+                file_result = FileResult(path, len(questions), seconds, cached, error)
+                self.results.append(file_result)
+                self.queue.put(('file', file_result, self.progress))
+                if self.dedup:
+                    pending.extend(questions)
+                else:
+                    self.put_batches(questions)
+            if self.dedup:
+                self.dedup_result = quiz_dedup.find_duplicates(pending)
+                self.put_batches(quiz_dedup.collapse(pending, self.dedup_result))
+            if self.cache.enabled:
+                self.cache.prune()
+            self.elapsed = time.perf_counter() - start
+            self.queue.put(('done', None, 1.0))
+        except Exception as e:
+            self.elapsed = time.perf_counter() - start
+            self.queue.put(('error', f"并行加载失败：{str(e)}", self.progress))
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=not self.cancelled, cancel_futures=True)
+
+    def put_batches(self, questions):
+        for offset in range(0, len(questions), self.batch_size):
+            self.queue.put(('batch', questions[offset:offset + self.batch_size], self.progress))
+
+    def wait(self, future):
+        """等待一个文件的结果：(题目, 是否来自缓存, 耗时, 错误信息)；已取消时返回 None"""
+        from concurrent.futures import TimeoutError as FutureTimeout
+
+        while True:
+            if self.cancelled:
+                return None
+            try:
+                questions, cached, seconds = future.result(timeout=CANCEL_POLL_INTERVAL)
+            except FutureTimeout:
+                continue
+            except Exception as e:
+                return [], False, 0.0, str(e)
+            return questions, cached, seconds, None
+
+    def report(self):
+        """各文件的加载耗时报告（多行文本）"""
+        lines = []
+        for result in self.results:
+            if result.error:
+                lines.append(f"{result.path.name}：失败（{result.error}）")
+            else:
+                source = "缓存" if result.cached else "解析"
+                lines.append(f"{result.path.name}：{result.count} 道题，{result.seconds * 1000:.0f} ms（{source}）")
+        lines.append(f"共 {sum(r.count for r in self.results)} 道题，{len(self.results)} 个文件，"
+                     f"总耗时 {self.elapsed * 1000:.0f} ms（{self.workers} 个进程）")
+        if self.dedup_result is not None:
+            groups = self.dedup_result.groups
+            near = sum(1 for group in groups if group.kind == 'near')
+            lines.append(f"去重：完全重复 {len(groups) - near} 组，近似重复 {near} 组，"
+                         f"合并后减少 {self.dedup_result.removed} 道，"
+                         f"耗时 {self.dedup_result.seconds * 1000:.0f} ms")
+        return "\n".join(lines)
+
+
+def load_banks(paths, cache=None, workers=None, dedup=False):
+    """并行加载多个题库，返回 (按题型编号后的合并题目列表, MultiBankLoader)
+
+    单个文件失败时跳过（见 MultiBankLoader.results）；进程池或去重等整体
+    出错时抛出 ValueError。
+    """
+    loader = MultiBankLoader(paths, cache=cache, workers=workers, dedup=dedup)
+    loader.run()
+    questions = []
+    while True:
+        kind, payload, _ = loader.queue.get_nowait()
+        if kind == 'batch':
+            questions.extend(payload)
+        elif kind == 'error':
+            raise ValueError(payload)
+        elif kind in ('done', 'cancelled'):
+            return quiz_parser.reorder_questions_by_type(questions), loader
+
+
+def main():
+    parser = argparse.ArgumentParser(description="并行加载题库文件并报告各文件耗时")
+    parser.add_argument('paths', nargs='*', default=['sets'], help="题库文件或目录（默认 sets）")
+    parser.add_argument('--workers', type=int, help="进程数（默认为 CPU 核数）")
+    parser.add_argument('--no-cache', action='store_true', help="不读取也不写入题库缓存")
+    parser.add_argument('--dedup', action='store_true', help="合并重复题目并报告去重结果")
+    args = parser.parse_args()
+
+    paths = []
+    for name in args.paths:
+        path = Path(name)
+        paths.extend(find_banks(path) if path.is_dir() else [path])
+    if not paths:
+        sys.exit("没有找到题库文件")
+    try:
+        _, loader = load_banks(paths, BankCache(enabled=not args.no_cache), args.workers, args.dedup)
+    except ValueError as e:
+        sys.exit(str(e))
+    print(loader.report())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,299 @@
+"""超大文本题库的内存映射随机访问模块
+
+MappedBank 用 mmap 映射 .txt 题库，扫描一遍建立题目起始位置的字节偏移
+索引（array('Q')，每道题 8 字节），不在内存中保留解析结果；按下标取题
+时只解码并解析该题所在的一段字节，最近用到的 CACHED_QUESTIONS 道题
+缓存在内存中。打开题库的耗时约等于一次索引扫描，常驻内存不随题库
+大小增长：扫描过的页用 madvise(MADV_DONTNEED) 交还给页缓存（不支持的
+平台上由系统按需回收）。
+
+题目起始行即 quiz_parser 识别的题号行：去掉首尾空白后匹配 quiz_rules.json
+中的 question 规则（1~9 位半角数字加半角句点）。扫描直接在字节上进行，
+因此只支持与 ASCII 兼容的编码（UTF-8、GB18030/GBK），编码识别见
+quiz_encoding。与完整解析的区别：
+- 题目按原文顺序排列、按顺序编号，题型在取题时才确定（不按题型重排）
+- 独立解析（解析：）中以题号开头的续行在完整解析中会被跳过，这里会被
+  当作新题的开始
+
+IndexLoader 在后台线程中建立索引，队列消息与 quiz_loader.BankLoader
+相同（扫描中发送 ('progress', None, p)），完成后 bank 属性为 MappedBank。
+FingerprintScanner 在后台线程中逐题计算指纹（重置答题记录时使用）。
+
+可运行 `python quiz_mmap.py 题库.txt` 查看建立索引的耗时和内存占用。
+"""
+import codecs
+import mmap
+import queue
+import re
+import sys
+import threading
+import time
+from array import array
+from collections import OrderedDict
+
+import quiz_encoding
+import quiz_parser
+import quiz_progress
+
+# 缓存的已解析题目数
+CACHED_QUESTIONS = 256
+
+# 每次扫描的字节数（扫描完即交还这部分页面，并更新进度、检查取消）
+SCAN_CHUNK = 64 * 1024 * 1024
+
+# 题号行中题号的写法（与 quiz_rules.json 的 question 规则一致）
+QUESTION_NUMBER = rb'[0-9]{1,9}\.'
+
+# 取题后交还页面时向两侧扩展的字节数（缺页时内核会顺带映射附近的页，见 release）
+RELEASE_MARGIN = 2 * 1024 * 1024
+
+# 可以按字节扫描的编码（扫描时空白字符按该编码匹配）
+BYTE_ENCODINGS = {'utf-8': 'utf-8', 'utf-8-sig': 'utf-8', 'gb18030': 'gb18030'}
+
+
+class IndexCancelled(Exception):
+    """建立索引已被取消"""
+
+
+def question_start_patterns(encoding):
+    """返回 (文件开头, 换行符 LF 之后, 单独的回车符 CR 之后) 的题号行字节正则
+
+    行首可以有 quiz_parser.WHITESPACE 中的空白（按文件编码匹配，换行符
+    除外）。后两个正则从换行符开始匹配（以固定字节开头的正则扫描较快），
+    题目起点为换行符之后。
+    """
+    spaces = sorted({c.encode(encoding) for c in quiz_parser.WHITESPACE if c not in '\r\n'},
+                    key=len, reverse=True)
+    space = b'(?:' + b'|'.join(re.escape(s) for s in spaces) + b')*'
+    return (re.compile(space + QUESTION_NUMBER),
+            re.compile(b'\n' + space + QUESTION_NUMBER),
+            re.compile(b'\r(?!\n)' + space + QUESTION_NUMBER))
+
+
+class MappedBank:
+    """内存映射的文本题库
+
+    支持 len()、下标访问和迭代，可直接作为界面的 questions/filtered_questions
+    使用；progress 为答题记录（quiz_progress.ProgressStore），取题时据此
+    恢复答题状态。
+    """
+
+    def __init__(self, path, progress=None, check_cancelled=None, on_progress=None):
+        self.path = path
+        self.progress = progress
+        self.cache = OrderedDict()  # 下标 -> Question
+        self.scan_seconds = 0.0
+        with open(path, 'rb') as f:
+            size = f.seek(0, 2)
+            self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else b''
+        try:
+            self.encoding = quiz_encoding.detect_encoding(self.mm[:quiz_encoding.PROBE_SIZE],
+                                                          complete=size <= quiz_encoding.PROBE_SIZE)
+            if self.encoding not in BYTE_ENCODINGS:
+                raise ValueError(f"映射模式不支持 {self.encoding} 编码的题库，请转换为 UTF-8")
+            self.offsets = self.scan(check_cancelled, on_progress)
+        except BaseException:
+            self.close()
+            raise
+
+    def scan(self, check_cancelled=None, on_progress=None):
+        """扫描全文，返回题目起始偏移（末尾附文件长度）"""
+        start_time = time.perf_counter()
+        mm = self.mm
+        size = len(mm)
+        first, after_lf, after_cr = question_start_patterns(BYTE_ENCODINGS[self.encoding])
+        # 只有文件中出现回车符时才需要查找以单独的 \r 换行的行
+        patterns = (after_lf, after_cr) if mm.find(b'\r') >= 0 else (after_lf,)
+        offsets = array('Q')
+        if first.match(mm, len(codecs.BOM_UTF8) if self.encoding == 'utf-8-sig' else 0):
+            offsets.append(0)
+        madvise = getattr(mm, 'madvise', None)
+        if madvise is not None and hasattr(mmap, 'MADV_SEQUENTIAL'):
+            madvise(mmap.MADV_SEQUENTIAL)
+        position = 0
+        while position < size:
+            end = min(position + SCAN_CHUNK, size)
+            starts = []
+            for pattern in patterns:
+                # 匹配从换行符开始且不跨行，从块内开始的匹配可以延伸到块外
+                for m in pattern.finditer(mm, position):
+                    if m.start() >= end:
+                        break
+                    starts.append(m.start() + 1)
+            if len(patterns) > 1:
+                starts.sort()
+            offsets.extend(starts)
+            self.release(position, end)
+            position = end
+            if on_progress is not None:
+                on_progress(position / size)
+            if check_cancelled is not None:
+                check_cancelled()
+        if madvise is not None and hasattr(mmap, 'MADV_RANDOM'):
+            madvise(mmap.MADV_RANDOM)
+        offsets.append(size)
+        self.scan_seconds = time.perf_counter() - start_time
+        return offsets
+
+    def release(self, start, end):
+        """把 [start, end) 附近的页交还给页缓存（不支持 madvise 时不处理）
+
+        读取一页缺页时内核会顺带映射附近已在页缓存中的页（fault-around，
+        页缓存使用大页时为整个大页，最大 2 MB），因此向两侧各扩展
+        RELEASE_MARGIN 再交还。
+        """
+        if isinstance(self.mm, mmap.mmap) and hasattr(mmap, 'MADV_DONTNEED') and end > start:
+            start = max(0, start - RELEASE_MARGIN)
+            start -= start % mmap.PAGESIZE
+            end = min(len(self.mm), end + RELEASE_MARGIN)
+            self.mm.madvise(mmap.MADV_DONTNEED, start, end - start)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        question = self.cache.get(index)
+        if question is None:
+            question = self.cache[index] = self.parse(index)
+            if len(self.cache) > CACHED_QUESTIONS:
+                self.cache.popitem(last=False)
+        else:
+            self.cache.move_to_end(index)
+        return question
+
+    def __iter__(self):
+        """按顺序逐题解析（不放入缓存，遍历整个题库时内存不增长）"""
+        for index in range(len(self)):
+            question = self.cache.get(index)
+            yield question if question is not None else self.parse(index)
+
+    def parse(self, index):
+        """解码并解析第 index 道题，恢复答题状态"""
+        question = self.read_question(index)
+        if self.progress is not None:
+            stats = self.progress.get(quiz_progress.fingerprint(question))
+            if stats is not None:
+                question.answered = True
+                question.answered_correct = stats.correct > 0
+        return question
+
+    def read_question(self, index):
+        """解码并解析第 index 道题（不恢复答题状态，可在其他线程中调用）"""
+        start, end = self.offsets[index], self.offsets[index + 1]
+        data = self.mm[start:end]
+        self.release(start, end)
+        text = data.decode(BYTE_ENCODINGS[self.encoding], errors='replace')
+        question = next(quiz_parser.iter_questions(quiz_parser.split_lines(text)), None)
+        if question is None:
+            question = quiz_parser.Question(0, text.strip(quiz_parser.WHITESPACE))
+            question.options = ()
+        question.number = index + 1
+        return question
+
+    def invalidate(self):
+        """清空已解析题目的缓存（答题记录批量变化后调用）"""
+        self.cache.clear()
+
+    def close(self):
+        if isinstance(self.mm, mmap.mmap):
+            self.mm.close()
+
+
+class IndexLoader(threading.Thread):
+    """在后台线程中打开 MappedBank（消息格式见 quiz_loader.BankLoader）"""
+
+    def __init__(self, path, progress=None):
+        super().__init__(daemon=True)
+        self.path = path
+        self.progress_store = progress
+        self.bank = None
+        self.queue = queue.Queue()
+        self._cancel_event = threading.Event()
+
+    def cancel(self):
+        """请求取消（在下一个扫描块边界生效）"""
+        self._cancel_event.set()
+
+    def check_cancelled(self):
+        if self._cancel_event.is_set():
+            raise IndexCancelled()
+
+    def run(self):
+        try:
+            self.bank = MappedBank(self.path, self.progress_store, self.check_cancelled,
+                                   lambda p: self.queue.put(('progress', None, p)))
+        except IndexCancelled:
+            self.queue.put(('cancelled', None, 0.0))
+        except Exception as e:
+            self.queue.put(('error', f"映射题库失败：{str(e)}", 0.0))
+        else:
+            self.queue.put(('done', None, 1.0))
+
+
+class FingerprintScanner(threading.Thread):
+    """在后台线程中逐题计算 MappedBank 的题目指纹
+
+    只保留 recorded（有答题记录的指纹集合）中的指纹，完成时发出
+    ('done', 指纹列表, 1.0)，其余消息同 IndexLoader。逐题解析整个文件的
+    耗时与完整解析相当，因此不在界面线程中进行；运行期间不能关闭 bank。
+    """
+
+    def __init__(self, bank, recorded):
+        super().__init__(daemon=True)
+        self.bank = bank
+        self.recorded = recorded
+        self.queue = queue.Queue()
+        self._cancel_event = threading.Event()
+
+    def cancel(self):
+        """请求取消（在下一道题之前生效）"""
+        self._cancel_event.set()
+
+    def run(self):
+        bank, recorded = self.bank, self.recorded
+        count = len(bank)
+        step = max(1, count // 100)  # 约每 1% 发送一次进度
+        found = []
+        try:
+            for index in range(count):
+                if self._cancel_event.is_set():
+                    raise IndexCancelled()
+                if index % step == 0:
+                    self.queue.put(('progress', None, index / count))
+                fp = quiz_progress.fingerprint(bank.read_question(index))
+                if fp in recorded:
+                    found.append(fp)
+        except IndexCancelled:
+            self.queue.put(('cancelled', None, 0.0))
+        except Exception as e:
+            self.queue.put(('error', f"计算题目指纹失败：{str(e)}", 0.0))
+        else:
+            self.queue.put(('done', found, 1.0))
+
+
+def resident_kb():
+    """当前进程的常驻内存（KB），无法读取时为 None"""
+    try:
+        with open('/proc/self/status', 'r') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+if __name__ == "__main__":
+    for name in sys.argv[1:]:
+        before = resident_kb()
+        bank = MappedBank(name)
+        after = resident_kb()
+        print(f"{name}: {len(bank.mm) / 1e6:.1f} MB，{len(bank)} 道题，{bank.encoding}，"
+              f"建立索引 {bank.scan_seconds * 1000:.0f} ms，常驻内存 {before} KB -> {after} KB")
+        if len(bank):
+            print(f"  第 1 题：{bank[0].question[:40]}")
+        bank.close()
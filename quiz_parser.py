@@ -0,0 +1,280 @@
+"""题库文本解析模块
+
+将题库文本行解析为 Question 对象列表，供 quiz_app.py 使用。
+所有正则均预编译，逐行一次扫描完成分类、题型判断和按题型分桶，
+最后只对题目（而非文本行）做一次编号。iter_questions 可直接消费
+文件流，逐题产出，便于界面在整个文件解析完之前先显示题目。
+
+解析规则（行的分隔与首尾空白、题号/选项/答案/解析行的识别、题型
+判断规则和题型顺序）定义在 quiz_rules.json 中，手机网页版
+quiz_mobile.html 内嵌同一份规则表并按相同的语义执行：
+- 文本按 line_break 分行（与 Python 文本模式的通用换行一致），每行去掉
+  whitespace 中的首尾字符，跳过空行
+- 按 question、option、answer_prefix、analysis_prefix 的顺序识别每行，
+  第一道题之前的行和无法识别的行忽略；question_first、option_first 为
+  题号行、选项行可能的首字符，首字符不在其中的行不再执行对应的正则
+- 题型按 type_rules 的顺序取第一条全部条件都满足的规则
+两边是否一致由 tools/check_parser.py 用黄金语料和差分模糊测试检查。
+
+吞吐目标：在内置题库 sets/题库1.txt 上解析速度不低于
+TARGET_LINES_PER_SEC 行/秒，可运行 `python quiz_parser.py` 自检。
+"""
+import json
+import re
+import sys
+import time
+from collections import namedtuple
+from pathlib import Path
+
+RULES_PATH = Path(__file__).resolve().with_name('quiz_rules.json')
+
+with open(RULES_PATH, 'r', encoding='utf-8') as _f:
+    RULES = json.load(_f)
+
+# 解析器版本：解析结果的格式或规则变化时递增（用于缓存失效），随规则表一起修改
+PARSER_VERSION = RULES['version']
+
+# 解析吞吐目标（行/秒），在内置题库上测得
+TARGET_LINES_PER_SEC = 500_000
+
+# 预编译正则
+LINE_BREAK_RE = re.compile(RULES['line_break'])
+QUESTION_RE = re.compile(RULES['question'])
+OPTION_RE = re.compile(RULES['option'])
+NUMBER_RE = re.compile(RULES['number'])
+
+# 题号行、选项行可能的首字符（按首字符分派，避免对每行都执行正则）
+QUESTION_FIRST = frozenset(RULES['question_first'])
+OPTION_FIRST = frozenset(RULES['option_first'])
+
+# 每行去掉的首尾空白字符
+WHITESPACE = RULES['whitespace']
+
+ANSWER_PREFIX = RULES['answer_prefix']
+ANALYSIS_PREFIX = RULES['analysis_prefix']
+ANALYSIS_LABEL = RULES['analysis_label']
+
+# 题型及其排序（题型顺序同时决定分桶下标）
+TYPE_ORDER = {name: order for order, name in enumerate(RULES['types'], 1)}
+
+
+def _compile_type_rule(rule):
+    """把一条题型规则转为 (题型, 选项数集合, 选项文字对, 答案集合, 答案须包含的文字)，未指定的条件为 None"""
+    count = rule.get('option_count')
+    pairs = rule.get('options_pair')
+    answers = rule.get('answer_in')
+    return (rule['type'],
+            frozenset(count) if count is not None else None,
+            tuple(tuple(pair) for pair in pairs) if pairs is not None else None,
+            frozenset(answers) if answers is not None else None,
+            rule.get('answer_contains'))
+
+
+TYPE_RULES = tuple(_compile_type_rule(rule) for rule in RULES['type_rules'])
+
+# 选项：字母（单字符字符串由解释器共享）和选项内容
+Option = namedtuple('Option', ['letter', 'text'])
+
+
+class Question:
+    """题目
+
+    使用 __slots__ 代替字典，选项为 Option 元组，大题库下可显著节省内存。
+    """
+    __slots__ = ('original_number', 'number', 'question', 'options', 'answer',
+                 'answer_analysis', 'type', 'source', 'answered', 'answered_correct')
+
+    def __init__(self, original_number, question):
+        self.original_number = original_number  # 原始编号
+        self.number = 0                          # 按题型排序后的编号
+        self.question = question
+        self.options = []                        # 解析完成后转为元组
+        self.answer = ''
+        self.answer_analysis = None              # 答案与解析合并后的显示文本
+        self.type = '未知'
+        self.source = None                       # 来源题库文件名（由加载器设置）
+        self.answered = False
+        self.answered_correct = False
+
+    @property
+    def type_order(self):
+        """题型顺序（单选 1、多选 2、判断 3）"""
+        return TYPE_ORDER.get(self.type, 0)
+
+    def __repr__(self):
+        return f"Question({self.number}, {self.type}, 原{self.original_number})"
+
+
+def determine_question_type(question):
+    """根据选项和答案判断题型：取 TYPE_RULES 中第一条全部条件都满足的规则"""
+    options = question.options
+    answer = question.answer.strip(WHITESPACE)
+    for name, counts, pairs, answers, contains in TYPE_RULES:
+        if counts is not None and len(options) not in counts:
+            continue
+        if pairs is not None:
+            # 恰有两个选项，且选项文字为其中一对（如"对""错"）
+            if len(options) != 2:
+                continue
+            texts = (options[0].text, options[1].text)
+            if not any(a in texts and b in texts for a, b in pairs):
+                continue
+        if answers is not None and answer not in answers:
+            continue
+        if contains is not None and contains not in answer:
+            continue
+        return name
+    return '未知'
+
+
+def reorder_questions_by_type(questions):
+    """按题型分类并重新编号"""
+    buckets = ([], [], [])
+    for q in questions:
+        order = TYPE_ORDER.get(q.type)
+        if order:
+            buckets[order - 1].append(q)
+    return _number_buckets(buckets)
+
+
+def _number_buckets(buckets):
+    """按单选、多选、判断的顺序合并各桶并连续编号"""
+    all_questions = []
+    number = 1
+    for bucket in buckets:
+        for q in bucket:
+            q.number = number
+            number += 1
+        all_questions.extend(bucket)
+    return all_questions
+
+
+def iter_lines(f):
+    """逐行读取文件对象（或任意文本行序列），产出去除首尾空白后的非空行"""
+    for line in f:
+        line = line.strip(WHITESPACE)
+        if line:
+            yield line
+
+
+def split_lines(text):
+    """把整段文本按 line_break 分行，产出去除首尾空白后的非空行"""
+    return iter_lines(LINE_BREAK_RE.split(text))
+
+
+def iter_questions(lines):
+    """逐题解析题目文本（生成器）
+
+    lines 为已去除首尾空白的非空文本行的可迭代对象，可以是文件流。
+    单次遍历，每道题结束时即判断题型并产出，题目按原文顺序产出，
+    此时尚未编号（编号见 reorder_questions_by_type）。
+    """
+    completed = 0            # 已完成的题目数（用于解析续行的终止条件）
+    current = None           # 正在解析的题目
+    expect_analysis = False  # 上一行是答案，本行若为解析则与答案合并
+    analysis = None          # 正在收集的独立解析（多行）
+    analysis_stops = None    # 独立解析续行的终止前缀
+
+    question_match = QUESTION_RE.match
+    option_match = OPTION_RE.match
+    number_match = NUMBER_RE.match
+    question_first = QUESTION_FIRST
+    option_first = OPTION_FIRST
+    new_option = tuple.__new__  # 直接构造 Option，跳过 namedtuple 生成的 __new__
+
+    for line in lines:
+        # 独立解析的续行：直到遇到答案、解析或当前题号为止
+        if analysis is not None:
+            if not line.startswith(analysis_stops):
+                if line and not number_match(line):
+                    analysis += '\n' + line
+                continue
+            if current.answer_analysis is not None:
+                current.answer_analysis += '\n\n' + analysis
+            else:
+                current.answer_analysis = analysis
+            analysis = None
+
+        # 答案后紧跟的解析，与答案合并
+        if expect_analysis:
+            expect_analysis = False
+            if line.startswith(ANALYSIS_PREFIX):
+                analysis_text = line.replace(ANALYSIS_PREFIX, '').strip(WHITESPACE)
+                current.answer_analysis = f"{current.answer}\n\n{ANALYSIS_LABEL}{analysis_text}"
+                continue
+
+        # 按首字符分派：只有可能是题号行、选项行的行才执行对应的正则
+        first = line[:1]
+
+        # 检测题目开始
+        if first in question_first and (m := question_match(line)):
+            if current is not None:
+                current.options = tuple(current.options)
+                current.type = determine_question_type(current)
+                yield current
+                completed += 1
+            number, text = m.groups()
+            current = Question(int(number), text.strip(WHITESPACE))
+        elif current is None:
+            continue
+
+        # 检测选项
+        elif first in option_first and (m := option_match(line)):
+            letter, text = m.groups()
+            current.options.append(new_option(Option, (letter, text.strip(WHITESPACE))))
+
+        # 检测答案
+        elif line.startswith(ANSWER_PREFIX):
+            answer_text = line.replace(ANSWER_PREFIX, '').strip(WHITESPACE)
+            current.answer = answer_text
+            current.answer_analysis = answer_text
+            expect_analysis = True
+
+        # 检测单独的解析（用于其他格式）
+        elif line.startswith(ANALYSIS_PREFIX):
+            analysis = line.replace(ANALYSIS_PREFIX, '').strip(WHITESPACE)
+            analysis_stops = (ANSWER_PREFIX, ANALYSIS_PREFIX, f'{completed + 1}.')
+
+    if analysis is not None:
+        if current.answer_analysis is not None:
+            current.answer_analysis += '\n\n' + analysis
+        else:
+            current.answer_analysis = analysis
+
+    # 产出最后一题
+    if current is not None:
+        current.options = tuple(current.options)
+        current.type = determine_question_type(current)
+        yield current
+
+
+def parse_questions(lines):
+    """解析题目文本
+
+    单次遍历 iter_questions 的输出，题目产出时即按题型放入对应的桶，
+    最后统一编号。
+    """
+    buckets = ([], [], [])
+    for q in iter_questions(lines):
+        buckets[TYPE_ORDER[q.type] - 1].append(q)
+    return _number_buckets(buckets)
+
+
+def benchmark(path, repeat=20):
+    """测量解析吞吐量，返回 (行数, 题目数, 行/秒)"""
+    with open(path, 'r', encoding='utf-8') as f:
+        lines = list(iter_lines(f))
+
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        questions = parse_questions(lines)
+        best = min(best, time.perf_counter() - start)
+    return len(lines), len(questions), len(lines) / best
+
+
+if __name__ == "__main__":
+    bank = Path(sys.argv[1]) if len(sys.argv) > 1 else Path(__file__).parent / "sets" / "题库1.txt"
+    line_count, question_count, rate = benchmark(bank)
+    print(f"{bank.name}: {line_count} 行, {question_count} 道题, {rate:,.0f} 行/秒 (目标 {TARGET_LINES_PER_SEC:,})")
+    sys.exit(0 if rate >= TARGET_LINES_PER_SEC else 1)
@@ -0,0 +1,339 @@
+"""答题记录持久化模块
+
+答题记录以题目指纹（题干、选项和答案的哈希，不受按题型重新编号影响）
+为键，保存在进度目录下的两个二进制文件中：
+- progress.log：追加写入的日志，每次提交答案或重置追加一条定长记录
+  （指纹、结果、时间），写入后立即 flush，fsync 按批进行
+- progress.snapshot：压缩后的快照，按列保存每道题的汇总（指纹、答题次数、
+  答对次数、最后一次结果和时间、连续答对次数），读取时每列一次 array.frombytes
+
+日志超过 COMPACT_THRESHOLD 条时把快照和日志合并为新快照并清空日志，
+因此启动时读取的数据量与题目数成正比，而与累计答题次数无关。
+快照和日志头部都记录代数（generation）：压缩时先原子替换快照（代数加一），
+再原子替换为新代数的空日志；若两步之间中断，下次读取时旧代数的日志
+已包含在快照中，直接丢弃，不会重复计数。
+
+可运行 `python tools/bench_progress.py` 测量 100 万条答题记录的读取耗时。
+"""
+import hashlib
+import os
+import struct
+import sys
+import time
+from array import array
+from pathlib import Path
+
+# 文件格式版本，格式变化时递增（版本 2 的快照增加了连续答对次数一列，
+# 日志记录不变；版本 1 的文件仍可读取）
+PROGRESS_FORMAT = 2
+READABLE_FORMATS = (1, 2)
+
+DEFAULT_PROGRESS_DIR = Path(__file__).resolve().parent / '.progress'
+
+LOG_NAME = 'progress.log'
+SNAPSHOT_NAME = 'progress.snapshot'
+
+# 头部：魔数、格式版本、代数
+HEADER = struct.Struct('<4sII')
+LOG_MAGIC = b'DSPL'
+SNAPSHOT_MAGIC = b'DSPS'
+
+# 日志记录：指纹、结果、时间戳
+LOG_RECORD = struct.Struct('<QBd')
+
+# 快照：头部后为题目数，随后依次是各列（指纹、答题次数、答对次数、
+# 最后一次是否答对、最后答题时间、连续答对次数），均为小端字节序
+SNAPSHOT_COUNT = struct.Struct('<Q')
+COLUMN_NAMES = ('fingerprints', 'attempts', 'correct', 'last_correct', 'last_time', 'streak')
+SNAPSHOT_COLUMNS = ('Q', 'I', 'I', 'B', 'd', 'I')
+BIG_ENDIAN = sys.byteorder == 'big'
+
+# 日志记录的结果
+RESULT_WRONG = 0
+RESULT_CORRECT = 1
+RESULT_RESET = 2
+
+# 日志记录数超过此值时压缩
+COMPACT_THRESHOLD = 10_000
+
+# 距上次 fsync 超过此秒数或未同步记录达到此条数时 fsync
+FSYNC_INTERVAL = 2.0
+FSYNC_BATCH = 64
+
+
+def fingerprint(question):
+    """题目指纹：规范化后的题干、选项和答案的 64 位哈希"""
+    h = hashlib.blake2b(digest_size=8)
+    h.update(' '.join(question.question.split()).encode('utf-8'))
+    for option in question.options:
+        h.update(b'\x1f')
+        h.update(' '.join(option.text.split()).encode('utf-8'))
+    h.update(b'\x1e')
+    h.update(question.answer.strip().encode('utf-8'))
+    return int.from_bytes(h.digest(), 'little')
+
+
+class QuestionStats:
+    """一道题的答题汇总（读取时的快照）"""
+    __slots__ = ('attempts', 'correct', 'last_correct', 'last_time', 'streak')
+
+    def __init__(self, attempts, correct, last_correct, last_time, streak):
+        self.attempts = attempts
+        self.correct = correct
+        self.last_correct = last_correct
+        self.last_time = last_time
+        self.streak = streak        # 连续答对次数（最近一次答错后清零）
+
+    @property
+    def wrong(self):
+        return self.attempts - self.correct
+
+
+class ProgressStore:
+    """答题记录存储
+
+    汇总按列保存在 array 中，index 把指纹映射到行号；重置的题目答题次数
+    置 0，压缩时丢弃。enabled=False 时只在内存中记录，既不读也不写文件。
+    """
+
+    def __init__(self, directory=DEFAULT_PROGRESS_DIR, enabled=True,
+                 compact_threshold=COMPACT_THRESHOLD):
+        self.directory = Path(directory)
+        self.enabled = enabled
+        self.compact_threshold = compact_threshold
+        self.clear()
+        self.generation = 0
+        self.log = None          # 日志文件（追加模式）
+        self.log_records = 0     # 日志中的记录数
+        self.unsynced = 0        # 尚未 fsync 的记录数
+        self.last_sync = time.monotonic()
+        if enabled:
+            self.load()
+
+    def clear(self):
+        self.set_columns([array(code) for code in SNAPSHOT_COLUMNS])
+        self.index = {}          # 指纹 -> 行号
+
+    @property
+    def columns(self):
+        return [getattr(self, name) for name in COLUMN_NAMES]
+
+    def set_columns(self, columns):
+        for name, column in zip(COLUMN_NAMES, columns):
+            setattr(self, name, column)
+
+    @property
+    def log_path(self):
+        return self.directory / LOG_NAME
+
+    @property
+    def snapshot_path(self):
+        return self.directory / SNAPSHOT_NAME
+
+    def __len__(self):
+        """有答题记录的题目数"""
+        return len(self.attempts) - self.attempts.count(0)
+
+    def recorded(self):
+        """有答题记录的题目指纹集合（快照）"""
+        attempts = self.attempts
+        return {fp for fp, row in self.index.items() if attempts[row]}
+
+    def get(self, fp):
+        """返回题目的答题汇总，没有记录时返回 None"""
+        row = self.index.get(fp)
+        if row is None or not self.attempts[row]:
+            return None
+        return QuestionStats(self.attempts[row], self.correct[row],
+                             bool(self.last_correct[row]), self.last_time[row], self.streak[row])
+
+    # ---- 读取 ----
+
+    def load(self):
+        """读取快照和日志；文件损坏时忽略对应部分"""
+        self.clear()
+        self.generation = 0
+        self.load_snapshot()
+        self.log_records = self.load_log()
+        if self.log_records > self.compact_threshold:
+            self.compact()
+
+    def load_snapshot(self):
+        try:
+            data = self.snapshot_path.read_bytes()
+            magic, version, generation = HEADER.unpack_from(data)
+            count, = SNAPSHOT_COUNT.unpack_from(data, HEADER.size)
+        except (OSError, struct.error):
+            return
+        if magic != SNAPSHOT_MAGIC or version not in READABLE_FORMATS:
+            return
+        columns = [array(code) for code in SNAPSHOT_COLUMNS]
+        if version == 1:
+            # 版本 1 没有连续答对次数，按最后一次是否答对估计
+            columns.pop()
+        offset = HEADER.size + SNAPSHOT_COUNT.size
+        for column in columns:
+            size = count * column.itemsize
+            if offset + size > len(data):
+                return
+            column.frombytes(data[offset:offset + size])
+            if BIG_ENDIAN:
+                column.byteswap()
+            offset += size
+        if version == 1:
+            columns.append(array('I', columns[COLUMN_NAMES.index('last_correct')]))
+        self.set_columns(columns)
+        self.index = dict(zip(self.fingerprints, range(count)))
+        self.generation = generation
+
+    def load_log(self):
+        """回放与快照同代的日志，返回有效记录数"""
+        try:
+            data = self.log_path.read_bytes()
+            magic, version, generation = HEADER.unpack_from(data)
+        except (OSError, struct.error):
+            return 0
+        if magic != LOG_MAGIC or version not in READABLE_FORMATS or generation != self.generation:
+            # 旧代数的日志已并入快照
+            return 0
+        body = memoryview(data)[HEADER.size:]
+        # 末尾不完整的记录（写入中断）忽略，重新打开日志时截断
+        body = body[:len(body) - len(body) % LOG_RECORD.size]
+        for fp, result, timestamp in LOG_RECORD.iter_unpack(body):
+            self.apply(fp, result, timestamp)
+        return len(body) // LOG_RECORD.size
+
+    def apply(self, fp, result, timestamp):
+        """把一条日志记录合并到汇总中"""
+        row = self.index.get(fp)
+        if result == RESULT_RESET:
+            if row is not None:
+                self.attempts[row] = self.correct[row] = self.last_correct[row] = self.streak[row] = 0
+            return
+        if row is None:
+            row = self.index[fp] = len(self.fingerprints)
+            self.fingerprints.append(fp)
+            self.attempts.append(0)
+            self.correct.append(0)
+            self.last_correct.append(0)
+            self.last_time.append(0.0)
+            self.streak.append(0)
+        correct = result == RESULT_CORRECT
+        self.attempts[row] += 1
+        self.correct[row] += correct
+        self.last_correct[row] = correct
+        self.last_time[row] = timestamp
+        self.streak[row] = self.streak[row] + 1 if correct else 0
+
+    # ---- 写入 ----
+
+    def record(self, fp, correct):
+        """记录一次答题：O(1) 追加一条日志"""
+        result = RESULT_CORRECT if correct else RESULT_WRONG
+        timestamp = time.time()
+        self.apply(fp, result, timestamp)
+        self.append(LOG_RECORD.pack(fp, result, timestamp), 1)
+
+    def reset(self, fps):
+        """清除若干题目的答题记录"""
+        timestamp = time.time()
+        records = []
+        for fp in fps:
+            if self.get(fp) is not None:
+                self.apply(fp, RESULT_RESET, timestamp)
+                records.append(LOG_RECORD.pack(fp, RESULT_RESET, timestamp))
+        if records:
+            self.append(b''.join(records), len(records))
+
+    def append(self, data, count):
+        if not self.enabled:
+            return
+        try:
+            if self.log is None:
+                self.open_log()
+            self.log.write(data)
+            self.log.flush()
+        except OSError:
+            return
+        self.log_records += count
+        self.unsynced += count
+        if self.log_records > self.compact_threshold:
+            self.compact()
+        elif self.unsynced >= FSYNC_BATCH or time.monotonic() - self.last_sync >= FSYNC_INTERVAL:
+            self.sync()
+
+    def open_log(self):
+        """以追加方式打开日志；日志不存在、代数不符或末尾有不完整记录时先修复"""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        valid = HEADER.size + self.log_records * LOG_RECORD.size
+        try:
+            size = self.log_path.stat().st_size
+        except OSError:
+            size = None
+        if size is None or self.log_records == 0:
+            self.write_empty_log()
+        elif size != valid:
+            with open(self.log_path, 'r+b') as f:
+                f.truncate(valid)
+        self.log = open(self.log_path, 'ab')
+
+    def write_empty_log(self):
+        """原子替换为当前代数的空日志"""
+        tmp_path = self.log_path.with_name(LOG_NAME + '.tmp')
+        with open(tmp_path, 'wb') as f:
+            f.write(HEADER.pack(LOG_MAGIC, PROGRESS_FORMAT, self.generation))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.log_path)
+
+    def sync(self):
+        """把已写入的日志刷到磁盘"""
+        if self.log is not None and self.unsynced:
+            try:
+                os.fsync(self.log.fileno())
+            except OSError:
+                return
+        self.unsynced = 0
+        self.last_sync = time.monotonic()
+
+    def compact(self):
+        """把当前汇总（去掉已重置的题目）写为新一代快照，并清空日志"""
+        if not self.enabled:
+            return
+        if self.log is not None:
+            self.log.close()
+            self.log = None
+        if self.attempts.count(0):
+            rows = [row for row, attempts in enumerate(self.attempts) if attempts]
+            self.set_columns([array(column.typecode, [column[row] for row in rows])
+                              for column in self.columns])
+            self.index = dict(zip(self.fingerprints, range(len(rows))))
+        generation = self.generation + 1
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.snapshot_path.with_name(SNAPSHOT_NAME + '.tmp')
+            with open(tmp_path, 'wb') as f:
+                f.write(HEADER.pack(SNAPSHOT_MAGIC, PROGRESS_FORMAT, generation))
+                f.write(SNAPSHOT_COUNT.pack(len(self.fingerprints)))
+                for column in self.columns:
+                    if BIG_ENDIAN:
+                        column = array(column.typecode, column)
+                        column.byteswap()
+                    column.tofile(f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.snapshot_path)
+            self.generation = generation
+            self.log_records = 0
+            self.write_empty_log()
+        except OSError:
+            return
+        self.unsynced = 0
+        self.last_sync = time.monotonic()
+
+    def close(self):
+        """同步并关闭日志"""
+        if self.log is not None:
+            self.sync()
+            self.log.close()
+            self.log = None
@@ -0,0 +1,198 @@
+"""间隔复习调度模块
+
+按 SM-2 算法为答过的题目计算下次复习时间，复习模式下"下一题"优先出
+已到期的题目。SM-2 的状态由答题记录的汇总推出，不另行保存：
+- 难度系数（ease）：从 DEFAULT_EASE 开始，每答错一次按 SM-2 的质量 2
+  扣 WRONG_EASE_PENALTY（答对按质量 4 不变），不低于 MIN_EASE
+- 间隔：连续答对 1 次为 1 天，2 次为 6 天，之后每次乘以 ease；
+  最近一次答错时 RELEARN_DELAY 秒后重新出现
+- 到期时间：最后答题时间 + 间隔
+
+ReviewScheduler 用最小堆（到期时间, 位置）维护答过的题目，取下一题和
+答题后更新都是均摊 O(log n)；堆中的过期条目和新题队列中已答过的题目
+不立即删除，取到时再丢弃。
+
+薄弱题模式按 weakness 权重随机抽题，WeightedSampler 用树状数组保存
+权重，答题后更新一道题的权重和抽样都是 O(log n)。
+本模块不依赖 tkinter。
+"""
+import heapq
+import random
+import time
+from array import array
+from collections import deque
+
+DAY = 86400
+
+# 答错后重新出现的间隔（秒）
+RELEARN_DELAY = 600
+
+DEFAULT_EASE = 2.5
+MIN_EASE = 1.3
+WRONG_EASE_PENALTY = 0.32
+
+
+def ease(stats):
+    """题目的难度系数"""
+    return max(MIN_EASE, DEFAULT_EASE - WRONG_EASE_PENALTY * stats.wrong)
+
+
+def interval(stats):
+    """距最后一次答题的复习间隔（秒）"""
+    streak = stats.streak
+    if streak == 0:
+        return RELEARN_DELAY
+    if streak == 1:
+        return DAY
+    return 6 * DAY * ease(stats) ** (streak - 2)
+
+
+def due_time(stats):
+    """下次复习的时间戳"""
+    return stats.last_time + interval(stats)
+
+
+class ReviewScheduler:
+    """复习队列
+
+    stats_list 为各题的答题汇总（按位置，未答过为 None）。next 依次选择：
+    最早到期的已到期题目、尚未答过的新题（按顺序轮换）、最早到期的题目。
+    """
+
+    def __init__(self, stats_list):
+        self.heap = []           # (到期时间, 位置)
+        self.due = {}            # 位置 -> 当前到期时间（判断堆条目是否过期）
+        self.new = deque()       # 未答过的题目位置
+        for pos, stats in enumerate(stats_list):
+            if stats is None:
+                self.new.append(pos)
+            else:
+                self.due[pos] = due_time(stats)
+        self.heap = [(due, pos) for pos, due in self.due.items()]
+        heapq.heapify(self.heap)
+
+    def peek(self):
+        """最早到期的 (到期时间, 位置)，没有答过的题目时为 None"""
+        heap = self.heap
+        while heap:
+            due, pos = heap[0]
+            if self.due.get(pos) == due:
+                return heap[0]
+            heapq.heappop(heap)
+        return None
+
+    def due_count(self, now=None):
+        """已到期的题目数（O(n)，用于显示）"""
+        now = time.time() if now is None else now
+        return sum(1 for due in self.due.values() if due <= now)
+
+    def next(self, now=None, exclude=None):
+        """返回下一道应做的题目位置，没有题目时为 None；尽量不返回 exclude"""
+        now = time.time() if now is None else now
+        top = self.peek()
+        if top is not None and top[0] <= now and top[1] != exclude:
+            return top[1]
+        if top is not None and top[1] == exclude:
+            # 当前题目最早到期时看第二早的
+            heapq.heappop(self.heap)
+            second = self.peek()
+            heapq.heappush(self.heap, top)
+            if second is not None and second[0] <= now:
+                return second[1]
+        new = self.new
+        for _ in range(len(new)):
+            pos = new.popleft()
+            if pos in self.due:
+                # 已答过，已移入堆中
+                continue
+            new.append(pos)
+            if pos != exclude:
+                return pos
+        if top is None:
+            return exclude if self.new else None
+        return top[1]
+
+    def update(self, pos, stats):
+        """题目答题后（stats 为新的汇总）重新安排"""
+        # 新题答过后仍留在 new 中，next 遇到时丢弃
+        due = self.due[pos] = due_time(stats)
+        heapq.heappush(self.heap, (due, pos))
+
+
+# ---- 薄弱题加权抽样 ----
+
+# 未答过的题目的权重（答过的题目以此为基准）
+NEW_WEIGHT = 1.0
+# 权重下限（答对很多次的题目仍有机会出现）
+MIN_WEIGHT = 0.05
+# 最近答题影响的半衰期（秒）：刚答错的题权重最多翻倍，刚答对的最多减半
+RECENCY_HALF_LIFE = DAY
+
+
+def weakness(stats, now=None):
+    """题目的抽样权重：错得越多越大，最近答错的更大，最近答对的更小"""
+    if stats is None:
+        return NEW_WEIGHT
+    now = time.time() if now is None else now
+    weight = NEW_WEIGHT * (1 + stats.wrong) / (1 + stats.correct)
+    recency = 0.5 ** (max(0.0, now - stats.last_time) / RECENCY_HALF_LIFE)
+    weight *= 1 - 0.5 * recency if stats.last_correct else 1 + recency
+    return max(MIN_WEIGHT, weight)
+
+
+class WeightedSampler:
+    """按权重随机抽取位置
+
+    权重保存在树状数组（Fenwick tree）中：修改单个权重和按权重抽样都是
+    O(log n)，答题后只更新该题，不必重建累积和。
+    """
+
+    def __init__(self, weights, rng=None):
+        self.weights = array('d', weights)
+        n = len(self.weights)
+        tree = array('d', bytes(8 * (n + 1)))
+        tree[1:] = self.weights
+        for i in range(1, n + 1):
+            parent = i + (i & -i)
+            if parent <= n:
+                tree[parent] += tree[i]
+        self.tree = tree
+        self.top = 1 << n.bit_length() - 1 if n else 0   # 不超过 n 的最大 2 的幂
+        self.rng = rng if rng is not None else random.Random()
+
+    def __len__(self):
+        return len(self.weights)
+
+    def total(self):
+        """权重之和"""
+        tree, i, total = self.tree, len(self.weights), 0.0
+        while i:
+            total += tree[i]
+            i &= i - 1
+        return total
+
+    def update(self, pos, weight):
+        """把位置 pos 的权重改为 weight"""
+        delta = weight - self.weights[pos]
+        self.weights[pos] = weight
+        tree, n, i = self.tree, len(self.weights), pos + 1
+        while i <= n:
+            tree[i] += delta
+            i += i & -i
+
+    def sample(self):
+        """按权重抽取一个位置，没有题目时为 None"""
+        n = len(self.weights)
+        if not n:
+            return None
+        target = self.rng.random() * self.total()
+        tree, pos, step = self.tree, 0, self.top
+        # 找到前缀和首次超过 target 的位置
+        while step:
+            nxt = pos + step
+            if nxt <= n and tree[nxt] <= target:
+                pos = nxt
+                target -= tree[nxt]
+            step >>= 1
+        # 浮点误差可能使 pos 越界
+        return min(pos, n - 1)
@@ -0,0 +1,222 @@
+"""题库全文搜索模块
+
+中文没有词边界，因此按字符二元组（bigram）建立倒排索引：每道题的题干、
+选项和答案解析去除空白、转为小写后，每个相邻两字符组合对应一个按题目
+下标升序排列的 array('I') 倒排表；单个字符另建一元倒排表。
+
+一元组、二元组以整数为键（见 gram_keys）：文本编码为 UTF-32 后直接把
+每 4/8 个字节解释为一个整数，不为每个二元组创建字符串；add 先把题目
+下标追加到按键分组的 array 中，flush 时再批量并入倒排表。
+
+查询同样规范化后：
+- 单字符：直接返回一元倒排表
+- 两个字符：直接返回二元倒排表（二元组出现即子串出现）
+- 更长的查询：取各二元组中最短的倒排表作为候选，再用原文核对子串
+  （核对是 C 实现的子串查找，比对多个长倒排表求交集更快）
+连续输入时新查询以上一次查询为前缀，只需在上一次的结果中核对子串。
+
+题目下标为建立索引时题目序列中的位置；索引在 IndexBuilder 后台线程中
+分块构建，每块之后让出 GIL，不阻塞 Tk 主循环。题库按题型排序时，同一
+题型的下标连续，按题型筛选只需二分查找。本模块不依赖 tkinter。
+"""
+import gc
+import sys
+import threading
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import defaultdict, deque
+from functools import partial
+from itertools import compress, islice, repeat
+from operator import le
+
+from quiz_parser import TYPE_ORDER
+
+# 各字段之间的分隔符（不会出现在查询中，跨字段的二元组不会被匹配）
+FIELD_SEPARATOR = '\x00'
+
+# 后台构建时每块的题目数（每块之后并入倒排表、检查取消并让出 GIL）
+BUILD_CHUNK = 1000
+
+
+def normalize(text):
+    """去除所有空白并转为小写"""
+    return ''.join(text.split()).lower()
+
+
+def gram_key(gram):
+    """一个一元组或二元组的整数键（与 gram_keys 的编码相同）"""
+    return int.from_bytes(gram.encode('utf-32-le'), sys.byteorder)
+
+
+def _bigram_keys(data):
+    """UTF-32 编码的文本中全部二元组的整数键集合
+
+    每个字符 4 字节，从第 0、4 字节起按 8 字节解释为整数，即依次得到
+    第 0-1、2-3…… 和第 1-2、3-4…… 个字符组成的二元组。
+    """
+    keys = set()
+    for start in (0, 4):
+        pairs = array('Q')
+        pairs.frombytes(data[start:start + (len(data) - start) // 8 * 8])
+        keys.update(pairs)
+    return keys
+
+
+def bigram_keys(text):
+    """text 中全部二元组的整数键集合"""
+    return _bigram_keys(text.encode('utf-32-le'))
+
+
+def gram_keys(text):
+    """text 中全部一元组和二元组的整数键集合
+
+    一元组的键小于 2**32；二元组的键只有第二个字符为 FIELD_SEPARATOR
+    时才与一元组相同，此时文本也包含该一元组，不影响结果。
+    """
+    data = text.encode('utf-32-le')
+    keys = _bigram_keys(data)
+    keys.update(memoryview(data).cast('I'))
+    return keys
+
+
+def search_text(question):
+    """题目的可搜索文本：题干、各选项和答案解析"""
+    fields = [question.question]
+    fields.extend(option.text for option in question.options)
+    if question.answer_analysis is not None:
+        fields.append(question.answer_analysis)
+    return FIELD_SEPARATOR.join(map(normalize, fields))
+
+
+class SearchIndex:
+    """字符二元组倒排索引"""
+
+    def __init__(self):
+        self.texts = []              # 各题的规范化文本（用于核对子串）
+        self.types = array('B')      # 各题的题型顺序
+        self.postings = {}           # 一元组/二元组的键 -> 题目下标倒排表
+        # add 追加、尚未并入 postings 的题目下标（array 不受垃圾回收跟踪，大量创建不会触发完整回收）
+        self.pending = defaultdict(partial(array, 'I'))
+        self.last_query = None       # 上一次查询及其结果（用于前缀增量查询）
+        self.last_result = None
+        self._type_ranges = None     # (题目数, 各题型的下标区间)，见 type_ranges
+
+    def __len__(self):
+        return len(self.texts)
+
+    def add(self, text, type_order):
+        """追加一道题（text 为 search_text 的结果），下标依次递增"""
+        doc = len(self.texts)
+        self.texts.append(text)
+        self.types.append(type_order)
+        # 逐个键追加下标的循环在 C 中进行
+        deque(map(array.append, map(self.pending.__getitem__, gram_keys(text)), repeat(doc)), maxlen=0)
+
+    def flush(self):
+        """把 add 追加的题目下标并入倒排表（查询前自动调用）"""
+        postings = self.postings
+        for key, docs in self.pending.items():
+            posting = postings.get(key)
+            if posting is None:
+                postings[key] = docs
+            else:
+                posting.extend(docs)
+        self.pending.clear()
+
+    def search(self, query, type=None):
+        """返回包含 query 的题目下标（升序），type 为题型时只返回该题型"""
+        query = normalize(query)
+        if not query:
+            return []
+        if self.pending:
+            self.flush()
+        docs = self.find(query)
+        if type is not None:
+            docs = self.filter_type(docs, TYPE_ORDER[type])
+        return docs
+
+    def filter_type(self, docs, order):
+        """升序的题目下标 docs 中题型顺序为 order 的部分"""
+        ranges = self.type_ranges()
+        if ranges is None:
+            # 取出各结果的题型再筛选，循环在 C 中进行
+            return list(compress(docs, map(order.__eq__, map(self.types.__getitem__, docs))))
+        # 同一题型的题目下标连续，二分查找该区间即可
+        start, stop = ranges.get(order, (0, 0))
+        return docs[bisect_left(docs, start):bisect_left(docs, stop)]
+
+    def type_ranges(self):
+        """题型顺序非递减时（题库已按题型排序）各题型的下标区间
+
+        返回 {题型顺序: (起, 止)}，题型未排序时为 None；题目数不变时复用上次结果。
+        """
+        types = self.types
+        if self._type_ranges is None or self._type_ranges[0] != len(types):
+            ranges = None
+            if all(map(le, types, islice(types, 1, None))):
+                ranges = {order: (bisect_left(types, order), bisect_right(types, order))
+                          for order in set(types)}
+            self._type_ranges = (len(types), ranges)
+        return self._type_ranges[1]
+
+    def find(self, query):
+        if len(query) <= 2:
+            return self.postings.get(gram_key(query), ())
+        if self.last_query and len(self.last_query) > 2 and query.startswith(self.last_query):
+            # 在上一次（前缀）的结果中核对
+            candidates = self.last_result
+        else:
+            candidates = self.candidates(query)
+        texts = self.texts
+        result = [doc for doc in candidates if query in texts[doc]]
+        self.last_query, self.last_result = query, result
+        return result
+
+    def candidates(self, query):
+        """query 中最少见的二元组的倒排表；任一二元组不存在时为空"""
+        shortest = None
+        for key in bigram_keys(query):
+            posting = self.postings.get(key)
+            if not posting:
+                return ()
+            if shortest is None or len(posting) < len(shortest):
+                shortest = posting
+        return shortest
+
+
+class IndexBuilder(threading.Thread):
+    """在后台线程中构建搜索索引
+
+    rows 为无参函数，在后台线程中调用，返回按题目下标顺序产出
+    (可搜索文本, 题型顺序) 的可迭代对象。每 BUILD_CHUNK 道题并入一次倒排表
+    并短暂让出 GIL，界面线程不会长时间等待。构建完成后 index 可用，done 为 True。
+    """
+
+    def __init__(self, rows):
+        super().__init__(daemon=True)
+        self.rows = rows
+        self.index = SearchIndex()
+        self.done = False
+        self._cancel_event = threading.Event()
+
+    def cancel(self):
+        self._cancel_event.set()
+
+    def run(self):
+        index = self.index
+        # 冻结已加载的题库等对象：构建中触发的完整垃圾回收不再遍历它们，
+        # 否则每次回收都持有 GIL 数百毫秒，界面随之卡顿
+        gc.freeze()
+        try:
+            for count, (text, type_order) in enumerate(self.rows(), 1):
+                index.add(text, type_order)
+                if count % BUILD_CHUNK == 0:
+                    index.flush()
+                    if self._cancel_event.is_set():
+                        return
+                    time.sleep(0)  # 让出 GIL
+            index.flush()
+        finally:
+            gc.unfreeze()
+        self.done = True
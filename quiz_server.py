@@ -0,0 +1,433 @@
+"""局域网刷题服务器
+
+用 asyncio 实现的轻量 HTTP/1.1 服务器（不依赖第三方库），供一个教室的
+手机同时刷题：
+- 启动时只解析一次题库，按题型分页的题目 JSON 预先序列化并 gzip 压缩，
+  带 ETag；请求时直接写出缓存的字节，If-None-Match 命中时返回 304
+- 作答由服务器判题（quiz_grading）并集中记录：每个用户一个
+  ProgressStore，位于进度目录下的 users/<用户>/；读写答题记录（含
+  fsync）在线程池中进行，不阻塞事件循环
+- 处理请求时的意外异常输出到标准错误并返回 500，不中断其他请求
+- GET / 返回 quiz_mobile.html，页面检测到服务器接口后改为从接口分页
+  加载题目，不再在每台手机上解析题库
+
+接口（JSON）：
+    GET  /api/meta                          题库名称、各题型题数和页数
+    GET  /api/questions?type=单选题&page=0    一页题目（type 默认为全部）
+    GET  /api/progress?user=ID              该用户各题的 [答题次数, 答对次数, 最后一次是否答对]
+    POST /api/attempts                      {"user": ID, "id": 题目 ID, "selected": [0, 2]}
+    POST /api/reset                         {"user": ID}，清除该用户本题库的答题记录
+    GET  /api/stats                         服务器启动以来的用户数、作答数和答对数
+
+题目 ID 为 quiz_progress.fingerprint 的十六进制形式，与图形界面的答题
+记录一致。压测见 tools/bench_server.py。
+
+用法：python quiz_server.py [--bank sets] [--host 0.0.0.0] [--port 8000]
+"""
+import argparse
+import asyncio
+import gzip
+import hashlib
+import json
+import re
+import sys
+import time
+import traceback
+from pathlib import Path
+from urllib.parse import parse_qs, unquote, urlsplit
+
+import quiz_cache
+import quiz_grading
+import quiz_loader
+import quiz_progress
+from quiz_parser import TYPE_ORDER
+
+PROJECT_DIR = Path(__file__).resolve().parent
+MOBILE_PAGE = PROJECT_DIR / 'quiz_mobile.html'
+
+DEFAULT_HOST = '0.0.0.0'
+DEFAULT_PORT = 8000
+
+# 每页题数
+PAGE_SIZE = 100
+
+# 不按题型筛选时的 type 参数
+ALL_TYPES = '全部'
+
+# 各用户答题记录所在的目录
+USERS_DIR = quiz_progress.DEFAULT_PROGRESS_DIR / 'users'
+
+# 用户 ID 只允许字母、数字、下划线和连字符（用作目录名）
+USER_RE = re.compile(r'[A-Za-z0-9_-]{1,64}')
+
+# 请求头和请求体的大小上限（字节）
+MAX_HEADER_SIZE = 16 * 1024
+MAX_BODY_SIZE = 64 * 1024
+
+# 长连接空闲超时（秒）
+KEEP_ALIVE_TIMEOUT = 30
+
+# 小于此大小的响应不压缩
+GZIP_MIN_SIZE = 512
+
+REASONS = {
+    200: 'OK',
+    304: 'Not Modified',
+    400: 'Bad Request',
+    404: 'Not Found',
+    405: 'Method Not Allowed',
+    413: 'Payload Too Large',
+    431: 'Request Header Fields Too Large',
+    500: 'Internal Server Error',
+}
+
+JSON_TYPE = 'application/json; charset=utf-8'
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message=None):
+        super().__init__(message or REASONS[status])
+        self.status = status
+
+
+def json_bytes(data):
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+class Resource:
+    """预先序列化的响应：原文、gzip 压缩结果和 ETag"""
+    __slots__ = ('body', 'gzipped', 'etag', 'content_type')
+
+    def __init__(self, body, content_type=JSON_TYPE):
+        self.body = body
+        self.content_type = content_type
+        self.gzipped = gzip.compress(body, 6, mtime=0) if len(body) >= GZIP_MIN_SIZE else None
+        self.etag = '"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"'
+
+
+def question_record(question, fid):
+    return {
+        'id': fid,
+        'number': question.number,
+        'originalNumber': question.original_number,
+        'type': question.type,
+        'question': question.question,
+        'options': [[option.letter, option.text] for option in question.options],
+        'answer': question.answer,
+        'analysis': question.answer_analysis,
+        'source': question.source,
+    }
+
+
+class QuizService:
+    """题库、预序列化的分页和集中答题记录（与 HTTP 无关）
+
+    stores 为用户 ID -> ProgressStore，首次作答或查询时打开。打开、追加和
+    fsync 都是磁盘 I/O，经 call 在线程池中执行，一个用户的磁盘慢不会阻塞
+    其他客户端；ProgressStore 不是线程安全的，同一用户的操作依次进行。
+    """
+
+    def __init__(self, questions, name, users_dir=USERS_DIR, page_size=PAGE_SIZE, enabled=True):
+        self.users_dir = Path(users_dir)
+        self.enabled = enabled
+        self.keys = {}              # 题目 ID -> (指纹, AnswerKey)
+        ids = []
+        for q in questions:
+            fp = quiz_progress.fingerprint(q)
+            fid = f"{fp:016x}"
+            ids.append(fid)
+            self.keys[fid] = (fp, quiz_grading.AnswerKey(q))
+        self.ids = {fp: fid for fid, (fp, _) in self.keys.items()}
+
+        # 按题型分页并预先序列化
+        types = sorted({q.type for q in questions}, key=lambda name: TYPE_ORDER.get(name, 0))
+        self.pages = {}
+        counts = {}
+        for kind in (ALL_TYPES, *types):
+            items = [(q, fid) for q, fid in zip(questions, ids) if kind == ALL_TYPES or q.type == kind]
+            count = len(items)
+            pages = max(1, -(-count // page_size))
+            counts[kind] = {'count': count, 'pages': pages}
+            self.pages[kind] = [Resource(json_bytes({
+                'type': kind,
+                'page': page,
+                'pages': pages,
+                'total': count,
+                'questions': [question_record(q, fid) for q, fid in items[page * page_size:(page + 1) * page_size]],
+            })) for page in range(pages)]
+        self.meta = Resource(json_bytes({'name': name, 'pageSize': page_size, 'types': counts}))
+
+        self.stores = {}
+        self.locks = {}             # 用户 ID -> asyncio.Lock
+        self.attempts = 0
+        self.correct = 0
+
+    def page(self, name, number):
+        pages = self.pages.get(name)
+        if pages is None:
+            raise HTTPError(404, f"未知题型：{name}")
+        if not 0 <= number < len(pages):
+            raise HTTPError(404, f"没有第 {number} 页")
+        return pages[number]
+
+    async def call(self, user, func):
+        """在线程池中以该用户的 ProgressStore 调用 func 并返回结果"""
+        if not isinstance(user, str) or not USER_RE.fullmatch(user):
+            raise HTTPError(400, "用户 ID 无效")
+        lock = self.locks.get(user)
+        if lock is None:
+            lock = self.locks[user] = asyncio.Lock()
+        async with lock:
+            return await asyncio.get_running_loop().run_in_executor(None, self._call, user, func)
+
+    def _call(self, user, func):
+        store = self.stores.get(user)
+        if store is None:
+            store = self.stores[user] = quiz_progress.ProgressStore(self.users_dir / user, enabled=self.enabled)
+        return func(store)
+
+    async def record(self, user, fid, selected):
+        """判题并记录一次作答，返回是否答对和正确答案"""
+        entry = self.keys.get(fid)
+        if entry is None:
+            raise HTTPError(404, f"没有题目 {fid}")
+        fp, key = entry
+        if (not isinstance(selected, list) or len(selected) > key.option_count
+                or not all(isinstance(i, int) and 0 <= i < key.option_count for i in selected)):
+            raise HTTPError(400, "selected 应为选项下标列表")
+        correct = key.check(set(selected))
+        await self.call(user, lambda store: store.record(fp, correct))
+        self.attempts += 1
+        self.correct += correct
+        return {'correct': correct, 'accepted': sorted(key.accepted or ())}
+
+    async def progress(self, user):
+        return await self.call(user, self._progress)
+
+    def _progress(self, store):
+        ids = self.ids
+        result = {}
+        for fp, row in store.index.items():
+            fid = ids.get(fp)
+            if fid is not None and store.attempts[row]:
+                result[fid] = [store.attempts[row], store.correct[row], bool(store.last_correct[row])]
+        return result
+
+    async def reset(self, user):
+        await self.call(user, lambda store: store.reset(self.ids))
+        return {'reset': True}
+
+    def stats(self):
+        return {'users': len(self.stores), 'attempts': self.attempts, 'correct': self.correct}
+
+    def close(self):
+        for store in self.stores.values():
+            store.close()
+
+
+class QuizServer:
+    """HTTP 层：解析请求、路由并写出响应（支持长连接）"""
+
+    def __init__(self, service, page_path=MOBILE_PAGE):
+        self.service = service
+        self.page = Resource(Path(page_path).read_bytes(), 'text/html; charset=utf-8')
+        self.requests = 0
+
+    async def serve(self, host, port):
+        return await asyncio.start_server(self.handle, host, port, limit=MAX_HEADER_SIZE)
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                try:
+                    head = await asyncio.wait_for(reader.readuntil(b'\r\n\r\n'), KEEP_ALIVE_TIMEOUT)
+                except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError):
+                    return
+                except asyncio.LimitOverrunError:
+                    self.write_error(writer, HTTPError(431), False)
+                    return
+                try:
+                    method, target, version, headers = parse_head(head)
+                except HTTPError as e:
+                    self.write_error(writer, e, False)
+                    return
+                keep_alive = (headers.get('connection', '').lower() != 'close'
+                              if version == 'HTTP/1.1' else headers.get('connection', '').lower() == 'keep-alive')
+                try:
+                    body = await self.read_body(reader, headers)
+                    self.requests += 1
+                    await self.respond(writer, method, target, headers, body, keep_alive)
+                except HTTPError as e:
+                    self.write_error(writer, e, keep_alive)
+                except asyncio.IncompleteReadError:
+                    return
+                except Exception:
+                    # 服务器自身的错误：记录下来并返回 500，连接和其他客户端不受影响
+                    print(f"处理请求 {method} {target} 出错：", file=sys.stderr)
+                    traceback.print_exc()
+                    self.write_error(writer, HTTPError(500), keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    return
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def read_body(self, reader, headers):
+        try:
+            length = int(headers.get('content-length', 0))
+        except ValueError:
+            raise HTTPError(400, "Content-Length 无效")
+        if length > MAX_BODY_SIZE:
+            raise HTTPError(413)
+        return await reader.readexactly(length) if length > 0 else b''
+
+    async def respond(self, writer, method, target, headers, body, keep_alive):
+        url = urlsplit(target)
+        path = unquote(url.path)
+        query = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        service = self.service
+
+        if path in ('/', '/quiz_mobile.html'):
+            self.check_method(method, 'GET')
+            self.write_resource(writer, self.page, headers, keep_alive)
+        elif path == '/api/meta':
+            self.check_method(method, 'GET')
+            self.write_resource(writer, service.meta, headers, keep_alive)
+        elif path == '/api/questions':
+            self.check_method(method, 'GET')
+            try:
+                number = int(query.get('page', 0))
+            except ValueError:
+                raise HTTPError(400, "page 应为整数")
+            self.write_resource(writer, service.page(query.get('type', ALL_TYPES), number), headers, keep_alive)
+        elif path == '/api/progress':
+            self.check_method(method, 'GET')
+            self.write_json(writer, 200, await service.progress(query.get('user')), keep_alive)
+        elif path == '/api/attempts':
+            self.check_method(method, 'POST')
+            data = parse_json(body)
+            result = await service.record(data.get('user'), data.get('id'), data.get('selected'))
+            self.write_json(writer, 200, result, keep_alive)
+        elif path == '/api/reset':
+            self.check_method(method, 'POST')
+            self.write_json(writer, 200, await service.reset(parse_json(body).get('user')), keep_alive)
+        elif path == '/api/stats':
+            self.check_method(method, 'GET')
+            self.write_json(writer, 200, service.stats(), keep_alive)
+        else:
+            raise HTTPError(404)
+
+    @staticmethod
+    def check_method(method, allowed):
+        if method != allowed:
+            raise HTTPError(405)
+
+    def write_resource(self, writer, resource, headers, keep_alive):
+        """写出预序列化的响应：ETag 相同返回 304，客户端接受 gzip 时写出压缩结果"""
+        extra = [('ETag', resource.etag), ('Cache-Control', 'no-cache'), ('Vary', 'Accept-Encoding')]
+        if resource.etag in headers.get('if-none-match', ''):
+            self.write(writer, 304, b'', None, keep_alive, extra)
+            return
+        body = resource.body
+        if resource.gzipped is not None and 'gzip' in headers.get('accept-encoding', ''):
+            body = resource.gzipped
+            extra.append(('Content-Encoding', 'gzip'))
+        self.write(writer, 200, body, resource.content_type, keep_alive, extra)
+
+    def write_json(self, writer, status, data, keep_alive):
+        self.write(writer, status, json_bytes(data), JSON_TYPE, keep_alive, [('Cache-Control', 'no-store')])
+
+    def write_error(self, writer, error, keep_alive):
+        self.write_json(writer, error.status, {'error': str(error)}, keep_alive)
+
+    @staticmethod
+    def write(writer, status, body, content_type, keep_alive, extra=()):
+        lines = [f"HTTP/1.1 {status} {REASONS[status]}", f"Content-Length: {len(body)}"]
+        if content_type:
+            lines.append(f"Content-Type: {content_type}")
+        lines.extend(f"{name}: {value}" for name, value in extra)
+        lines.append("Connection: keep-alive" if keep_alive else "Connection: close")
+        writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('utf-8') + body)
+
+
+def parse_json(body):
+    """解析 JSON 对象请求体"""
+    try:
+        data = json.loads(body)
+    except ValueError:
+        raise HTTPError(400, "请求体应为 JSON")
+    if not isinstance(data, dict):
+        raise HTTPError(400, "请求体应为 JSON 对象")
+    return data
+
+
+def parse_head(head):
+    """解析请求行和请求头，返回 (方法, 目标, 版本, 小写名称的请求头字典)"""
+    try:
+        lines = head.decode('latin-1').split('\r\n')
+        method, target, version = lines[0].split(' ')
+    except ValueError:
+        raise HTTPError(400, "请求行无效")
+    headers = {}
+    for line in lines[1:]:
+        if line:
+            name, sep, value = line.partition(':')
+            if not sep:
+                raise HTTPError(400, "请求头无效")
+            headers[name.strip().lower()] = value.strip()
+    return method, target, version, headers
+
+
+def load_questions(bank, cache, dedup=False):
+    """加载题库文件或目录（目录时并行加载其中全部题库）"""
+    if bank.is_dir():
+        paths = quiz_loader.find_banks(bank)
+        if not paths:
+            raise ValueError(f"{bank} 中没有题库文件")
+        questions, loader = quiz_loader.load_banks(paths, cache, dedup=dedup)
+        print(loader.report(), file=sys.stderr)
+        return questions
+    return quiz_loader.load_bank(bank, cache)
+
+
+async def run(args):
+    start = time.perf_counter()
+    bank = Path(args.bank)
+    try:
+        questions = load_questions(bank, quiz_cache.BankCache(enabled=not args.no_cache), args.dedup)
+    except (OSError, ValueError) as e:
+        sys.exit(f"加载题库失败：{e}")
+    service = QuizService(questions, bank.name, Path(args.progress_dir) / 'users' if args.progress_dir else USERS_DIR,
+                          enabled=not args.no_progress)
+    server = await QuizServer(service).serve(args.host, args.port)
+    port = server.sockets[0].getsockname()[1]
+    print(f"{len(questions)} 道题，准备用时 {time.perf_counter() - start:.2f} 秒", file=sys.stderr)
+    # 第一行输出监听地址（压测脚本据此连接）
+    print(f"http://{args.host}:{port}/", flush=True)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        service.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="局域网刷题服务器")
+    parser.add_argument('--bank', default='sets', help="题库文件或目录（默认 sets，加载其中全部题库）")
+    parser.add_argument('--host', default=DEFAULT_HOST, help="监听地址")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help="端口（0 为任选空闲端口）")
+    parser.add_argument('--progress-dir', help="答题记录目录（默认 .progress，各用户位于其下的 users/）")
+    parser.add_argument('--no-progress', action='store_true', help="答题记录只保存在内存中")
+    parser.add_argument('--no-cache', action='store_true', help="不读取也不写入题库缓存")
+    parser.add_argument('--dedup', action='store_true', help="--bank 为目录时合并重复和近似重复的题目")
+    args = parser.parse_args()
+    try:
+        asyncio.run(run(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
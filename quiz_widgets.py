@@ -0,0 +1,169 @@
+"""界面组件模块
+
+VirtualListbox：虚拟化的题目列表。内部的 tk.Listbox 只保存可见窗口内的
+行（前后各多渲染 OVERSCAN 行），行文本在渲染时通过 row_text(index)
+按需生成，因此十万道以上的题库也只占用几十个 Tcl 列表项，插入和滚动
+的开销与题库大小无关。
+
+对外接口与 tk.Listbox 常用方法同名（selection_set、curselection、see 等），
+下标均为整个列表中的绝对下标；选中行变化时在组件自身上触发
+<<ListboxSelect>> 事件。
+"""
+import tkinter as tk
+import tkinter.font as tkfont
+
+# 可见窗口前后额外渲染的行数
+OVERSCAN = 10
+
+
+class VirtualListbox(tk.Frame):
+    """只渲染可见行的单选列表"""
+
+    def __init__(self, parent, row_text, scrollbar_width=0, **listbox_options):
+        super().__init__(parent, bg=listbox_options.get('bg'))
+        self.row_text = row_text  # 根据绝对下标返回行文本
+        self.count = 0            # 总行数
+        self.top = 0              # 可见区域第一行的绝对下标
+        self.start = 0            # 已渲染窗口 [start, end)
+        self.end = 0
+        self.selected = None      # 选中行的绝对下标
+
+        self.scrollbar = tk.Scrollbar(self, width=scrollbar_width, command=self.yview)
+        self.scrollbar.pack(side='right', fill='y')
+
+        self.listbox = tk.Listbox(self, selectmode='browse', **listbox_options)
+        self.listbox.pack(side='left', fill='both', expand=True)
+        self.line_height = tkfont.Font(font=self.listbox.cget('font')).metrics('linespace') or 1
+
+        self.listbox.bind('<<ListboxSelect>>', self._on_listbox_select)
+        self.listbox.bind('<Configure>', lambda e: self.render())
+        self.listbox.bind('<MouseWheel>', self._on_mousewheel)
+        self.listbox.bind('<Button-4>', lambda e: self._scroll_by(-3))
+        self.listbox.bind('<Button-5>', lambda e: self._scroll_by(3))
+        self.listbox.bind('<Up>', lambda e: self._move_selection(-1))
+        self.listbox.bind('<Down>', lambda e: self._move_selection(1))
+        self.listbox.bind('<Prior>', lambda e: self._move_selection(-self.visible_rows()))
+        self.listbox.bind('<Next>', lambda e: self._move_selection(self.visible_rows()))
+        # 拖动选择时阻止内部列表自行滚动，滚动统一由 yview 处理
+        self.listbox.bind('<B1-Motion>', lambda e: 'break')
+
+    # ---- 数据 ----
+
+    def set_count(self, count):
+        """设置总行数并重新渲染（所有行文本视为已变化）"""
+        self.count = count
+        if self.selected is not None and self.selected >= count:
+            self.selected = None
+        self.top = max(0, min(self.top, count - self.visible_rows()))
+        self.render(force=True)
+
+    def append(self, added):
+        """末尾追加 added 行；只有追加的行落入渲染窗口时才重新渲染"""
+        self.count += added
+        if self.end - self.start < self.window_size():
+            self.render(force=True)
+        else:
+            self._update_scrollbar()
+
+    def refresh_row(self, index):
+        """重新生成一行的文本（不在渲染窗口内时无需处理）"""
+        if self.start <= index < self.end:
+            row = index - self.start
+            self.listbox.delete(row)
+            self.listbox.insert(row, self.row_text(index))
+            if index == self.selected:
+                self.listbox.selection_set(row)
+
+    # ---- 选择 ----
+
+    def selection_set(self, index):
+        self.selected = index
+        self.listbox.selection_clear(0, tk.END)
+        if self.start <= index < self.end:
+            self.listbox.selection_set(index - self.start)
+
+    def selection_clear(self):
+        self.selected = None
+        self.listbox.selection_clear(0, tk.END)
+
+    def selection_includes(self, index):
+        return index == self.selected
+
+    def curselection(self):
+        return () if self.selected is None else (self.selected,)
+
+    def see(self, index):
+        """滚动使 index 行可见"""
+        rows = self.visible_rows()
+        if index < self.top:
+            self.scroll_to(index)
+        elif index >= self.top + rows:
+            self.scroll_to(index - rows + 1)
+
+    # ---- 滚动与渲染 ----
+
+    def visible_rows(self):
+        return max(1, self.listbox.winfo_height() // self.line_height)
+
+    def window_size(self):
+        return self.visible_rows() + 2 * OVERSCAN
+
+    def scroll_to(self, top):
+        top = max(0, min(top, self.count - self.visible_rows()))
+        if top != self.top:
+            self.top = top
+            self.render()
+
+    def yview(self, *args):
+        """滚动条回调：moveto 比例或按行/页滚动"""
+        if args[0] == 'moveto':
+            self.scroll_to(round(float(args[1]) * self.count))
+        elif args[0] == 'scroll':
+            step = int(args[1])
+            if args[2] == 'pages':
+                step *= self.visible_rows()
+            self._scroll_by(step)
+
+    def render(self, force=False):
+        """按当前 top 渲染窗口；top 仍在已渲染窗口的缓冲区内时只移动视图"""
+        rows = self.visible_rows()
+        if force or self.top < self.start or self.top + rows > self.end \
+                or (self.start and self.top - self.start < OVERSCAN // 2) \
+                or (self.end < self.count and self.end - self.top - rows < OVERSCAN // 2):
+            self.start = max(0, self.top - OVERSCAN)
+            self.end = min(self.count, self.top + rows + OVERSCAN)
+            self.listbox.delete(0, tk.END)
+            if self.end > self.start:
+                self.listbox.insert(tk.END, *map(self.row_text, range(self.start, self.end)))
+            if self.selected is not None and self.start <= self.selected < self.end:
+                self.listbox.selection_set(self.selected - self.start)
+        self.listbox.yview(self.top - self.start)
+        self._update_scrollbar()
+
+    def _update_scrollbar(self):
+        if self.count:
+            self.scrollbar.set(self.top / self.count, min(1.0, (self.top + self.visible_rows()) / self.count))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    def _scroll_by(self, rows):
+        self.scroll_to(self.top + rows)
+        return 'break'
+
+    def _on_mousewheel(self, event):
+        return self._scroll_by(-3 if event.delta > 0 else 3)
+
+    def _move_selection(self, step):
+        """键盘移动选中行，越过窗口时先滚动再选中"""
+        if not self.count:
+            return 'break'
+        index = 0 if self.selected is None else max(0, min(self.count - 1, self.selected + step))
+        self.see(index)
+        self.selection_set(index)
+        self.event_generate('<<ListboxSelect>>')
+        return 'break'
+
+    def _on_listbox_select(self, event):
+        selection = self.listbox.curselection()
+        self.selected = self.start + selection[0] if selection else None
+        self.event_generate('<<ListboxSelect>>')
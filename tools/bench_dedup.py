@@ -0,0 +1,129 @@
+"""题目去重的基准和召回率检查
+
+用内置题库的文字随机拼出 --originals 道互不相同的题目，再为其生成
+副本（打乱选项顺序并相应修改答案、增删标点或改动一两个字），合计
+--questions 道题，测量 find_duplicates 的耗时并统计：
+- 召回率：与原题的 Jaccard 相似度不低于阈值的副本中，与原题分到同一组
+  的比例（低于阈值的副本本来就不应合并，单独列出其数目）
+- 误合并：含有不同原题的组数
+召回率低于 --min-recall 或出现误合并时以非零状态退出。
+
+用法：python tools/bench_dedup.py [--questions 100000] [--originals 60000] [题库.txt]
+"""
+import argparse
+import random
+import sys
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_DIR))
+
+import quiz_dedup  # noqa: E402
+import quiz_parser  # noqa: E402
+from quiz_parser import Option, Question  # noqa: E402
+
+PUNCTUATION = '，。、；：（）'
+
+
+def build(kind, number, stem, options, answer):
+    q = Question(number, stem)
+    q.number = number
+    q.type = kind
+    q.options = tuple(options)
+    q.answer = answer
+    return q
+
+
+def random_text(rng, corpus, length):
+    """从语料中随机截取片段拼成约 length 个字的文本"""
+    parts = []
+    size = 0
+    while size < length:
+        start = rng.randrange(len(corpus) - 8)
+        part = corpus[start:start + rng.randint(3, 8)]
+        parts.append(part)
+        size += len(part)
+    return ''.join(parts)
+
+
+def make_original(rng, corpus, number):
+    kind = rng.choice(('单选题', '多选题', '判断题'))
+    stem = random_text(rng, corpus, rng.randint(20, 50))
+    if kind == '判断题':
+        return build(kind, number, stem, [Option('A', '正确'), Option('B', '错误')], rng.choice('AB'))
+    options = [Option(chr(65 + i), random_text(rng, corpus, rng.randint(4, 12))) for i in range(4)]
+    if kind == '多选题':
+        answer = '、'.join(sorted(rng.sample('ABCD', rng.randint(2, 4))))
+    else:
+        answer = rng.choice('ABCD')
+    return build(kind, number, stem, options, answer)
+
+
+def make_copy(rng, original, number):
+    """改写一道题：打乱选项、增删标点或改动一两个字"""
+    stem = original.question
+    roll = rng.random()
+    if roll < 0.3:
+        i = rng.randrange(len(stem))
+        stem = stem[:i] + rng.choice(PUNCTUATION) + stem[i:]
+    elif roll < 0.6:
+        for _ in range(rng.randint(1, 2)):
+            i = rng.randrange(len(stem))
+            stem = stem[:i] + '某' + stem[i + 1:]
+    options, answer = original.options, original.answer
+    if original.type != '判断题' and rng.random() < 0.5:
+        order = rng.sample(range(len(options)), len(options))
+        new_letter = {chr(65 + old): chr(65 + new) for new, old in enumerate(order)}
+        options = [Option(chr(65 + new), options[old].text) for new, old in enumerate(order)]
+        answer = '、'.join(sorted(new_letter[letter] for letter in answer.split('、')))
+    return build(original.type, number, stem, options, answer)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="测量题目去重的耗时和召回率")
+    parser.add_argument('bank', nargs='?', default=str(PROJECT_DIR / 'sets' / '题库1.txt'))
+    parser.add_argument('--questions', type=int, default=100_000, help="题目总数")
+    parser.add_argument('--originals', type=int, default=60_000, help="其中互不相同的原题数")
+    parser.add_argument('--min-recall', type=float, default=0.95, help="召回率下限")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    with open(args.bank, 'r', encoding='utf-8') as f:
+        bank = quiz_parser.parse_questions(quiz_parser.iter_lines(f))
+    corpus = ''.join(q.question for q in bank)
+
+    rng = random.Random(args.seed)
+    originals = [make_original(rng, corpus, i + 1) for i in range(args.originals)]
+    questions = list(originals)
+    origin = list(range(args.originals))
+    for i in range(args.questions - args.originals):
+        base = rng.randrange(args.originals)
+        questions.append(make_copy(rng, originals[base], args.originals + i + 1))
+        origin.append(base)
+
+    result = quiz_dedup.find_duplicates(questions)
+    group_of = {}
+    for number, group in enumerate(result.groups):
+        for i in group.members:
+            group_of[i] = number
+    copies = []
+    below = 0
+    for i in range(args.originals, len(questions)):
+        similarity = quiz_dedup.jaccard(quiz_dedup.shingles(quiz_dedup.content_text(questions[i])),
+                                        quiz_dedup.shingles(quiz_dedup.content_text(questions[origin[i]])))
+        if similarity >= quiz_dedup.DEFAULT_THRESHOLD:
+            copies.append(i)
+        else:
+            below += 1
+    found = sum(1 for i in copies if i in group_of and group_of[i] == group_of.get(origin[i]))
+    recall = found / len(copies) if copies else 1.0
+    mixed = sum(1 for group in result.groups if len({origin[i] for i in group.members}) > 1)
+
+    print(f"{len(questions)} 道题（原题 {args.originals}）：去重 {result.seconds:.2f} 秒，"
+          f"{len(result.groups)} 组，合并后减少 {result.removed} 道")
+    print(f"召回率 {recall:.2%}（另有 {below} 个副本相似度低于阈值），误合并 {mixed} 组，答案冲突 {len(result.conflicts)} 对")
+    sys.exit(0 if recall >= args.min_recall and not mixed else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""文本题库编码识别的基准
+
+把内置题库重复 --repeat 遍，分别写成 UTF-8、GBK，以及开头分别有
+--preamble KB 和 --long-preamble KB 纯 ASCII 说明文字的 GBK 文件（后者
+的汉字出现在识别范围之外），用同样的 BankLoader 流程比较：
+- 旧方式：先按 UTF-8 逐行读取并解析，解码失败时丢弃已发出的题目改用
+  GBK 从头读取、解析
+- 新方式：BankLoader.load_txt（quiz_encoding 根据文件开头识别编码，只读
+  一次、解析一次）
+输出两种方式的耗时（取 --runs 次中最短的）、新方式识别出的编码和重新
+读取的次数，并检查两种方式解析出的题目相同，不同时以非零状态退出。
+
+用法：python tools/bench_encoding.py [--repeat 50] [--preamble 32] [--long-preamble 1024] [题库.txt]
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_DIR))
+
+import quiz_encoding  # noqa: E402
+import quiz_loader  # noqa: E402
+import quiz_parser  # noqa: E402
+
+# 旧方式依次尝试的编码
+LEGACY_ENCODINGS = ('utf-8', 'gbk')
+
+
+class LegacyLoader(quiz_loader.BankLoader):
+    """旧方式：逐个编码从头读取并解析"""
+
+    def load_txt(self):
+        size = self.path.stat().st_size or 1
+        for encoding in LEGACY_ENCODINGS:
+            with open(self.path, 'r', encoding=encoding) as f:
+                try:
+                    self.put_batches(quiz_parser.iter_lines(f), lambda: f.buffer.tell() / size)
+                    return
+                except UnicodeDecodeError as e:
+                    if encoding == LEGACY_ENCODINGS[-1]:
+                        raise ValueError(f"文件编码错误：{str(e)}")
+            self.restart()
+
+
+def load(loader_class, path):
+    """用指定的加载器加载，返回 (题目列表, 重新读取次数)"""
+    loader = loader_class(path)
+    loader.run()
+    questions = []
+    restarts = 0
+    while not loader.queue.empty():
+        kind, payload, _ = loader.queue.get_nowait()
+        if kind == 'reset':
+            questions = []
+            restarts += 1
+        elif kind == 'batch':
+            questions.extend(payload)
+        elif kind == 'error':
+            raise ValueError(payload)
+    return quiz_parser.reorder_questions_by_type(questions), restarts
+
+
+def best_time(loader_class, path, runs):
+    best = float('inf')
+    for _ in range(runs):
+        start = time.perf_counter()
+        questions, restarts = load(loader_class, path)
+        best = min(best, time.perf_counter() - start)
+    return best, questions, restarts
+
+
+def summary(questions):
+    return [(q.original_number, q.type, q.question, tuple(q.options), q.answer, q.answer_analysis)
+            for q in questions]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="比较旧的逐个编码重试与单次读取的编码识别")
+    parser.add_argument('bank', nargs='?', default=str(PROJECT_DIR / 'sets' / '题库1.txt'))
+    parser.add_argument('--repeat', type=int, default=50, help="题库重复的遍数")
+    parser.add_argument('--preamble', type=int, default=32, help="纯 ASCII 开头的大小（KB）")
+    parser.add_argument('--long-preamble', type=int, default=1024, help="超出识别范围的纯 ASCII 开头的大小（KB）")
+    parser.add_argument('--runs', type=int, default=3)
+    args = parser.parse_args()
+
+    text = Path(args.bank).read_text(encoding='utf-8') * args.repeat
+    variants = [('UTF-8', text.encode('utf-8')), ('GBK', text.encode('gbk'))]
+    for size in (args.preamble, args.long_preamble):
+        preamble = ('# ' + 'x' * 77 + '\n') * (size * 1024 // 80)
+        variants.append((f'GBK（{size} KB ASCII 开头）', (preamble + text).encode('gbk')))
+    failed = False
+    with tempfile.TemporaryDirectory() as directory:
+        for name, data in variants:
+            path = Path(directory) / 'bank.txt'
+            path.write_bytes(data)
+            legacy, legacy_questions, legacy_restarts = best_time(LegacyLoader, path, args.runs)
+            new, new_questions, new_restarts = best_time(quiz_loader.BankLoader, path, args.runs)
+            with quiz_encoding.open_text(path) as f:
+                encoding = f.encoding
+            same = summary(legacy_questions) == summary(new_questions)
+            failed = failed or not same
+            print(f"{name}（{len(data) / 1e6:.1f} MB，{len(new_questions)} 道题）：旧方式 {legacy * 1000:.0f} ms"
+                  f"（重读 {legacy_restarts} 次），新方式 {new * 1000:.0f} ms（识别为 {encoding}，重读 {new_restarts} 次）"
+                  + ("" if same else "，结果不同"))
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""批量判卷基准
+
+用内置题库中能答对的（答案能对应到选项的）前 --questions 道题生成 --sheets 份随机答题卡（约一半答对，
+其余为随机选项、少选或空白），分别测量：
+- BulkScorer：作答文本编码为位掩码的耗时和向量化计分的耗时
+- SheetGrader：逐题判卷（不使用 numpy）的耗时
+并核对三种部分得分规则下两者的结果（含按答题卡题数换算的百分制成绩）
+一致，且全部答对的答题卡得 100 分，否则以非零状态退出。
+需要 numpy。
+
+用法：python tools/bench_grading.py [--sheets 10000] [--questions 200] [题库.txt]
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_DIR))
+
+import quiz_grading  # noqa: E402
+import quiz_parser  # noqa: E402
+
+
+def random_response(rng, question, key):
+    """随机作答文本"""
+    roll = rng.random()
+    if roll < 0.5:
+        return question.answer
+    if roll < 0.55:
+        return ''
+    letters = [option.letter for option in quiz_grading.display_options(question)]
+    if key.multiple and roll < 0.75:
+        # 少选或多选
+        return '、'.join(sorted(rng.sample(letters, rng.randint(1, len(letters)))))
+    return rng.choice(letters) if letters else ''
+
+
+def correct_response(key):
+    """判为答对的作答文本"""
+    letters = [chr(65 + index) for index in sorted(key.accepted)]
+    return '、'.join(letters) if key.multiple else letters[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="测量批量判卷耗时")
+    parser.add_argument('bank', nargs='?', default=str(PROJECT_DIR / 'sets' / '题库1.txt'))
+    parser.add_argument('--sheets', type=int, default=10_000, help="答题卡份数")
+    parser.add_argument('--questions', type=int, default=200, help="每份答题卡的题数")
+    args = parser.parse_args()
+
+    with open(args.bank, 'r', encoding='utf-8') as f:
+        bank = quiz_parser.parse_questions(quiz_parser.iter_lines(f))
+    # 答案无法对应到选项的题（如没有顿号的多个字母）怎么作答都判错，不用于核对满分
+    bank = [q for q in bank if quiz_grading.AnswerKey(q).accepted]
+    questions = [bank[i % len(bank)] for i in range(args.questions)]
+    keys = [quiz_grading.AnswerKey(q) for q in questions]
+    columns = list(range(len(questions)))
+
+    rng = random.Random(0)
+    rows = [[random_response(rng, q, key) for q, key in zip(questions, keys)] for _ in range(args.sheets - 1)]
+    # 最后一份全部答对
+    rows.append([correct_response(key) for key in keys])
+    totals = [len(columns)] * len(rows)
+    cells = args.sheets * args.questions
+    print(f"{args.sheets} 份答题卡 × {args.questions} 题")
+
+    failed = False
+    for partial in quiz_grading.PARTIAL_RULES:
+        scorer = quiz_grading.BulkScorer(keys, partial)
+        start = time.perf_counter()
+        responses = scorer.encode(rows, columns)
+        encoded = time.perf_counter()
+        correct, answered, credit = scorer.score(responses)
+        scored = time.perf_counter()
+
+        grader = quiz_grading.SheetGrader(keys, partial)
+        expected = grader.grade(rows, columns)
+        graded = time.perf_counter()
+
+        scores = quiz_grading.percentages(credit, totals)
+        expected_scores = quiz_grading.percentages(expected[2], totals)
+        same = (list(correct) == expected[0] and list(answered) == expected[1]
+                and all(abs(a - b) < 1e-9 for a, b in zip(credit, expected[2]))
+                and all(abs(a - b) < 1e-9 for a, b in zip(scores, expected_scores)))
+        full = abs(scores[-1] - 100) < 1e-9 and abs(expected_scores[-1] - 100) < 1e-9
+        failed |= not (same and full)
+        print(f"[{partial}] BulkScorer：编码 {(encoded - start) * 1000:.0f} ms，"
+              f"计分 {(scored - encoded) * 1000:.1f} ms（{cells / (scored - encoded) / 1e6:.0f}M 格/秒）；"
+              f"SheetGrader：{(graded - scored) * 1000:.0f} ms；结果{'一致' if same else '不一致'}"
+              f"{'' if full else '，全对的答题卡不是 100 分'}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
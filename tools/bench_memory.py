@@ -0,0 +1,77 @@
+"""题目内存占用基准
+
+把内置题库重复若干次得到大题库，用 tracemalloc 分别测量：
+- Question（__slots__ + Option 元组）的内存占用
+- 旧版字典布局（每题一个字典、每个选项一个字典，答题后追加
+  answered / answered_correct 键）的内存占用
+
+用法：python tools/bench_memory.py [--questions 100000] [题库.txt]
+"""
+import argparse
+import gc
+import sys
+import tracemalloc
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_DIR))
+
+import quiz_parser  # noqa: E402
+
+
+def as_legacy_dict(q):
+    """转换为旧版的题目字典布局"""
+    question = {
+        'original_number': q.original_number,
+        'question': q.question,
+        'options': [{'letter': o.letter, 'text': o.text} for o in q.options],
+        'answer': q.answer,
+        'analysis': '',
+        'type': q.type,
+        'number': q.number,
+        'type_order': q.type_order,
+        'answered': False,
+        'answered_correct': False,
+    }
+    if q.answer_analysis is not None:
+        question['answer_analysis'] = q.answer_analysis
+    return question
+
+
+def measure(lines, legacy):
+    """解析题库并返回 (题目数, 占用字节数)"""
+    gc.collect()
+    tracemalloc.start()
+    questions = quiz_parser.parse_questions(lines)
+    if legacy:
+        questions = [as_legacy_dict(q) for q in questions]
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return len(questions), size
+
+
+def main():
+    parser = argparse.ArgumentParser(description="比较题目对象与旧版字典布局的内存占用")
+    parser.add_argument('bank', nargs='?', default=str(PROJECT_DIR / 'sets' / '题库1.txt'))
+    parser.add_argument('--questions', type=int, default=100_000, help="目标题目数")
+    args = parser.parse_args()
+
+    with open(args.bank, 'r', encoding='utf-8') as f:
+        bank_lines = list(quiz_parser.iter_lines(f))
+    per_copy = len(quiz_parser.parse_questions(bank_lines)) or 1
+    copies = max(1, -(-args.questions // per_copy))
+    # 每份拷贝都是独立的字符串对象，与真实的大题库一致
+    lines = [line.encode('utf-8').decode('utf-8') for _ in range(copies) for line in bank_lines]
+
+    count, slots_size = measure(lines, legacy=False)
+    _, dict_size = measure(lines, legacy=True)
+
+    print(f"{count} 道题")
+    print(f"字典布局：  {dict_size / 2**20:8.1f} MB（{dict_size / count:6.0f} 字节/题）")
+    print(f"Question：  {slots_size / 2**20:8.1f} MB（{slots_size / count:6.0f} 字节/题）")
+    print(f"节省 {1 - slots_size / dict_size:.0%}")
+
+
+if __name__ == "__main__":
+    main()
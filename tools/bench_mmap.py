@@ -0,0 +1,120 @@
+"""内存映射题库的基准
+
+把内置题库重复写成约 --size MB 的 .txt 文件，分别在子进程中测量：
+- 映射模式（quiz_mmap.MappedBank）：建立索引的耗时、随机读取 --reads 道题
+  的平均耗时，以及打开前、打开后、随机读取后的常驻内存
+- 完整解析（quiz_loader.load_bank，不用缓存）：耗时和常驻内存；题库较大
+  时很慢且占用大量内存，可用 --skip-full 跳过
+并检查映射模式在内置题库上逐题与完整解析（按原文顺序）一致，只允许
+出现模块说明中列出的差异（独立解析中以题号开头的行）。映射模式打开后
+常驻内存增长超过 --max-growth MB 时以非零状态退出。
+
+用法：python tools/bench_mmap.py [--size 1024] [--reads 1000] [--skip-full]
+"""
+import argparse
+import json
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_DIR))
+
+import quiz_encoding  # noqa: E402
+import quiz_loader  # noqa: E402
+import quiz_mmap  # noqa: E402
+import quiz_parser  # noqa: E402
+
+
+def key(q):
+    return (q.original_number, q.type, q.question, tuple(q.options), q.answer, q.answer_analysis)
+
+
+def compare(bank):
+    """返回 (映射模式题数, 完整解析题数, 只在一边出现的题数)"""
+    mapped = quiz_mmap.MappedBank(bank)
+    try:
+        mapped_keys = [key(q) for q in mapped]
+    finally:
+        mapped.close()
+    with quiz_encoding.open_text(bank) as f:
+        full_keys = [key(q) for q in quiz_parser.iter_questions(quiz_parser.iter_lines(f))]
+    differ = len(set(mapped_keys) ^ set(full_keys))
+    return len(mapped_keys), len(full_keys), differ
+
+
+def measure_mapped(path, reads):
+    before = quiz_mmap.resident_kb()
+    start = time.perf_counter()
+    bank = quiz_mmap.MappedBank(path)
+    opened = time.perf_counter() - start
+    after_open = quiz_mmap.resident_kb()
+    rng = random.Random(0)
+    start = time.perf_counter()
+    for _ in range(reads):
+        bank[rng.randrange(len(bank))]
+    read = (time.perf_counter() - start) / reads
+    return {'count': len(bank), 'seconds': opened, 'read': read, 'before': before,
+            'after_open': after_open, 'after_read': quiz_mmap.resident_kb()}
+
+
+def measure_full(path):
+    before = quiz_mmap.resident_kb()
+    start = time.perf_counter()
+    questions = quiz_loader.load_bank(Path(path))
+    return {'count': len(questions), 'seconds': time.perf_counter() - start, 'before': before,
+            'after': quiz_mmap.resident_kb()}
+
+
+def run_child(mode, path, reads):
+    """在子进程中测量，避免两种方式的内存相互影响"""
+    result = subprocess.run([sys.executable, __file__, '--child', mode, path, '--reads', str(reads)],
+                            capture_output=True, text=True, check=True)
+    return json.loads(result.stdout)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="测量内存映射题库的打开耗时和内存占用")
+    parser.add_argument('bank', nargs='?', default=str(PROJECT_DIR / 'sets' / '题库1.txt'))
+    parser.add_argument('--size', type=int, default=1024, help="生成的题库大小（MB）")
+    parser.add_argument('--reads', type=int, default=1000, help="随机读取的题数")
+    parser.add_argument('--skip-full', action='store_true', help="不测量完整解析")
+    parser.add_argument('--max-growth', type=float, default=64, help="映射模式常驻内存增长上限（MB）")
+    parser.add_argument('--child', nargs=2, metavar=('MODE', 'PATH'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        mode, path = args.child
+        print(json.dumps(measure_mapped(path, args.reads) if mode == 'mapped' else measure_full(path)))
+        return
+
+    mapped_count, full_count, differ = compare(args.bank)
+    print(f"{Path(args.bank).name}：映射模式 {mapped_count} 道题，完整解析 {full_count} 道题，"
+          f"只在一边出现 {differ} 道")
+
+    data = Path(args.bank).read_bytes()
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / 'huge.txt'
+        with open(path, 'wb') as f:
+            for _ in range(max(1, args.size * 1024 * 1024 // len(data))):
+                f.write(data)
+        size = path.stat().st_size / 1e6
+
+        mapped = run_child('mapped', str(path), args.reads)
+        growth = (mapped['after_read'] - mapped['before']) / 1024
+        print(f"映射模式（{size:,.0f} MB，{mapped['count']:,} 道题）：建立索引 {mapped['seconds']:.2f} 秒"
+              f"（{size / mapped['seconds']:,.0f} MB/秒），随机读取每题 {mapped['read'] * 1e6:.0f} µs，"
+              f"常驻内存 {mapped['before'] / 1024:.0f} -> {mapped['after_open'] / 1024:.0f} -> "
+              f"{mapped['after_read'] / 1024:.0f} MB")
+        if not args.skip_full:
+            full = run_child('full', str(path), args.reads)
+            print(f"完整解析：{full['count']:,} 道题，{full['seconds']:.2f} 秒，"
+                  f"常驻内存 {full['before'] / 1024:.0f} -> {full['after'] / 1024:.0f} MB")
+    sys.exit(0 if growth <= args.max_growth else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""题目切换速度基准
+
+在隐藏的窗口中加载内置题库，连续执行上一题/下一题，测量每秒切换次数，
+以及切换后残留的 Tcl 命令数（每次新建 widget 和事件绑定都会注册新的
+Tcl 命令，销毁 widget 也不会释放绑定闭包对应的命令）。分别测量：
+- 当前实现（选项widget池，原地更新文本、颜色）
+- 旧版实现（每次切换销毁并重建所有选项框架、标签、Tk 变量和事件绑定）
+
+需要图形显示环境。
+用法：python tools/bench_navigation.py [--navigations 2000] [题库.txt]
+"""
+import argparse
+import sys
+import time
+import tkinter as tk
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_DIR))
+
+import quiz_app  # noqa: E402
+import quiz_cache  # noqa: E402
+import quiz_parser  # noqa: E402
+import quiz_progress  # noqa: E402
+
+
+class LegacyQuizApp(quiz_app.ModernQuizApp):
+    """旧版选项显示：每次切换都销毁并重建选项widget"""
+
+    def show_options(self, options):
+        for widget in self.options_container.winfo_children():
+            widget.destroy()
+        self.option_vars = []
+        self.option_widgets = []
+        for i, (letter, text) in enumerate(options):
+            self.create_legacy_option_frame(text, i, letter)
+
+    def create_legacy_option_frame(self, text, index, letter=None):
+        if self.filtered_questions[self.current_question_index].type == '多选题':
+            var = tk.BooleanVar()
+        else:
+            var = tk.IntVar()
+        self.option_vars.append(var)
+
+        option_frame = tk.Frame(self.options_container, bg=self.colors['option_bg'],
+                                cursor='hand2', relief='solid', bd=1)
+        option_frame.pack(fill='x', pady=5)
+        option_label = tk.Label(option_frame, text=f"{letter}. {text}" if letter else text,
+                                font=self.fonts['option'], bg=self.colors['option_bg'],
+                                fg=self.colors['text'], cursor='hand2')
+        option_label.pack(side='left', padx=15, pady=12)
+        self.option_widgets.append((option_frame, option_label))
+
+        click_command = lambda e=None, i=index: self.click_option(i)
+        option_frame.bind('<Button-1>', click_command)
+        option_label.bind('<Button-1>', click_command)
+
+        def on_enter(e):
+            if not self.is_answered and not self.is_option_selected(index):
+                option_frame.config(bg=self.colors['hover'])
+                option_label.config(bg=self.colors['hover'])
+
+        def on_leave(e):
+            if not self.is_answered:
+                bg = '#2b579a' if self.is_option_selected(index) else self.colors['option_bg']
+                option_frame.config(bg=bg)
+                option_label.config(bg=bg)
+
+        option_frame.bind('<Enter>', on_enter)
+        option_frame.bind('<Leave>', on_leave)
+        option_label.bind('<Enter>', on_enter)
+        option_label.bind('<Leave>', on_leave)
+
+
+def measure(app_class, questions, navigations):
+    """返回 (每秒切换次数, 残留的 Tcl 命令增量)"""
+    root = tk.Tk()
+    root.withdraw()
+    # 不处理定时事件（update_idletasks 只处理空闲任务），自动加载不会触发
+    app = app_class(root, quiz_cache.BankCache(enabled=False), quiz_progress.ProgressStore(enabled=False))
+    app.questions = questions
+    app.filtered_questions = list(questions)
+    app.populate_question_list()
+    app.display_question(0)
+    root.update_idletasks()
+
+    commands_before = len(root.tk.call('info', 'commands'))
+    count = len(questions)
+    start = time.perf_counter()
+    for n in range(navigations):
+        # 来回切换，模拟连续按上一题/下一题
+        app.display_question(n % count if (n // count) % 2 == 0 else count - 1 - n % count)
+        root.update_idletasks()
+    elapsed = time.perf_counter() - start
+    leaked = len(root.tk.call('info', 'commands')) - commands_before
+
+    root.destroy()
+    return navigations / elapsed, leaked
+
+
+def main():
+    parser = argparse.ArgumentParser(description="比较选项widget池与旧版重建方式的题目切换速度")
+    parser.add_argument('bank', nargs='?', default=str(PROJECT_DIR / 'sets' / '题库1.txt'))
+    parser.add_argument('--navigations', type=int, default=2000, help="切换次数")
+    args = parser.parse_args()
+
+    with open(args.bank, 'r', encoding='utf-8') as f:
+        questions = quiz_parser.parse_questions(quiz_parser.iter_lines(f))
+
+    pooled_rate, pooled_leaked = measure(quiz_app.ModernQuizApp, questions, args.navigations)
+    legacy_rate, legacy_leaked = measure(LegacyQuizApp, questions, args.navigations)
+
+    print(f"{len(questions)} 道题, {args.navigations} 次切换")
+    print(f"旧版重建：{legacy_rate:8.0f} 次/秒，残留 Tcl 命令 {legacy_leaked}")
+    print(f"widget池：{pooled_rate:8.0f} 次/秒，残留 Tcl 命令 {pooled_leaked}")
+    print(f"提速 {pooled_rate / legacy_rate:.1f} 倍")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""答题记录读写基准
+
+在临时目录中生成指定条数的答题记录（分布在若干道题上），测量：
+- 读取耗时（日志按 COMPACT_THRESHOLD 定期压缩为快照）
+- 不压缩时直接回放整个日志的读取耗时（对照）
+- 单次 record 的平均耗时（每条 flush，fsync 按批）
+
+用法：python tools/bench_progress.py [--attempts 1000000] [--questions 100000]
+"""
+import argparse
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_DIR))
+
+import quiz_progress  # noqa: E402
+
+# 生成历史记录时每次追加的条数
+CHUNK = 10_000
+
+
+def generate(store, attempts, fingerprints):
+    """按日志格式批量追加答题记录（与逐条 record 的结果相同）"""
+    rng = random.Random(0)
+    pack = quiz_progress.LOG_RECORD.pack
+    timestamp = time.time()
+    for start in range(0, attempts, CHUNK):
+        records = []
+        for _ in range(min(CHUNK, attempts - start)):
+            fp = rng.choice(fingerprints)
+            result = rng.random() < 0.7
+            store.apply(fp, result, timestamp)
+            records.append(pack(fp, result, timestamp))
+        store.append(b''.join(records), len(records))
+    store.close()
+
+
+def timed_load(directory, compact_threshold):
+    start = time.perf_counter()
+    store = quiz_progress.ProgressStore(directory, compact_threshold=compact_threshold)
+    return time.perf_counter() - start, store
+
+
+def main():
+    parser = argparse.ArgumentParser(description="测量答题记录的读取和写入耗时")
+    parser.add_argument('--attempts', type=int, default=1_000_000, help="答题记录条数")
+    parser.add_argument('--questions', type=int, default=100_000, help="题目数")
+    parser.add_argument('--records', type=int, default=10_000, help="测量 record 耗时的次数")
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    fingerprints = [rng.getrandbits(64) for _ in range(args.questions)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        compacted = Path(tmp) / 'compacted'
+        generate(quiz_progress.ProgressStore(compacted), args.attempts, fingerprints)
+        elapsed, store = timed_load(compacted, quiz_progress.COMPACT_THRESHOLD)
+        total = sum(store.attempts)
+        print(f"{total} 条记录, {len(store)} 道题")
+        print(f"快照 + 日志读取：{elapsed * 1000:8.1f} ms（日志 {store.log_records} 条）")
+
+        start = time.perf_counter()
+        for _ in range(args.records):
+            store.record(rng.choice(fingerprints), rng.random() < 0.7)
+        per_record = (time.perf_counter() - start) / args.records
+        store.close()
+        print(f"record：          {per_record * 1e6:8.1f} µs/次")
+
+        raw = Path(tmp) / 'raw'
+        generate(quiz_progress.ProgressStore(raw, compact_threshold=args.attempts), args.attempts, fingerprints)
+        elapsed, _ = timed_load(raw, args.attempts)
+        print(f"不压缩回放日志：  {elapsed * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
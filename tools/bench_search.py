@@ -0,0 +1,106 @@
+"""搜索索引基准
+
+把内置题库重复若干次得到大题库，测量：
+- 索引构建耗时，以及在 IndexBuilder 后台线程中构建时主线程每 5 ms
+  醒来一次的最长延迟（即界面线程最长卡住的时间）
+- 从题干中随机截取的子串（1~8 个字符）的查询耗时（中位数、p99、最大值），
+  不筛选题型和按随机题型筛选各测一遍，并与暴力子串扫描的结果核对
+两种查询的 p99 耗时超过 --budget 毫秒时以非零状态退出（单次最大值受
+系统调度影响较大，只作参考）。
+
+用法：python tools/bench_search.py [--questions 100000] [--budget 10] [题库.txt]
+"""
+import argparse
+import random
+import statistics
+import sys
+import threading
+import time
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_DIR))
+
+import quiz_parser  # noqa: E402
+import quiz_search  # noqa: E402
+
+# 测量主线程延迟时的醒来间隔（秒）
+TICK = 0.005
+
+
+def measure_stall(rows):
+    """在后台线程中构建索引，返回 (构建耗时, 主线程最长延迟)"""
+    builder = quiz_search.IndexBuilder(rows)
+    start = time.perf_counter()
+    builder.start()
+    stall = 0.0
+    while builder.is_alive():
+        before = time.perf_counter()
+        time.sleep(TICK)
+        stall = max(stall, time.perf_counter() - before - TICK)
+    return time.perf_counter() - start, stall
+
+
+def run_queries(index, questions, count, rng, filtered):
+    """随机查询 count 次，返回各次耗时；结果与暴力扫描不一致时退出"""
+    types = sorted(quiz_parser.TYPE_ORDER, key=quiz_parser.TYPE_ORDER.get)
+    timings = []
+    for _ in range(count):
+        text = quiz_search.normalize(rng.choice(questions).question)
+        length = rng.randint(1, 8)
+        offset = rng.randint(0, max(0, len(text) - length))
+        query = text[offset:offset + length]
+        type = rng.choice(types) if filtered else None
+        index.last_query = None  # 不使用前缀增量查询，测量完整查询
+        start = time.perf_counter()
+        result = index.search(query, type=type)
+        timings.append(time.perf_counter() - start)
+        if rng.random() < 0.05:
+            order = quiz_parser.TYPE_ORDER.get(type)
+            expected = [doc for doc, t in enumerate(index.texts)
+                        if query in t and (order is None or index.types[doc] == order)]
+            if list(result) != expected:
+                sys.exit(f"查询结果与暴力扫描不一致：{query!r}（{type or '全部'}）")
+    timings.sort()
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="测量搜索索引的构建和查询耗时")
+    parser.add_argument('bank', nargs='?', default=str(PROJECT_DIR / 'sets' / '题库1.txt'))
+    parser.add_argument('--questions', type=int, default=100_000, help="目标题目数")
+    parser.add_argument('--queries', type=int, default=500, help="每种查询的次数")
+    parser.add_argument('--budget', type=float, default=10.0, help="查询 p99 耗时上限（毫秒）")
+    args = parser.parse_args()
+
+    with open(args.bank, 'r', encoding='utf-8') as f:
+        bank_lines = list(quiz_parser.iter_lines(f))
+    per_copy = len(quiz_parser.parse_questions(bank_lines)) or 1
+    copies = max(1, -(-args.questions // per_copy))
+    questions = quiz_parser.parse_questions(bank_lines * copies)
+
+    start = time.perf_counter()
+    index = quiz_search.SearchIndex()
+    for q in questions:
+        index.add(quiz_search.search_text(q), q.type_order)
+    index.flush()
+    build_time = time.perf_counter() - start
+    print(f"{len(questions)} 道题, 索引构建 {build_time:.2f} 秒, {len(index.postings)} 个倒排表")
+
+    thread_time, stall = measure_stall(
+        lambda: ((quiz_search.search_text(q), q.type_order) for q in questions))
+    print(f"后台线程构建 {thread_time:.2f} 秒, 主线程最长延迟 {stall * 1000:.1f} ms")
+
+    rng = random.Random(0)
+    ok = True
+    for filtered in (False, True):
+        timings = run_queries(index, questions, args.queries, rng, filtered)
+        p99 = timings[min(len(timings) - 1, int(len(timings) * 0.99))]
+        ok &= p99 * 1000 <= args.budget
+        print(f"查询（{'按题型筛选' if filtered else '全部题型'}）：中位数 {statistics.median(timings) * 1000:.2f} ms, "
+              f"p99 {p99 * 1000:.2f} ms（上限 {args.budget} ms）, 最大 {timings[-1] * 1000:.2f} ms")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""刷题服务器压测
+
+在子进程中启动 quiz_server.py（监听 127.0.0.1 的空闲端口，答题记录写到
+临时目录），再用 --clients 个并发长连接客户端持续请求 --duration 秒：
+- 70% 获取随机题型的随机一页（接受 gzip，其中一半带上次的 ETag，命中时为 304）
+- 30% 提交一次随机作答
+输出每秒请求数、延迟分位数（p50/p90/p99/最大）和各状态码的数目。出现
+2xx/304 以外的状态码或连接错误时以非零状态退出。也可用 --url 压测已在
+运行的服务器（此时作答会写入该服务器的答题记录）。
+
+用法：python tools/bench_server.py [--clients 200] [--duration 10] [--bank sets]
+"""
+import argparse
+import asyncio
+import json
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+from urllib.parse import quote, urlsplit
+from urllib.request import urlopen
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+
+# 请求中获取题目页的比例
+PAGE_RATIO = 0.7
+
+
+def start_server(bank, progress_dir):
+    """启动服务器子进程，返回 (进程, 地址)"""
+    process = subprocess.Popen(
+        [sys.executable, str(PROJECT_DIR / 'quiz_server.py'), '--bank', bank, '--host', '127.0.0.1',
+         '--port', '0', '--progress-dir', progress_dir],
+        cwd=PROJECT_DIR, stdout=subprocess.PIPE, text=True)
+    url = process.stdout.readline().strip()
+    if not url:
+        process.wait()
+        sys.exit("服务器启动失败")
+    return process, url
+
+
+def fetch_json(url):
+    with urlopen(url) as response:
+        return json.loads(response.read())
+
+
+def load_targets(url):
+    """读取各题型的页数和全部题目的 (ID, 选项数)"""
+    meta = fetch_json(url + 'api/meta')
+    pages = [(name, info['pages']) for name, info in meta['types'].items()]
+    questions = []
+    for page in range(meta['types']['全部']['pages']):
+        data = fetch_json(f"{url}api/questions?page={page}")
+        # 选项数与界面显示一致：没有两个选项的判断题显示默认的两项
+        questions.extend((q['id'], 2 if q['type'] == '判断题' else len(q['options']) or 1)
+                         for q in data['questions'])
+    return pages, questions
+
+
+async def request(reader, writer, head, body=b''):
+    """发送一个请求并读完响应，返回 (状态码, 响应头字典)"""
+    writer.write(head + body)
+    response = await reader.readuntil(b'\r\n\r\n')
+    lines = response.decode('latin-1').split('\r\n')
+    status = int(lines[0].split(' ')[1])
+    headers = {}
+    for line in lines[1:]:
+        name, _, value = line.partition(':')
+        headers[name.strip().lower()] = value.strip()
+    await reader.readexactly(int(headers.get('content-length', 0)))
+    return status, headers
+
+
+async def client(number, url, pages, questions, deadline, latencies, statuses, seed):
+    rng = random.Random(seed)
+    parts = urlsplit(url)
+    host = parts.hostname
+    reader, writer = await asyncio.open_connection(host, parts.port)
+    etags = {}
+    user = f"bench{number}"
+    try:
+        while time.perf_counter() < deadline:
+            if rng.random() < PAGE_RATIO:
+                name, count = rng.choice(pages)
+                target = f"/api/questions?type={quote(name)}&page={rng.randrange(count)}"
+                lines = [f"GET {target} HTTP/1.1", f"Host: {host}", "Accept-Encoding: gzip"]
+                if target in etags and rng.random() < 0.5:
+                    lines.append(f"If-None-Match: {etags[target]}")
+                head = ('\r\n'.join(lines) + '\r\n\r\n').encode('utf-8')
+                body = b''
+            else:
+                fid, option_count = rng.choice(questions)
+                selected = [rng.randrange(option_count)]
+                body = json.dumps({'user': user, 'id': fid, 'selected': selected}).encode('utf-8')
+                head = (f"POST /api/attempts HTTP/1.1\r\nHost: {host}\r\n"
+                        f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n").encode('utf-8')
+                target = None
+            start = time.perf_counter()
+            status, headers = await request(reader, writer, head, body)
+            latencies.append(time.perf_counter() - start)
+            statuses[status] += 1
+            if target is not None and 'etag' in headers:
+                etags[target] = headers['etag']
+    finally:
+        writer.close()
+
+
+def percentile(values, fraction):
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+async def run(url, clients, duration, seed):
+    pages, questions = load_targets(url)
+    latencies = []
+    statuses = Counter()
+    start = time.perf_counter()
+    deadline = start + duration
+    results = await asyncio.gather(*(client(i, url, pages, questions, deadline, latencies, statuses, seed + i)
+                                     for i in range(clients)), return_exceptions=True)
+    elapsed = time.perf_counter() - start
+    errors = [result for result in results if isinstance(result, Exception)]
+    return latencies, statuses, errors, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="刷题服务器压测")
+    parser.add_argument('--url', help="已在运行的服务器地址，如 http://127.0.0.1:8000/（默认启动一个）")
+    parser.add_argument('--bank', default='sets', help="启动服务器时加载的题库文件或目录")
+    parser.add_argument('--clients', type=int, default=200, help="并发客户端数")
+    parser.add_argument('--duration', type=float, default=10.0, help="压测时长（秒）")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    process = None
+    with tempfile.TemporaryDirectory() as progress_dir:
+        url = args.url
+        if url is None:
+            process, url = start_server(args.bank, progress_dir)
+        elif not url.endswith('/'):
+            url += '/'
+        try:
+            latencies, statuses, errors, elapsed = asyncio.run(run(url, args.clients, args.duration, args.seed))
+        finally:
+            if process is not None:
+                process.terminate()
+                process.wait()
+
+    latencies.sort()
+    count = len(latencies)
+    print(f"{args.clients} 个客户端，{elapsed:.1f} 秒，{count} 个请求，{count / elapsed:,.0f} 请求/秒")
+    if latencies:
+        print("延迟：" + "，".join(f"{name} {percentile(latencies, fraction) * 1000:.1f} ms" for name, fraction in
+                                 (("p50", 0.5), ("p90", 0.9), ("p99", 0.99), ("最大", 1.0))))
+    print("状态码：" + "，".join(f"{status} × {number}" for status, number in sorted(statuses.items())))
+    if errors:
+        print(f"{len(errors)} 个客户端出错，如：{errors[0]!r}")
+    failed = errors or any(status >= 400 for status in statuses)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""启动耗时基准
+
+用 `python -X importtime` 多次导入 quiz_app，统计导入总耗时的中位数，
+列出最耗时的依赖模块，并检查不应在启动时导入的重量级可选依赖
+（python-docx / lxml 只在 docx 后备路径中按需导入）。
+
+用法：python tools/bench_startup.py [--runs 7] [--budget-ms 100]
+超出预算或启动时导入了禁用模块时以非零状态退出。
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+
+# 启动耗时预算（毫秒）
+STARTUP_BUDGET_MS = 100
+
+# 启动时不应导入的模块
+FORBIDDEN_AT_STARTUP = ('docx', 'lxml')
+
+
+def measure_once():
+    """导入一次 quiz_app，返回 {模块名: 累计耗时(微秒)}"""
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import quiz_app'],
+                            cwd=PROJECT_DIR, capture_output=True, text=True, check=True)
+    timings = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        timings[name.strip()] = int(cumulative)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="测量 quiz_app 的导入耗时")
+    parser.add_argument('--runs', type=int, default=7, help="测量次数（首次用于预热，不计入）")
+    parser.add_argument('--budget-ms', type=float, default=STARTUP_BUDGET_MS, help="耗时预算（毫秒）")
+    parser.add_argument('--top', type=int, default=10, help="列出最耗时的模块数")
+    args = parser.parse_args()
+
+    measure_once()  # 预热：生成 .pyc 并填充文件系统缓存
+    runs = [measure_once() for _ in range(args.runs)]
+    median_ms = statistics.median(r['quiz_app'] for r in runs) / 1000
+
+    last = runs[-1]
+    print(f"quiz_app 导入耗时中位数：{median_ms:.1f} ms（预算 {args.budget_ms:.0f} ms，{args.runs} 次）")
+    print("最耗时的模块（累计）：")
+    for name, us in sorted(last.items(), key=lambda item: item[1], reverse=True)[1:args.top + 1]:
+        print(f"  {us / 1000:8.1f} ms  {name}")
+
+    forbidden = sorted(name for name in last
+                       if name.split('.')[0] in FORBIDDEN_AT_STARTUP)
+    if forbidden:
+        print(f"启动时导入了不应导入的模块：{', '.join(forbidden)}")
+
+    sys.exit(1 if forbidden or median_ms > args.budget_ms else 0)
+
+
+if __name__ == "__main__":
+    main()
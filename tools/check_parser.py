@@ -0,0 +1,276 @@
+"""解析规则一致性检查：Python 解析器与手机网页版解析器
+
+两边都执行 quiz_rules.json 中的规则表，本脚本检查它们的结果完全一致：
+1. 规则表：quiz_mobile.html 内嵌的 #parserRules 与 quiz_rules.json 相同
+   （--sync 把 quiz_rules.json 写入页面）
+2. 黄金语料：tools/parser_corpus.json 中每段文本两边的解析结果都等于
+   期望结果（修改规则后确认无误，可用 --update 按 Python 的结果重新生成）
+3. 内置题库：sets/ 下每个 .txt 两边的解析结果相同；再把它们分别写成
+   UTF-8（有无 BOM）、UTF-16、GB18030 等编码，检查两边识别编码
+   （quiz_encoding 与页面的 detectEncoding）后的解析结果也相同
+4. 差分模糊测试：随机拼出 --iterations 段含各种题号、选项、答案、空白和
+   换行写法的文本，分批交给两边解析并比较；不一致时逐行删减到最小的
+   反例再输出
+最后输出两边在内置题库上的解析吞吐量（行/秒）。任一项不一致，或 Python
+的吞吐量低于 quiz_parser.TARGET_LINES_PER_SEC 时以非零状态退出。JS 解析器通过 tools/parser_node.js 用 Node.js 运行。
+
+用法：python tools/check_parser.py [--iterations 2000] [--seed 0] [--sync] [--update]
+"""
+import argparse
+import codecs
+import io
+import json
+import random
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_DIR))
+
+import quiz_encoding  # noqa: E402
+import quiz_loader  # noqa: E402
+import quiz_parser  # noqa: E402
+
+PAGE = PROJECT_DIR / 'quiz_mobile.html'
+CORPUS = Path(__file__).resolve().with_name('parser_corpus.json')
+NODE_SCRIPT = Path(__file__).resolve().with_name('parser_node.js')
+
+# 页面中内嵌规则表的位置
+RULES_BLOCK_RE = re.compile(r'(<script type="application/json" id="parserRules">\n)(.*?)(\n</script>)', re.S)
+
+# 模糊测试每批交给 Node.js 的文本数
+FUZZ_BATCH = 500
+
+# 模糊测试用的片段
+FUZZ_NUMBERS = ['1', '2', '3', '4', '10', '01', '007', '123456789', '1234567890', '１', '٣', '']
+FUZZ_LETTERS = ['A', 'B', 'C', 'D', 'E', 'F', 'a', 'Ａ']
+FUZZ_ANSWERS = ['A', 'B', 'C', 'D', 'A、B', 'A、C、D', 'AB', '正确', '错误', '对', '错', ' A ', '', '、', '√']
+FUZZ_WORDS = ['题目', '对', '错', '正确', '错误', '答案：', '解析：', '1.', 'A.', '内容', '.', '、', 'x']
+FUZZ_SPACES = ['', ' ', '  ', '\t', '\u3000', '\ufeff', '\xa0', '\u2028', '\x0b', '\x85', '\u200b']
+FUZZ_BREAKS = ['\n', '\n', '\n', '\r\n', '\r', '\n\n', '\u2028']
+
+
+def records(questions):
+    """题目列表转为可比较的记录，字段顺序与 parser_node.js 的 record 一致"""
+    return [[q.original_number, q.number, q.type, q.question, [list(o) for o in q.options],
+             q.answer, q.answer_analysis]
+            for q in questions]
+
+
+def python_records(text):
+    """Python 解析结果"""
+    return records(quiz_parser.parse_questions(quiz_parser.split_lines(text)))
+
+
+def python_file_records(text):
+    """按加载器的方式（文本模式逐行读取）解析，应与 split_lines 的结果相同"""
+    stream = io.StringIO(text, newline=None)
+    return records(quiz_parser.parse_questions(quiz_parser.iter_lines(stream)))
+
+
+def node_records(texts):
+    """用 Node.js 运行页面中的解析器，返回每段文本的解析结果"""
+    result = subprocess.run(['node', str(NODE_SCRIPT), 'parse'], input=json.dumps(texts),
+                            capture_output=True, text=True, encoding='utf-8', check=True)
+    return json.loads(result.stdout)
+
+
+def check_rules(sync):
+    """检查页面内嵌的规则表，sync 为 True 时先写入"""
+    html = PAGE.read_text(encoding='utf-8')
+    rules_text = quiz_parser.RULES_PATH.read_text(encoding='utf-8').rstrip('\n')
+    m = RULES_BLOCK_RE.search(html)
+    if m is None:
+        print("规则表：quiz_mobile.html 中没有 #parserRules")
+        return False
+    if sync and m.group(2) != rules_text:
+        html = html[:m.start(2)] + rules_text + html[m.end(2):]
+        PAGE.write_text(html, encoding='utf-8')
+        print("规则表：已写入 quiz_mobile.html")
+        return True
+    same = json.loads(m.group(2)) == quiz_parser.RULES
+    print("规则表：" + ("一致" if same else "quiz_mobile.html 与 quiz_rules.json 不同，请运行 --sync"))
+    return same
+
+
+def check_corpus(update):
+    """检查黄金语料，update 为 True 时按 Python 的结果重新生成期望结果"""
+    with open(CORPUS, 'r', encoding='utf-8') as f:
+        cases = json.load(f)
+    if update:
+        for case in cases:
+            case['expected'] = python_records(case['text'])
+        # 空白、零宽字符等不可见字符写成 \uXXXX，便于审阅
+        text = json.dumps(cases, ensure_ascii=False, indent=1)
+        text = ''.join(c if c.isprintable() or c == '\n' or ord(c) > 0xFFFF else f'\\u{ord(c):04x}' for c in text)
+        CORPUS.write_text(text + '\n', encoding='utf-8')
+        print(f"黄金语料：已按 Python 的结果更新 {len(cases)} 段")
+    results = node_records([case['text'] for case in cases])
+    failed = 0
+    for case, js in zip(cases, results):
+        for side, records in (("Python", python_records(case['text'])),
+                              ("Python 逐行读取", python_file_records(case['text'])), ("JS", js)):
+            if records != case['expected']:
+                failed += 1
+                print(f"  {case['name']}：{side} 的结果与期望不同")
+                print(f"    期望 {json.dumps(case['expected'], ensure_ascii=False)}")
+                print(f"    实际 {json.dumps(records, ensure_ascii=False)}")
+    print(f"黄金语料：{len(cases)} 段，" + ("全部符合" if not failed else f"{failed} 处不符"))
+    return not failed
+
+
+def check_banks():
+    """检查 sets/ 下的内置题库"""
+    banks = sorted((PROJECT_DIR / 'sets').glob('*.txt'))
+    texts = [path.read_text(encoding='utf-8') for path in banks]
+    results = node_records(texts)
+    failed = [path.name for path, text, js in zip(banks, texts, results)
+              if js != python_records(text) or js != python_file_records(text)]
+    print(f"内置题库：{len(banks)} 个，" + ("结果一致" if not failed else "不一致：" + "、".join(failed)))
+    return not failed
+
+
+def encoded_variants(text):
+    """把题库文本编码为各种写法，返回 [(名称, 字节), ...]"""
+    # 纯 ASCII 的前言行（解析时忽略），把汉字推到试解范围之外或恰好截断在其中
+    preamble = ('# ' + 'x' * 77 + '\n') * (quiz_encoding.PROBE_SIZE // 80 + 1)
+    cut = '#' * (quiz_encoding.PROBE_SIZE - 2) + '\n'
+    return [
+        ('UTF-8', text.encode('utf-8')),
+        ('UTF-8 BOM', text.encode('utf-8-sig')),
+        ('UTF-16 LE BOM', codecs.BOM_UTF16_LE + text.encode('utf-16-le')),
+        ('UTF-16 BE BOM', codecs.BOM_UTF16_BE + text.encode('utf-16-be')),
+        ('GB18030', text.encode('gb18030')),
+        ('ASCII 前言 + GB18030', (preamble + text).encode('gb18030')),
+        ('试解末尾截断的 UTF-8', (cut + text).encode('utf-8')),
+    ]
+
+
+def check_encodings():
+    """按各种编码写出内置题库，检查两边识别编码后的解析结果相同"""
+    banks = sorted((PROJECT_DIR / 'sets').glob('*.txt'))
+    failed = []
+    count = 0
+    with tempfile.TemporaryDirectory() as directory:
+        paths = []
+        for bank in banks:
+            for name, data in encoded_variants(bank.read_text(encoding='utf-8')):
+                path = Path(directory) / f"{len(paths)}.txt"
+                path.write_bytes(data)
+                paths.append((f"{bank.name}（{name}）", path))
+        results = subprocess.run(['node', str(NODE_SCRIPT), 'file'] + [str(path) for _, path in paths],
+                                 capture_output=True, text=True, encoding='utf-8', check=True)
+        for (label, path), js in zip(paths, json.loads(results.stdout)):
+            count += 1
+            with quiz_encoding.open_text(path) as f:
+                encoding = f.encoding
+            if records(quiz_loader.load_bank(path)) != js['records']:
+                failed.append(f"{label}：Python {encoding}，JS {js['encoding']}")
+    print(f"编码识别：{count} 个文件，" + ("结果一致" if not failed else "不一致："))
+    for line in failed:
+        print(f"  {line}")
+    return not failed
+
+
+def random_line(rng):
+    """随机生成一行（不含换行）"""
+    roll = rng.random()
+    if roll < 0.25:
+        body = f"{rng.choice(FUZZ_NUMBERS)}{rng.choice(['.', '.', '．', ''])}{rng.choice(FUZZ_SPACES)}{rng.choice(FUZZ_WORDS)}"
+    elif roll < 0.55:
+        body = f"{rng.choice(FUZZ_LETTERS)}{rng.choice(['.', '.', '、'])}{rng.choice(FUZZ_SPACES)}{rng.choice(FUZZ_WORDS)}"
+    elif roll < 0.7:
+        body = f"答案：{rng.choice(FUZZ_SPACES)}{rng.choice(FUZZ_ANSWERS)}"
+    elif roll < 0.85:
+        body = f"解析：{rng.choice(FUZZ_WORDS)}{rng.choice(FUZZ_SPACES)}{rng.choice(FUZZ_WORDS)}"
+    else:
+        body = ''.join(rng.choice(FUZZ_WORDS) for _ in range(rng.randint(0, 3)))
+    return rng.choice(FUZZ_SPACES) + body + rng.choice(FUZZ_SPACES)
+
+
+def random_case(rng):
+    """随机生成一段文本，返回 [(行, 换行符), ...]"""
+    return [(random_line(rng), rng.choice(FUZZ_BREAKS)) for _ in range(rng.randint(1, 30))]
+
+
+def join_case(parts):
+    return ''.join(line + brk for line, brk in parts)
+
+
+def mismatched(texts):
+    """返回两边解析结果不同的文本下标"""
+    results = node_records(texts)
+    return [i for i, (text, js) in enumerate(zip(texts, results))
+            if js != python_records(text) or js != python_file_records(text)]
+
+
+def shrink(parts):
+    """逐行删减，直到再删任何一行结果都一致为止"""
+    changed = True
+    while changed and len(parts) > 1:
+        candidates = [parts[:i] + parts[i + 1:] for i in range(len(parts))]
+        bad = mismatched([join_case(c) for c in candidates])
+        changed = bool(bad)
+        if changed:
+            parts = candidates[bad[0]]
+    return parts
+
+
+def fuzz(iterations, seed):
+    rng = random.Random(seed)
+    cases = [random_case(rng) for _ in range(iterations)]
+    line_count = sum(len(parts) for parts in cases)
+    start = time.perf_counter()
+    failed = []
+    for i in range(0, len(cases), FUZZ_BATCH):
+        batch = cases[i:i + FUZZ_BATCH]
+        failed.extend(batch[j] for j in mismatched([join_case(parts) for parts in batch]))
+    elapsed = time.perf_counter() - start
+    print(f"模糊测试：{iterations} 段文本（{line_count} 行），{elapsed:.1f} 秒，"
+          + ("结果一致" if not failed else f"{len(failed)} 段不一致"))
+    if failed:
+        text = join_case(shrink(failed[0]))
+        print(f"  最小反例：{json.dumps(text, ensure_ascii=False)}")
+        print(f"    Python {json.dumps(python_records(text), ensure_ascii=False)}")
+        print(f"    JS     {json.dumps(node_records([text])[0], ensure_ascii=False)}")
+    return not failed
+
+
+def throughput():
+    bank = PROJECT_DIR / 'sets' / '题库1.txt'
+    line_count, question_count, rate = quiz_parser.benchmark(bank)
+    result = subprocess.run(['node', str(NODE_SCRIPT), 'bench', str(bank), '20'],
+                            capture_output=True, text=True, check=True)
+    js = json.loads(result.stdout)
+    ok = rate >= quiz_parser.TARGET_LINES_PER_SEC
+    print(f"吞吐量（{bank.name}，{line_count} 行，{question_count} 道题）：Python {rate:,.0f} 行/秒"
+          f"（目标 {quiz_parser.TARGET_LINES_PER_SEC:,}{'' if ok else '，未达到'}），JS {js['rate']:,.0f} 行/秒")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="检查 Python 与手机网页版解析器的结果一致")
+    parser.add_argument('--iterations', type=int, default=2000, help="模糊测试的文本段数")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--sync', action='store_true', help="把 quiz_rules.json 写入 quiz_mobile.html")
+    parser.add_argument('--update', action='store_true', help="按 Python 的结果重新生成黄金语料的期望结果")
+    args = parser.parse_args()
+
+    if shutil.which('node') is None:
+        sys.exit("需要 Node.js 运行手机网页版的解析器")
+    ok = check_rules(args.sync)
+    ok = check_corpus(args.update) and ok
+    ok = check_banks() and ok
+    ok = check_encodings() and ok
+    ok = fuzz(args.iterations, args.seed) and ok
+    ok = throughput() and ok
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""薄弱题加权抽样的统计检查和基准
+
+1. 用随机权重构建 WeightedSampler，抽样若干次后对各位置的计数做卡方
+   拟合优度检验；随后随机修改一部分权重再检验一次（验证增量更新）。
+   卡方统计量超过显著性水平 0.001 的临界值时以非零状态退出。
+2. 测量 --questions 道题时单次 update 和 sample 的耗时。
+
+用法：python tools/check_sampling.py [--positions 50] [--draws 200000] [--questions 100000]
+"""
+import argparse
+import math
+import random
+import sys
+import time
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_DIR))
+
+import quiz_schedule  # noqa: E402
+
+# 标准正态分布 0.999 分位数（显著性水平 0.001 的单侧临界值）
+Z_999 = 3.0902
+
+
+def chi2_critical(df):
+    """卡方分布 0.999 分位数（Wilson–Hilferty 近似）"""
+    h = 2 / (9 * df)
+    return df * (1 - h + Z_999 * math.sqrt(h)) ** 3
+
+
+def check(sampler, draws):
+    """返回 (卡方统计量, 临界值)"""
+    counts = [0] * len(sampler)
+    for _ in range(draws):
+        counts[sampler.sample()] += 1
+    total = sum(sampler.weights)
+    chi2 = 0.0
+    for count, weight in zip(counts, sampler.weights):
+        expected = draws * weight / total
+        chi2 += (count - expected) ** 2 / expected
+    return chi2, chi2_critical(len(sampler) - 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="检查加权抽样的分布并测量耗时")
+    parser.add_argument('--positions', type=int, default=50, help="统计检查的题目数")
+    parser.add_argument('--draws', type=int, default=200_000, help="每次检查的抽样次数")
+    parser.add_argument('--questions', type=int, default=100_000, help="基准的题目数")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    weights = [rng.uniform(quiz_schedule.MIN_WEIGHT, 4.0) for _ in range(args.positions)]
+    sampler = quiz_schedule.WeightedSampler(weights, rng=rng)
+
+    failed = False
+    for label in ("初始权重", "修改权重后"):
+        chi2, critical = check(sampler, args.draws)
+        ok = chi2 <= critical
+        failed |= not ok
+        print(f"{label}：卡方 {chi2:.1f}，临界值 {critical:.1f}（df={len(sampler) - 1}）{'通过' if ok else '未通过'}")
+        for pos in rng.sample(range(len(sampler)), len(sampler) // 3):
+            sampler.update(pos, rng.uniform(quiz_schedule.MIN_WEIGHT, 4.0))
+
+    n = args.questions
+    sampler = quiz_schedule.WeightedSampler((rng.uniform(quiz_schedule.MIN_WEIGHT, 4.0) for _ in range(n)), rng=rng)
+    operations = 100_000
+    positions = [rng.randrange(n) for _ in range(operations)]
+    start = time.perf_counter()
+    for pos in positions:
+        sampler.update(pos, 2.0)
+    per_update = (time.perf_counter() - start) / operations
+    start = time.perf_counter()
+    for _ in range(operations):
+        sampler.sample()
+    per_sample = (time.perf_counter() - start) / operations
+    print(f"{n} 道题：update {per_update * 1e6:.1f} µs/次，sample {per_sample * 1e6:.1f} µs/次")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+// 用 Node.js 运行 quiz_mobile.html 中的解析器（供 tools/check_parser.py 调用）
+//
+// 从页面中取出内嵌的规则表（#parserRules）和解析脚本（#parserScript），
+// 不依赖浏览器即可执行与手机网页版完全相同的解析代码。
+//
+// 用法：
+//   node tools/parser_node.js parse < texts.json      标准输入为文本数组，输出每段文本的解析结果
+//   node tools/parser_node.js file 题库.txt ...       按页面的方式识别编码后解析，输出每个文件的 {"encoding", "records"}
+//   node tools/parser_node.js bench 题库.txt [次数]    输出 {"lines", "questions", "rate"}（行/秒）
+'use strict';
+const fs = require('fs');
+const path = require('path');
+
+const PAGE = path.join(__dirname, '..', 'quiz_mobile.html');
+
+function scriptText(html, id) {
+  const m = html.match(new RegExp(`<script[^>]*id="${id}"[^>]*>([\\s\\S]*?)</script>`));
+  if (!m) throw new Error(`quiz_mobile.html 中没有 #${id}`);
+  return m[1];
+}
+
+function loadParser() {
+  const html = fs.readFileSync(PAGE, 'utf8');
+  const rules = JSON.parse(scriptText(html, 'parserRules'));
+  const body = scriptText(html, 'parserScript') + '\nreturn {splitLines, parseQuestions, detectEncoding, decodeBytes};';
+  return new Function('PARSER_RULES', body)(rules);
+}
+
+// 与 check_parser.py 中 python_records 的字段顺序一致
+function record(q) {
+  return [q.originalNumber, q.number, q.type, q.question, q.options.map(o => [o.letter, o.text]),
+    q.answer, q.answerAnalysis];
+}
+
+function main() {
+  const parser = loadParser();
+  const [mode, file, repeat] = process.argv.slice(2);
+  if (mode === 'parse') {
+    const texts = JSON.parse(fs.readFileSync(0, 'utf8'));
+    const results = texts.map(text => parser.parseQuestions(parser.splitLines(text)).map(record));
+    process.stdout.write(JSON.stringify(results));
+  } else if (mode === 'file') {
+    const results = process.argv.slice(3).map(name => {
+      const bytes = new Uint8Array(fs.readFileSync(name));
+      const records = parser.parseQuestions(parser.splitLines(parser.decodeBytes(bytes))).map(record);
+      return {encoding: parser.detectEncoding(bytes), records};
+    });
+    process.stdout.write(JSON.stringify(results));
+  } else if (mode === 'bench') {
+    const lines = parser.splitLines(fs.readFileSync(file, 'utf8'));
+    let best = Infinity, count = 0;
+    for (let i = 0; i < Number(repeat || 20); i++) {
+      const start = process.hrtime.bigint();
+      count = parser.parseQuestions(lines).length;
+      best = Math.min(best, Number(process.hrtime.bigint() - start) / 1e9);
+    }
+    process.stdout.write(JSON.stringify({lines: lines.length, questions: count, rate: lines.length / best}));
+  } else {
+    process.stderr.write('用法：node tools/parser_node.js parse | file 题库.txt ... | bench 题库.txt [次数]\n');
+    process.exit(2);
+  }
+}
+
+main();